@@ -0,0 +1 @@
+"""Scripts de mesure des performances du moteur pjm_charge, à lancer depuis la racine du dépôt (python -m benchmarks.xxx)."""
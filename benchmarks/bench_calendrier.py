@@ -0,0 +1,61 @@
+import argparse
+import json
+
+import pandas as pd
+
+from pjm_charge import CalendrierCodes, IndexTemporel, ajouter_colonne_saison, codes_depuis_noms, extraire_plages, preparation_date_en_semaine
+
+from .commun import chronometrer, dataframe_synthetique, serie_synthetique, tailles_argument
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#         Benchmark : preparation_date_en_semaine + ajouter_colonne_saison contre les codes calendaires int8
+# --------------------------------------------------------------------------------------------------------------------------------
+
+def colonnes_reference(dataframe : pd.DataFrame, saisons_selectionnees : list[str]) -> pd.DataFrame :
+    """Référence : preparation_date_en_semaine puis ajouter_colonne_saison, comme dans la première version du dashboard."""
+
+    return ajouter_colonne_saison(preparation_date_en_semaine(dataframe), saisons_selectionnees)
+
+
+def octets_colonnes(dataframe : pd.DataFrame, colonnes : list[str]) -> int :
+    return int(sum(dataframe[colonne].memory_usage(index=False, deep=True) for colonne in colonnes))
+
+
+def mesurer(nb_lignes : int, repetitions : int) -> dict :
+    """Mesure le temps de construction des variables calendaires et d'une sélection de deux saisons, ainsi que la mémoire des colonnes."""
+
+    heures, charge = serie_synthetique(nb_lignes)
+    index = IndexTemporel.depuis_colonnes(heures, charge)
+    df = dataframe_synthetique(heures, charge)
+    saisons = ["Hiver", "Eté"]
+
+    reference = colonnes_reference(df.copy(), saisons)
+    complet = colonnes_reference(df.copy(), ["Hiver", "Printemps", "Eté", "Automne"])
+    calendrier = CalendrierCodes.depuis_heures(index.heures)
+
+    return {
+        "nb_lignes": nb_lignes,
+        "reference_s": chronometrer(lambda: colonnes_reference(df.copy(), saisons), repetitions),
+        "codes_s": chronometrer(lambda: CalendrierCodes.depuis_heures(index.heures), repetitions),
+        "selection_reference_s": chronometrer(lambda: reference[reference["saison"].isin(saisons)], repetitions),
+        "selection_codes_s": chronometrer(lambda: calendrier.plages(0, len(index), codes_depuis_noms(saisons)), repetitions),
+        "extraction_codes_s": chronometrer(lambda: extraire_plages(df, calendrier.plages(0, len(index), codes_depuis_noms(saisons))), repetitions),
+        # Colonnes jour_semaine + saison (chaînes python) contre les quatre codes int8 (heure, jour, mois, saison)
+        "octets_reference": octets_colonnes(complet, ["jour_semaine", "saison"]),
+        "octets_codes": int(sum(getattr(calendrier, nom).nbytes for nom in ("heure", "jour_semaine", "mois", "saison"))),
+        "identique": bool(reference.index.equals(extraire_plages(df, calendrier.plages(0, len(index), codes_depuis_noms(saisons))).index)),
+    }
+
+
+def main() -> None :
+    parser = argparse.ArgumentParser(description="Compare les colonnes calendaires en chaînes aux codes int8.")
+    parser.add_argument("--tailles", nargs="+", default=["1e5", "1e6", "1e7"], help="nombres de lignes à tester")
+    parser.add_argument("--repetitions", type=int, default=3)
+    args = parser.parse_args()
+
+    for nb_lignes in tailles_argument(args.tailles) :
+        print(json.dumps(mesurer(nb_lignes, args.repetitions)), flush=True)
+
+
+if __name__ == "__main__" :
+    main()
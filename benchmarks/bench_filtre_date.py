@@ -0,0 +1,48 @@
+import argparse
+import json
+
+from pjm_charge import IndexTemporel, filtrer_par_date, filtrer_par_date_indexe
+
+from .commun import chronometrer, dataframe_synthetique, serie_synthetique, tailles_argument
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                       Benchmark : filtrer_par_date (masque .dt.date + tri) contre l'index temporel trié
+# --------------------------------------------------------------------------------------------------------------------------------
+
+
+def mesurer(nb_lignes : int, repetitions : int, avec_reference : bool) -> dict :
+    """Mesure les deux implémentations sur le deuxième quart d'une série synthétique de nb_lignes heures (à 10^8 lignes, la fin de la série dépasse l'an 9999 des dates python)."""
+
+    heures, charge = serie_synthetique(nb_lignes)
+    df = dataframe_synthetique(heures, charge)
+    index = IndexTemporel.depuis_colonnes(heures, charge)
+
+    debut = df["Datetime"].iloc[nb_lignes // 4].date()
+    fin = df["Datetime"].iloc[nb_lignes // 2].date()
+
+    resultat = {"nb_lignes": nb_lignes, "indexe_s": chronometrer(lambda: filtrer_par_date_indexe(df, index, debut, fin), repetitions)}
+    if avec_reference :
+        resultat["reference_s"] = chronometrer(lambda: filtrer_par_date(df, debut, fin), repetitions)
+        resultat["acceleration"] = resultat["reference_s"] / resultat["indexe_s"]
+        # On vérifie au passage que les deux méthodes renvoient exactement les mêmes lignes
+        attendu = filtrer_par_date(df, debut, fin)
+        obtenu = filtrer_par_date_indexe(df, index, debut, fin)
+        resultat["identique"] = bool(attendu.index.equals(obtenu.index))
+    return resultat
+
+
+def main() -> None :
+    parser = argparse.ArgumentParser(description="Compare filtrer_par_date à la version par index temporel trié.")
+    parser.add_argument("--tailles", nargs="+", default=["1e5", "1e6", "1e7", "1e8"], help="nombres de lignes à tester")
+    # Au-delà de ~2e6 lignes la série synthétique dépasse l'an 2262 : pd.to_datetime (nanosecondes) ne peut plus convertir les bornes
+    # dans filtrer_par_date, la version d'origine n'est donc mesurée que sur les petites tailles
+    parser.add_argument("--max-reference", type=float, default=1e6, help="au-delà, la version pandas n'est pas mesurée")
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args()
+
+    for nb_lignes in tailles_argument(args.tailles) :
+        print(json.dumps(mesurer(nb_lignes, args.repetitions, nb_lignes <= args.max_reference)), flush=True)
+
+
+if __name__ == "__main__" :
+    main()
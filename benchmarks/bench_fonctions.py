@@ -0,0 +1,165 @@
+import argparse
+import json
+import platform
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from pjm_charge import (
+    AgregatsCharge,
+    CalendrierCodes,
+    CubeHistogramme,
+    IndexTemporel,
+    IndexValeurs,
+    MoteurTopK,
+    PaginationSelection,
+    PyramideMinMax,
+    afficher_low_10,
+    afficher_top_10,
+    ajouter_colonne_saison,
+    charge_maximale,
+    charge_minimale,
+    charge_moyenne,
+    charge_totale,
+    conversion_en_date,
+    detecter_pic_en_fonction_du_seuil,
+    figure_en_octets,
+    filtrer_par_date,
+    filtrer_par_date_indexe,
+    nb_points_pour_figure,
+    preparation_date_en_semaine,
+    table_arrow,
+    tracer_distibution_charge,
+    tracer_histogramme,
+    tracer_pic,
+    tracer_vue_ensemble,
+)
+
+from .commun import chronometrer, dataframe_synthetique, pic_memoire, serie_synthetique, tailles_argument
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#              Suite de benchmarks : temps et pic mémoire de chaque fonction du paquet, résultats en JSON lines
+# --------------------------------------------------------------------------------------------------------------------------------
+# python -m benchmarks.bench_fonctions --tailles 1e4 1e5 1e6 1e7 1e8 --sortie resultats.jsonl
+# Une ligne JSON par (fonction, taille) : temps (meilleur de plusieurs appels), pic mémoire tracemalloc pendant un appel, versions de
+# python / numpy / pandas. Les lignes sont ajoutées au fichier de sortie, ce qui permet de comparer les mesures d'un commit à l'autre.
+
+# Ces fonctions créent un objet python par ligne (dates, chaînes) : elles ne sont mesurées que jusqu'à --max-lentes lignes. Au-delà de
+# ~10^6 lignes la série synthétique dépasse aussi l'an 2262 (dates en nanosecondes) puis l'an 9999 (dates python).
+# tracer_distibution_charge classe toutes les lignes avec matplotlib, elle est limitée de la même façon
+FONCTIONS_LENTES = {"conversion_en_date", "preparation_date_en_semaine", "filtrer_par_date", "ajouter_colonne_saison", "tracer_distibution_charge"}
+
+
+def cas_de_mesure(nb_lignes : int, avec_lentes : bool) -> dict :
+    """Prépare, pour une taille, les appels à mesurer : nom de la fonction -> fonction sans argument (sans les FONCTIONS_LENTES si avec_lentes est False)."""
+
+    heures, charge = serie_synthetique(nb_lignes)
+    df = dataframe_synthetique(heures, charge)
+    seuil = float(np.quantile(charge, 0.999))
+    debut = df["Datetime"].iloc[nb_lignes // 4].date()
+    fin = df["Datetime"].iloc[nb_lignes // 2].date()
+
+    # Structures précalculées du dashboard : leur construction est mesurée une fois, les requêtes ensuite
+    index = IndexTemporel.depuis_colonnes(heures, charge)
+    calendrier = CalendrierCodes.depuis_heures(index.heures)
+    plages = calendrier.plages(*index.bornes(debut, fin), [0, 2])
+    agregats = AgregatsCharge(index, calendrier)
+    moteur = MoteurTopK(index)
+    index_valeurs = IndexValeurs(index)
+    pyramide = PyramideMinMax(index.charge)
+    cube = CubeHistogramme(index)
+    comptes = cube.comptes(plages)
+    pagination = PaginationSelection(index, plages)
+    page_milieu = pagination.nb_pages // 2
+    positions_page = pagination.positions(page_milieu, "charge_decroissante", index_valeurs)
+
+    # Graphiques : mêmes entrées que le dashboard (points de la pyramide, heures au-dessus du seuil), rendus en PNG puis fermés
+    df_index = index.dataframe
+    df_vue = df_index.iloc[pyramide.positions_plages(plages, nb_points_pour_figure(8, 100))]
+    df_pics = df_index.iloc[index_valeurs.positions_au_dessus(seuil, plages)]
+
+    def tracer_pics_seuls() -> bytes :
+        figure, axe = plt.subplots(figsize=(8, 4))
+        try :
+            tracer_pic(df_pics, seuil, axe=axe)
+            return figure_en_octets(figure)
+        finally :
+            plt.close(figure)
+
+    cas = {
+        "charge_totale": lambda: charge_totale(df),
+        "charge_moyenne": lambda: charge_moyenne(df),
+        "charge_maximale": lambda: charge_maximale(df),
+        "charge_minimale": lambda: charge_minimale(df),
+        "detecter_pic_en_fonction_du_seuil": lambda: detecter_pic_en_fonction_du_seuil(df, seuil),
+        "afficher_top_10": lambda: afficher_top_10(df),
+        "afficher_low_10": lambda: afficher_low_10(df),
+        "IndexTemporel.depuis_colonnes": lambda: IndexTemporel.depuis_colonnes(heures, charge),
+        "CalendrierCodes.depuis_heures": lambda: CalendrierCodes.depuis_heures(index.heures),
+        "AgregatsCharge": lambda: AgregatsCharge(index, calendrier),
+        "AgregatsCharge.indicateurs": lambda: agregats.indicateurs(*index.bornes(debut, fin), [0, 2]),
+        "MoteurTopK": lambda: MoteurTopK(index),
+        "MoteurTopK.plus_fortes": lambda: moteur.plus_fortes(plages, 10),
+        "IndexValeurs": lambda: IndexValeurs(index),
+        "IndexValeurs.positions_au_dessus": lambda: index_valeurs.positions_au_dessus(seuil, plages),
+        "filtrer_par_date_indexe": lambda: filtrer_par_date_indexe(df_index, index, debut, fin),
+        "PyramideMinMax": lambda: PyramideMinMax(index.charge),
+        "PyramideMinMax.positions_plages": lambda: pyramide.positions_plages(plages, nb_points_pour_figure(8, 100)),
+        "CubeHistogramme": lambda: CubeHistogramme(index),
+        "CubeHistogramme.comptes": lambda: cube.comptes(plages),
+        "CubeHistogramme.quantiles": lambda: cube.quantiles(comptes, [0.50, 0.95, 0.99]),
+        "PaginationSelection": lambda: PaginationSelection(index, plages),
+        "PaginationSelection.positions": lambda: pagination.positions(page_milieu, "charge_decroissante", index_valeurs),
+        "table_arrow": lambda: table_arrow(index, calendrier, positions_page),
+        "tracer_vue_ensemble": lambda: figure_en_octets(tracer_vue_ensemble(df_vue)),
+        "tracer_pic": tracer_pics_seuls,
+        "tracer_histogramme": lambda: figure_en_octets(tracer_histogramme(comptes, cube.bords)),
+    }
+    if avec_lentes :
+        # Le csv d'origine contient des chaînes : conversion_en_date est mesurée sur la colonne Datetime remise en texte
+        df_texte = df.assign(Datetime=df["Datetime"].dt.strftime("%Y-%m-%d %H:%M:%S"))
+        cas["conversion_en_date"] = lambda: conversion_en_date(df_texte)
+        cas["preparation_date_en_semaine"] = lambda: preparation_date_en_semaine(df.copy())
+        cas["filtrer_par_date"] = lambda: filtrer_par_date(df, debut, fin)
+        cas["ajouter_colonne_saison"] = lambda: ajouter_colonne_saison(df, ["Hiver", "Eté"])
+        cas["tracer_distibution_charge"] = lambda: figure_en_octets(tracer_distibution_charge(df))
+    return cas
+
+
+def main() -> None :
+    parser = argparse.ArgumentParser(description="Mesure le temps et le pic mémoire de chaque fonction sur des séries horaires synthétiques.")
+    parser.add_argument("--tailles", nargs="+", default=["1e4", "1e5", "1e6", "1e7", "1e8"], help="nombres de lignes à tester")
+    parser.add_argument("--fonctions", nargs="+", help="noms des fonctions à mesurer, toutes par défaut")
+    parser.add_argument("--max-lentes", type=float, default=1e6, help="au-delà, les fonctions qui créent un objet par ligne ne sont pas mesurées")
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--sortie", help="fichier JSON lines auquel ajouter les résultats (en plus de la sortie standard)")
+    args = parser.parse_args()
+
+    environnement = {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__}
+    fichier = open(args.sortie, "a", encoding="utf-8") if args.sortie else None
+    try :
+        for nb_lignes in tailles_argument(args.tailles) :
+            cas = cas_de_mesure(nb_lignes, nb_lignes <= args.max_lentes)
+            for nom, fonction in cas.items() :
+                if args.fonctions and nom not in args.fonctions :
+                    continue
+                ligne = json.dumps({
+                    "fonction": nom,
+                    "nb_lignes": nb_lignes,
+                    "temps_s": chronometrer(fonction, args.repetitions),
+                    "pic_memoire_octets": pic_memoire(fonction),
+                    **environnement,
+                })
+                print(ligne, flush=True)
+                if fichier is not None :
+                    fichier.write(ligne + "\n")
+                    fichier.flush()
+            del cas
+    finally :
+        if fichier is not None :
+            fichier.close()
+
+
+if __name__ == "__main__" :
+    main()
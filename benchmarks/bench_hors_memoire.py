@@ -0,0 +1,63 @@
+import argparse
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+from pjm_charge import statistiques_fichier, statistiques_fichiers
+
+from .commun import chronometrer, dataframe_synthetique, pic_memoire, serie_synthetique, tailles_argument
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#              Benchmark : lecture complète du csv en mémoire contre la lecture par morceaux, puis plusieurs zones en parallèle
+# --------------------------------------------------------------------------------------------------------------------------------
+
+
+def lecture_complete(chemin : str) -> tuple :
+    """Référence : tout le fichier en mémoire, comme lire_csv + conversion_en_date puis les fonctions charge_*."""
+
+    df = pd.read_csv(chemin)
+    df["Datetime"] = pd.to_datetime(df["Datetime"])
+    return df["PJM_Load_MW"].sum(), df["PJM_Load_MW"].max(), df["PJM_Load_MW"].min(), df.nlargest(10, "PJM_Load_MW")
+
+
+def mesurer(nb_lignes : int, nb_zones : int, taille_morceau : int, dossier : str) -> dict :
+    """Mesure le temps et le pic mémoire des deux lectures sur un fichier de nb_lignes, puis sur nb_zones fichiers traités en parallèle."""
+
+    chemins = []
+    for zone in range(nb_zones) :
+        chemin = os.path.join(dossier, f"zone{zone}_{nb_lignes}.csv")
+        dataframe_synthetique(*serie_synthetique(nb_lignes, graine=zone)).to_csv(chemin, index=False)
+        chemins.append(chemin)
+
+    resultat = {
+        "nb_lignes": nb_lignes,
+        "taille_morceau": taille_morceau,
+        "complet_s": chronometrer(lambda: lecture_complete(chemins[0]), 1),
+        "complet_pic_octets": pic_memoire(lambda: lecture_complete(chemins[0])),
+        "morceaux_s": chronometrer(lambda: statistiques_fichier(chemins[0], taille_morceau=taille_morceau), 1),
+        "morceaux_pic_octets": pic_memoire(lambda: statistiques_fichier(chemins[0], taille_morceau=taille_morceau)),
+        "nb_zones": nb_zones,
+        "zones_sequentiel_s": chronometrer(lambda: statistiques_fichiers(chemins, nb_processus=1, taille_morceau=taille_morceau), 1),
+        "zones_pool_s": chronometrer(lambda: statistiques_fichiers(chemins, nb_processus=nb_zones, taille_morceau=taille_morceau), 1),
+    }
+    for chemin in chemins :
+        os.remove(chemin)
+    return resultat
+
+
+def main() -> None :
+    parser = argparse.ArgumentParser(description="Compare la lecture complète du csv et les statistiques calculées par morceaux.")
+    parser.add_argument("--tailles", nargs="+", default=["1e5", "1e6"], help="nombres de lignes par fichier")
+    parser.add_argument("--zones", type=int, default=4, help="nombre de fichiers (zones) traités en parallèle")
+    parser.add_argument("--taille-morceau", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier :
+        for nb_lignes in tailles_argument(args.tailles) :
+            print(json.dumps(mesurer(nb_lignes, args.zones, args.taille_morceau, dossier)), flush=True)
+
+
+if __name__ == "__main__" :
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import json
+
+import numpy as np
+import pyarrow as pa
+
+from pjm_charge import CalendrierCodes, IndexTemporel, IndexValeurs, PaginationSelection, ajouter_libelles, extraire_plages, table_arrow
+
+from .commun import chronometrer, serie_synthetique, tailles_argument
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#              Benchmark : envoi de toute la sélection au tableau contre une page lue dans les colonnes de l'index
+# --------------------------------------------------------------------------------------------------------------------------------
+
+
+def mesurer(nb_lignes : int, repetitions : int, taille_page : int) -> dict :
+    """Mesure l'encodage Arrow de toute la sélection (deux saisons) et celui d'une page, en ordre chronologique et triée par charge."""
+
+    heures, charge = serie_synthetique(nb_lignes)
+    index = IndexTemporel.depuis_colonnes(heures, charge)
+    calendrier = CalendrierCodes.depuis_heures(index.heures)
+    index_valeurs = IndexValeurs(index)
+    plages = calendrier.plages(0, nb_lignes, [0, 2])
+    pagination = PaginationSelection(index, plages, taille_page)
+    page_milieu = pagination.nb_pages // 2
+
+    def reference() :
+        # Ce que faisait st.dataframe sur « Tout » : toute la sélection avec ses libellés, convertie en Arrow
+        selection = ajouter_libelles(extraire_plages(index.dataframe, plages), calendrier)
+        return pa.Table.from_pandas(selection)
+
+    def reference_triee() :
+        selection = ajouter_libelles(extraire_plages(index.dataframe, plages), calendrier)
+        return pa.Table.from_pandas(selection.sort_values("PJM_Load_MW", ascending=False, kind="stable").iloc[:taille_page])
+
+    # Mêmes lignes, dans le même ordre, que la sélection complète (triée par charge de façon stable) pour la page du milieu
+    selection = extraire_plages(index.dataframe, plages)
+    rangs = slice(page_milieu * taille_page, (page_milieu + 1) * taille_page)
+    identique = bool(np.array_equal(np.arange(len(index))[pagination.positions(page_milieu)], selection.index[rangs]))
+    for tri, croissant in (("charge_decroissante", False), ("charge_croissante", True)) :
+        attendu = selection.sort_values("PJM_Load_MW", ascending=croissant, kind="stable").index[rangs]
+        identique &= bool(np.array_equal(pagination.positions(page_milieu, tri, index_valeurs), attendu))
+
+    return {
+        "nb_lignes": nb_lignes,
+        "taille_page": taille_page,
+        "selection_complete_s": chronometrer(reference, repetitions),
+        "selection_complete_octets": reference().nbytes,
+        "page_s": chronometrer(lambda: table_arrow(index, calendrier, pagination.positions(page_milieu)), repetitions),
+        "page_octets": table_arrow(index, calendrier, pagination.positions(page_milieu)).nbytes,
+        "tri_reference_s": chronometrer(reference_triee, repetitions),
+        "tri_premiere_page_s": chronometrer(lambda: table_arrow(index, calendrier, pagination.positions(0, "charge_decroissante", index_valeurs)), repetitions),
+        "identique": identique,
+    }
+
+
+def main() -> None :
+    parser = argparse.ArgumentParser(description="Compare l'envoi de toute la sélection et le tableau paginé.")
+    parser.add_argument("--tailles", nargs="+", default=["1e5", "1e6", "1e7"], help="nombres de lignes à tester")
+    parser.add_argument("--taille-page", type=int, default=100)
+    parser.add_argument("--repetitions", type=int, default=3)
+    args = parser.parse_args()
+
+    for nb_lignes in tailles_argument(args.tailles) :
+        print(json.dumps(mesurer(nb_lignes, args.repetitions, args.taille_page)), flush=True)
+
+
+if __name__ == "__main__" :
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import json
+
+import numpy as np
+
+from pjm_charge import CalendrierCodes, IndexTemporel, IndexValeurs, detecter_episodes, extraire_plages
+
+from .commun import chronometrer, dataframe_synthetique, serie_synthetique, tailles_argument
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#              Benchmark : detecter_pic_en_fonction_du_seuil (comparaison sur tout le dataframe) contre l'index des valeurs
+# --------------------------------------------------------------------------------------------------------------------------------
+
+
+def mesurer(nb_lignes : int, repetitions : int, quantile_seuil : float) -> dict :
+    """Mesure la recherche des pics et des épisodes pour un seuil placé au quantile demandé, sur deux saisons du premier quart de la série."""
+
+    heures, charge = serie_synthetique(nb_lignes)
+    index = IndexTemporel.depuis_colonnes(heures, charge)
+    df = dataframe_synthetique(heures, charge)
+    calendrier = CalendrierCodes.depuis_heures(index.heures)
+    seuil = float(np.quantile(charge, quantile_seuil))
+    plages = calendrier.plages(0, nb_lignes // 4, [0, 2])
+
+    index_valeurs = IndexValeurs(index)
+    df_filtre = extraire_plages(df, plages)
+    return {
+        "nb_lignes": nb_lignes,
+        "seuil": seuil,
+        "construction_index_s": chronometrer(lambda: IndexValeurs(index), 1),
+        "reference_s": chronometrer(lambda: df_filtre[df_filtre["PJM_Load_MW"] >= seuil], repetitions),
+        "indexe_s": chronometrer(lambda: index_valeurs.positions_au_dessus(seuil, plages), repetitions),
+        "episodes_s": chronometrer(lambda: detecter_episodes(index_valeurs, seuil, plages), repetitions),
+        "identique": bool(np.array_equal(df_filtre.index[df_filtre["PJM_Load_MW"] >= seuil], index_valeurs.positions_au_dessus(seuil, plages))),
+    }
+
+
+def main() -> None :
+    parser = argparse.ArgumentParser(description="Compare la détection des pics par masque booléen et par index des valeurs.")
+    parser.add_argument("--tailles", nargs="+", default=["1e5", "1e6", "1e7"], help="nombres de lignes à tester")
+    parser.add_argument("--quantile", type=float, default=0.999, help="quantile de la charge utilisé comme seuil")
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args()
+
+    for nb_lignes in tailles_argument(args.tailles) :
+        print(json.dumps(mesurer(nb_lignes, args.repetitions, args.quantile)), flush=True)
+
+
+if __name__ == "__main__" :
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import json
+
+import numpy as np
+
+from pjm_charge import CalendrierCodes, IndexTemporel, MoteurTopK, extraire_plages
+
+from .commun import chronometrer, dataframe_synthetique, serie_synthetique, tailles_argument
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                 Benchmark : extraction de la sélection + nlargest / nsmallest contre les listes précalculées par bloc
+# --------------------------------------------------------------------------------------------------------------------------------
+
+
+def mesurer(nb_lignes : int, nb : int, repetitions : int) -> dict :
+    """Mesure le top nb sur deux sélections : toute la série (une plage) et deux saisons de la moitié de la série (plusieurs plages)."""
+
+    heures, charge = serie_synthetique(nb_lignes)
+    index = IndexTemporel.depuis_colonnes(heures, charge)
+    df = dataframe_synthetique(heures, charge)
+    calendrier = CalendrierCodes.depuis_heures(index.heures)
+    moteur = MoteurTopK(index, nb_max=max(nb, 100))
+
+    resultat = {"nb_lignes": nb_lignes, "nb": nb, "construction_s": chronometrer(lambda: MoteurTopK(index, nb_max=max(nb, 100)), 1)}
+    for nom, plages in (("tout", [(0, nb_lignes)]), ("saisons", calendrier.plages(nb_lignes // 4, 3 * nb_lignes // 4, [0, 2]))) :
+        # Chemin pandas : on matérialise la sélection puis on appelle nlargest, comme afficher_top_10 sur df_filtre
+        resultat[f"{nom}_pandas_s"] = chronometrer(lambda: extraire_plages(df, plages).nlargest(nb, "PJM_Load_MW"), repetitions)
+        resultat[f"{nom}_blocs_s"] = chronometrer(lambda: moteur.plus_fortes(plages, nb), repetitions)
+        attendu = extraire_plages(df, plages).nlargest(nb, "PJM_Load_MW").index.to_numpy()
+        resultat[f"{nom}_identique"] = bool(np.array_equal(attendu, moteur.plus_fortes(plages, nb)))
+    return resultat
+
+
+def main() -> None :
+    parser = argparse.ArgumentParser(description="Compare nlargest sur la sélection extraite au moteur top N par blocs.")
+    parser.add_argument("--tailles", nargs="+", default=["1e5", "1e6", "1e7"], help="nombres de lignes à tester")
+    parser.add_argument("--nb", type=int, default=10, help="nombre de lignes du top")
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args()
+
+    for nb_lignes in tailles_argument(args.tailles) :
+        print(json.dumps(mesurer(nb_lignes, args.nb, args.repetitions)), flush=True)
+
+
+if __name__ == "__main__" :
+    main()
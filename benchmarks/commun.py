@@ -0,0 +1,60 @@
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                                   Outils communs aux scripts de benchmark
+# --------------------------------------------------------------------------------------------------------------------------------
+
+HEURE_DEPART = int(np.datetime64("1998-04-01T01", "h").astype(np.int64))
+
+
+def serie_synthetique(nb_lignes : int, graine : int = 0) -> tuple[np.ndarray, np.ndarray] :
+    """L'objectif de cette fonction est de fabriquer une série horaire ressemblant à la charge PJM (cycle journalier + annuel + bruit).
+    :param nb_lignes: nombre d'heures à générer
+    :param graine: graine du générateur aléatoire, pour des mesures reproductibles
+    :return: un tuple (heures, charge) : heures consécutives depuis 1998-04-01 01:00 en int64 et charge en float64"""
+
+    generateur = np.random.default_rng(graine)
+    heures = HEURE_DEPART + np.arange(nb_lignes, dtype=np.int64)
+    t = np.arange(nb_lignes, dtype=np.float64)
+    charge = 30000 + 5000 * np.sin(2 * np.pi * t / 24) + 6000 * np.cos(2 * np.pi * t / 8766) + generateur.normal(0, 1500, nb_lignes)
+    return heures, np.round(charge)
+
+
+def dataframe_synthetique(heures : np.ndarray, charge : np.ndarray) -> pd.DataFrame :
+    """Construit le dataframe Datetime / PJM_Load_MW tel que le produisait lire_csv + conversion_en_date.
+    Les dates sont en secondes et non en nanosecondes : au-delà de 10^6 lignes la série dépasse l'an 2262, limite du type datetime64[ns]."""
+
+    return pd.DataFrame({"Datetime": heures.astype("datetime64[h]").astype("datetime64[s]"), "PJM_Load_MW": charge})
+
+
+def chronometrer(fonction, repetitions : int = 5) -> float :
+    """Renvoie le meilleur temps (en secondes) sur plusieurs appels de fonction()."""
+
+    meilleur = float("inf")
+    for _ in range(repetitions) :
+        depart = time.perf_counter()
+        fonction()
+        meilleur = min(meilleur, time.perf_counter() - depart)
+    return meilleur
+
+
+def pic_memoire(fonction) -> int :
+    """Renvoie le pic de mémoire (en octets, suivi par tracemalloc) pendant un appel de fonction()."""
+
+    tracemalloc.start()
+    try :
+        fonction()
+        _, pic = tracemalloc.get_traced_memory()
+    finally :
+        tracemalloc.stop()
+    return pic
+
+
+def tailles_argument(valeurs : list[str]) -> list[int] :
+    """Convertit des tailles écrites 1e5, 100000... en entiers."""
+
+    return [int(float(v)) for v in valeurs]
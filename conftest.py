@@ -0,0 +1,2 @@
+# Ce fichier place la racine du dépôt dans sys.path : les tests de tests/ importent pjm_charge sans installation, avec pytest comme
+# avec python -m pytest
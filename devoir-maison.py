@@ -1,262 +1,155 @@
+import os
+
 import numpy as np
 import matplotlib.pyplot as plt
-import pandas as pd
 import streamlit as st
 
-# --------------------------------------------------------------------------------------------------------------------------------
-#                                         Fonction de lecture du jeu de données 
-# --------------------------------------------------------------------------------------------------------------------------------
-
-def lire_csv(filename: str) -> pd.DataFrame | None :
-    """Pour commencer, on commence par créer une fonction qui va lire un fichier csv et renvoyer un
-    dataframe, prêt à être utilisé dans streamlit pour être affiché.
-    En cas de fichier introuvable, on lève une exception nommée FileNotFoundError
-    :param filename: le nom du fichier que l'on souhaite lire
-    :return: Si le nom du fichier spécifié existe, la fonction retourne le dataframe du fichier csv. 
-    Si le nom du fichier spécifié n'existe pas, la fonction ne retourne rien (None) et on met un message d'erreur dans streamlit"""
-
-    try:
-        data = pd.read_csv(filename)
-        return data
-    except Exception as e:
-        st.error(f"Fichier introuvable : {filename}")
-        return None
-
-
-# --------------------------------------------------------------------------------------------------------------------------------
-#                                         Fonction de calcul de la charge totale
-# --------------------------------------------------------------------------------------------------------------------------------  
-
-def charge_totale(dataframe_total : pd.DataFrame) -> float :
-    """L'objectif de cette fonction est de calculer la charge totale sur toute la période de notre jeu de donnée (1998 à 2002)
-    :param dataframe_total: le dataframe auquel on applique à la colonne PJM_Load_MW la méthode mean (ne prend pas en compte les NaN)
-    :return: retourne le résultat du calcul charge moyenne MW"""
-
-    charge_totale_MW = dataframe_total["PJM_Load_MW"].sum()
-    return charge_totale_MW
-
-
-# --------------------------------------------------------------------------------------------------------------------------------
-#                                         Fonction de calcul de la charge moyenne
-# --------------------------------------------------------------------------------------------------------------------------------  
-
-def charge_moyenne(dataframe_moy : pd.DataFrame) -> float:
-    """L'objectif de cette fonction est de calculer la charge moyenne sur toute la période de notre jeu de donnée (1998 à 2002)
-    :param dataframe_moy: le dataframe auquel on applique à la colonne PJM_Load_MW la méthode mean (ne prend pas en compte les NaN)
-    :return: retourne le résultat du calcul charge moyenne MW"""
-
-    charge_moyenne_MW = dataframe_moy["PJM_Load_MW"].mean()
-    return charge_moyenne_MW
+from pjm_charge import (
+    AgregatsCharge,
+    CacheRendu,
+    CalendrierCodes,
+    CubeHistogramme,
+    IndexTemporel,
+    IndexValeurs,
+    LecteurIncremental,
+    MoteurTopK,
+    PaginationSelection,
+    Profileur,
+    PyramideMinMax,
+    ajouter_libelles,
+    codes_depuis_noms,
+    figure_en_octets,
+    morceaux_csv,
+    morceaux_parquet,
+    nb_points_pour_figure,
+    regrouper_episodes,
+    table_arrow,
+    tracer_histogramme,
+    tracer_pic,
+    tracer_vue_ensemble,
+)
 
+# Les fonctions de calcul (charge_*, filtrer_par_date, ajouter_colonne_saison, afficher_top_10...) et de tracé (tracer_*) du devoir sont
+# dans le paquet pjm_charge (calculs.py et graphiques.py) : on peut les importer dans un script sans lancer l'application.
+# Ce fichier ne contient plus que la partie streamlit
 
 # --------------------------------------------------------------------------------------------------------------------------------
-#                                         Fonction de calcul de la charge maximale
+#                             Fonction pour préparer le lecteur du fichier (une seule fois pour tout le serveur)
 # -------------------------------------------------------------------------------------------------------------------------------- 
 
-def charge_maximale(dataframe_pic : pd.DataFrame) -> float:
-    """L'objectif de cette fonction est de calculer la charge maximale, en d'autre terme le pic de charge sur toute la période de notre jeu de donnée (1998 à 2002)
-    :param dataframe_pic: le dataframe auquel on applique à la colonne PJM_Load_MW la méthode mean (ne prend pas en compte les NaN)
-    :return: retourne le résultat du calcul charge moyenne MW"""
-
-    charge_maximale_MW = dataframe_pic["PJM_Load_MW"].max()
-    return charge_maximale_MW
+@st.cache_resource
+def preparer_lecteur(chemin : str) -> LecteurIncremental :
+    """L'objectif de cette fonction est de créer une seule fois, pour tout le serveur, le lecteur du fichier csv.
+    Son premier appel charge les colonnes depuis le cache binaire (déjà triées par heure), les suivants ne lisent que les lignes ajoutées
+    à la fin du fichier. Toutes les sessions partagent donc les mêmes tableaux, qui grandissent sans être relus ni retriés.
+    :param chemin: le nom du fichier csv à suivre
+    :return: le lecteur, qui donne la version des données et l'index temporel des lignes reçues"""
 
+    return LecteurIncremental(chemin)
 
-# --------------------------------------------------------------------------------------------------------------------------------
-#                                         Fonction de calcul de la charge minimale
-# -------------------------------------------------------------------------------------------------------------------------------- 
-
-def charge_minimale(dataframe_creux : pd.DataFrame) -> float:
-    """L'objectif de cette fonction est de calculer  la charge minimale, en d'autre terme, le creux de charge sur toute la période de notre jeu de donnée (1998 à 2002)
-    :param dataframe_creux: le dataframe auquel on applique à la colonne PJM_Load_MW la méthode mean (ne prend pas en compte les NaN)
-    :return: retourne le résultat du calcul charge moyenne MW"""
-
-    charge_minimale_MW = dataframe_creux["PJM_Load_MW"].min()
-    return charge_minimale_MW
 
+# Les structures suivantes sont calculées depuis l'index du lecteur. Seule la version des données sert de clé au cache : les paramètres
+# dont le nom commence par _ ne sont pas hachés par streamlit (la version désigne déjà l'index). Au plus deux versions sont gardées,
+# celle affichée et la précédente, pour que la mémoire ne grandisse pas à chaque ajout au fichier
 
 # --------------------------------------------------------------------------------------------------------------------------------
-#                                         Fonction de conversion en type Datetime
+#                             Fonction pour préparer les codes calendaires (une seule fois par version des données)
 # -------------------------------------------------------------------------------------------------------------------------------- 
 
-def conversion_en_date(dataframe_a_convertir : pd.DataFrame, format_date : str="%Y-%m-%d %H:%M:%S") -> pd.DataFrame : 
-    """Cette fonction a pour objectif de transformer la colonne datetime de notre fichier csv en type datetime pour pouvoir ensuite l'utiliser dans un graphique matplotlib
-    :param dataframe_a_convertir: DataFrame d’origine contenant une colonne nommée Datetime dont les valeurs sont des chaînes représentant une date et une heure.
-    :param format_date: Spécifie la structure des dates/heures dans la colonne. %Y correspond aux années %m correspond aux mois %d correspond aux jours 
-    %H correspond aux heures %M correspond aux minutes
-    :return: retourne le nouveau dataframe avec la colonne convertie"""
+@st.cache_resource(max_entries=2)
+def preparer_calendrier(version : int, _index : IndexTemporel) -> CalendrierCodes :
+    """L'objectif de cette fonction est de calculer en une passe l'heure, le jour de la semaine, le mois et la saison de chaque ligne (codes int8),
+    ainsi que les plages de lignes de chaque saison. Elle remplace preparation_date_en_semaine et la colonne saison de ajouter_colonne_saison.
+    :param version: version des données du lecteur (clé du cache)
+    :param _index: l'index temporel de cette version
+    :return: les codes calendaires alignés sur l'index temporel"""
 
-    #Je ne veux pas modifier directement le dataframe d'origne (dataframe_a_convertir) pour éviter d'altérer les données d'origine, donc je fais une copie du dataframe d'origine.
-    df_conversion = dataframe_a_convertir.copy()
-    df_conversion["Datetime"] = pd.to_datetime(df_conversion["Datetime"],format=format_date)
-    return df_conversion
+    return CalendrierCodes.depuis_heures(_index.heures)
 
 
 # --------------------------------------------------------------------------------------------------------------------------------
-#                               Fonction de conversion pour préparation de la date en semaine
+#                             Fonction pour préparer les agrégats des indicateurs (une seule fois par version des données)
 # -------------------------------------------------------------------------------------------------------------------------------- 
 
-def preparation_date_en_semaine(dataframe_prepa_semaine: pd.DataFrame) -> pd.DataFrame : 
-    """L'objectif de la fonction est de convertir df["Datetime"] au type datetime64 et de créer une nouvelle colonne intitulé jour_semaine qui regroupera les jours de la semaine
-    :param dataframe_prepa_semaine: DataFrame comprenant obligatoirement Datetime convertible en type datetime
-    :return: Le même DataFrame **avec deux garanties : Datetime est bien au type datetime et une colonne jour_semaine a été ajoutée."""
-    
-    dataframe_prepa_semaine["Datetime"] = pd.to_datetime(df["Datetime"])
-    df["jour_semaine"] = dataframe_prepa_semaine["Datetime"].dt.day_name()
-    return df
-
+@st.cache_resource(max_entries=2)
+def preparer_agregats(version : int, _index : IndexTemporel, _calendrier : CalendrierCodes) -> AgregatsCharge :
+    """L'objectif de cette fonction est de précalculer, sur l'index trié, les structures qui donnent total, moyenne, pic et creux de n'importe quelle sélection.
+    :param version: version des données du lecteur (clé du cache)
+    :param _index: l'index temporel de cette version
+    :param _calendrier: les codes calendaires de cette version
+    :return: les agrégats, interrogés ensuite avec indicateurs_periode(debut, fin, saisons)"""
 
-# --------------------------------------------------------------------------------------------------------------------------------
-#                               Fonction pour tracer le premier graphique - vue d'ensemble
-# -------------------------------------------------------------------------------------------------------------------------------- 
+    return AgregatsCharge(_index, _calendrier)
 
-def tracer_vue_ensemble(dataframe_pour_vue_ensemble: pd.DataFrame,title: str = "Vue d'ensemble de la charge PJM en MW de 1998 à 2001", xlabel : str = "Date", ylabel : str = "charge en MW") -> None:
-    """L'objectif de cette fonction est de s'occuper de la partie traçage du graphique contenue dans une dataframe qui montre une vue d'ensemble de la charge PJM en MW de 1998 à 2001
-    :param dataframe_pour_vue_ensemble: le dataframe devant contenir les informations nécessaire à la construction de notre graphique (ici des dates et la charge en megaWatts)
-    :param y: on place sur cette axe y les valeurs de la colonne PJM_Load_MW
-    :param title: titre du graphique 
-    :param xlabel: libellé de l'axe x, à savoir la date
-    :param ylabel: libellé de l'axe y, à savoir la charge en MW
-    :return: La fonction ne renvoie rien, elle crée la figure Matplotlib et l’affiche dans l'application streamlit à son appel"""
-
-    plt.figure(figsize=(8, 4))                 
-    plt.plot(dataframe_pour_vue_ensemble["Datetime"], dataframe_pour_vue_ensemble["PJM_Load_MW"], lw=0.4) # je rend la ligne plus fine avec line width (lw) car sinon le graphique n'est pas très lisible...
-    plt.title(title)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
-   
- 
 
 # --------------------------------------------------------------------------------------------------------------------------------
-#                     Fonction pour tracer le deuxième graphique - distribution de la charge électrique
+#                             Fonction pour préparer la pyramide min/max du graphique (une seule fois par version des données)
 # -------------------------------------------------------------------------------------------------------------------------------- 
 
-def tracer_distibution_charge(dataframe_pour_distribution: pd.DataFrame, title : str = "Distribution de la charge électrique horaire (MW)", xlabel : str = "charge en MW", ylabel : str = "Fréquence") -> None : 
-    """L'objectif de cette fonction est de s'occuper de la partie traçage du graphique qui montre la distribution de la charge horaire sur la période donnée (possibilité de jouer avec les dates sur streamlit)
-    :param dataframe_pour_distribution: le dataframe qui contient toutes les informations nécessaire à la construction de notre graphique ici PJM_Load_MW
-    :param title: titre du graphique 
-    :param xlabel: libellé de l'axe x, à savoir la charge en MW
-    :param ylabel: libellé de l'axe y, à savoir la fréquence à laquelle chaque valeur apparaît dans le jeu de données 
-    :return: La fonction ne renvoie rien, elle créée la figure matplotlib et l'affiche dans l'application streamlit à son appel"""
+@st.cache_resource(max_entries=2)
+def preparer_pyramide(version : int, _index : IndexTemporel) -> PyramideMinMax :
+    """L'objectif de cette fonction est de précalculer le minimum et le maximum de chaque paquet de 2, 4, 8... heures pour le graphique de vue d'ensemble.
+    :param version: version des données du lecteur (clé du cache)
+    :param _index: l'index temporel de cette version
+    :return: la pyramide, qui donne ensuite les points à tracer pour n'importe quelle plage de dates"""
 
-    plt.figure(figsize=(8, 4)) 
-    plt.hist(dataframe_pour_distribution["PJM_Load_MW"], bins=80)
-    plt.title(title)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
+    return PyramideMinMax(_index.charge)
 
 
 # --------------------------------------------------------------------------------------------------------------------------------
-#                                                   Fonction pour filtrer par date
+#                             Fonction pour préparer le cube d'histogrammes (une seule fois par version des données)
 # -------------------------------------------------------------------------------------------------------------------------------- 
 
-def filtrer_par_date(dataframe_filtre_date : pd.DataFrame, debut, fin) -> pd.DataFrame : 
-    """L'objectif de cette fonction est de filtrer un dataFrame entre deux dates incluses et renvoie la sous‐partie triéechronologiquement.
-    :param dataframe_filtre-date: on prend le dataframe d'origine auquel on va ajouter un masque permettant de dessiner les bornes correspondant à notre jeu de donnée
-    :param debut: la variable début qui contient la date à laquelle commence le datset
-    :param fin: la variable fin qui contient la dernière date du dataset
-    :return: retourne une copie du dataframe `df` restreinte à l’intervalle demandé"""
-
-    debut = pd.to_datetime(debut).date()
-    fin = pd.to_datetime(fin).date()
-
-    mask = (dataframe_filtre_date["Datetime"].dt.date >= debut) & (dataframe_filtre_date["Datetime"].dt.date <= fin)
-    selection = dataframe_filtre_date[mask].sort_values("Datetime") 
+@st.cache_resource(max_entries=2)
+def preparer_cube(version : int, _index : IndexTemporel) -> CubeHistogramme :
+    """L'objectif de cette fonction est de fixer les classes de charge (NB_CLASSES_DEFAUT de pjm_charge.histogramme, comme l'histogramme du suivi du fichier) sur tout le jeu de données et de cumuler, jour après jour, le nombre d'heures dans chaque classe.
+    :param version: version des données du lecteur (clé du cache)
+    :param _index: l'index temporel de cette version
+    :return: le cube, qui donne l'histogramme et les quantiles de n'importe quelle sélection"""
 
-    return selection
+    return CubeHistogramme(_index)
 
 
 # --------------------------------------------------------------------------------------------------------------------------------
-#                             Fonction pour ajouter une colonne saison au dataframe
+#                             Fonction pour préparer l'index des valeurs pour les pics (une seule fois par version des données)
 # -------------------------------------------------------------------------------------------------------------------------------- 
 
-def ajouter_colonne_saison(dataframe_saison : pd.DataFrame, saisons_selectionnees: list[str]) -> pd.DataFrame : 
-    """L'objectif de cette fonction est d'ajouter une colonne « saison » au dataFrame à partir des mois, puis de conserver uniquement les lignes dont la saison figure dans
-    saisons_selectionnees.
-    :param dataframe_saison: on prend le dataframe d'origine dont la colonne datetime est utilisée pour pouvoir déterminer la saison
-    :param saisons_selectionnees: correspond à la liste des saisons à choisir par l'utilisateur, la casse est importante
-    :return: retourne un nouveau dataframe enrichi d'une nouvelle colonne nommée saison et filtrée sur les saisons demandées"""
-
-    saison = {12:"Hiver", 1:"Hiver", 2:"Hiver",
-              3:"Printemps", 4:"Printemps", 5:"Printemps",
-              6:"Eté", 7:"Eté", 8:"Eté",
-              9:"Automne", 10:"Automne", 11:"Automne"}
-    
-    df = dataframe_saison.copy()
-    df["saison"] = df["Datetime"].dt.month.map(saison) 
-    mask = df["saison"].isin(saisons_selectionnees)     
-    
-    return df[mask].sort_values("Datetime")
+@st.cache_resource(max_entries=2)
+def preparer_index_valeurs(version : int, _index : IndexTemporel) -> IndexValeurs :
+    """L'objectif de cette fonction est de trier une fois les heures par charge croissante, pour trouver les pics d'un seuil par recherche dichotomique.
+    :param version: version des données du lecteur (clé du cache)
+    :param _index: l'index temporel de cette version
+    :return: l'index des valeurs, qui donne les heures au-dessus de n'importe quel seuil"""
 
-
-# --------------------------------------------------------------------------------------------------------------------------------
-#                             Fonction détecter un pic en fonction d'un seuil donné
-# -------------------------------------------------------------------------------------------------------------------------------- 
-
-def detecter_pic_en_fonction_du_seuil(dataframe_detecter_pic_seuil : pd.DataFrame, seuil_fourni: float) -> pd.DataFrame | None :
-    """L'objectif de cette fonction est de sélectionner les pics de charge en MW dont la valeur dépasse un seuil donné. 
-    :param dataframe_detecter_pic_seuil: dataFrame contenant une colonne numérique PJM_Load_MW représentant la charge en mégawatts auquel on va appliquer le filtre en fonction du seuil fourni
-    :param seuil_fourni: Valeur de seuil choisie par l'utilisateur. Toutes les lignes qui sont supérieure ou égale à ce seuil sont conservées.
-    :return: si la valeur de seuol (seuil_fourni) est inférieur ou égal à 0, on ne retourne rien car ce sont des valeurs impossible. 
-    Sinon, on renvoit le dataframe filtré, le sous ensemble limitée au charges qui sont supérieure ou égales au seuil choisi par l'utilisateur (seuil_fourni)"""
-    if seuil_fourni <= 0 :
-        st.warning("Le seuil doit être supérieur à 0")
-        return None
-    else : 
-        pic = dataframe_detecter_pic_seuil[dataframe_detecter_pic_seuil["PJM_Load_MW"] >= seuil_fourni]
-        return pic
+    return IndexValeurs(_index)
 
 
 # --------------------------------------------------------------------------------------------------------------------------------
-#                             Fonction tracer les pics dépassant un seuil donné
+#                             Fonction pour préparer le moteur top N / low N (une seule fois par version des données)
 # -------------------------------------------------------------------------------------------------------------------------------- 
 
-def tracer_pic(dataframe_pour_pic : pd.DataFrame, seuil: float, color: str = "#FF0000",s: int = 20, marker: str = "o") -> None : 
-    """L'objectif de cette fonction est d'afficher, sous forme de nuage de points, les pics de charge de la colonne PJM_Load_MW qui dépassent un seuil donné.
-    :param df: dataframe utilisé contenant les colonnes datetime et PJM_Load_MW
-    :param seuil: La valeur seuil, seuls les enregistrements de la colonne PJM_Load_MW est supérieure ou égale au seuil sont représentés. Si le seuil est inférieur ou égal à 0, la fonction se termine sans rien tracer.
-    :param color: paramètre spécifique utilisé dans matplolib scatter pour spécifier la couleur des nuages de points
-    :param s: paramètre spécifique utilisé dans matplotlib scatter qui signifie size et désigne la taille des nuages de points
-    :param marker: paramètre spécifique utilisé dans matplotlib scatter qui dessine les nuages de points. Ici o, donc les nuages de points seront des o représentés dans le graphique
-    :return: La fonction ne renvoie rien, elle trace simplement des nuages de points, ce qui la rend compatible avec un graphique déjà existant"""
-
-    if seuil <= 0 : 
-        return None
-    
-    filtrer_pic = detecter_pic_en_fonction_du_seuil(dataframe_pour_pic, seuil)
-
-    if filtrer_pic is not None and not filtrer_pic.empty : 
-        plt.scatter(filtrer_pic["Datetime"], filtrer_pic["PJM_Load_MW"], color = color, s=s , marker = marker)
-
-
-# --------------------------------------------------------------------------------------------------------------------------------
-#                             Fonction pour afficher le top 10 sur le dataset
-# -------------------------------------------------------------------------------------------------------------------------------- 
+@st.cache_resource(max_entries=2)
+def preparer_moteur_top(version : int, _index : IndexTemporel, nb_max : int) -> MoteurTopK :
+    """L'objectif de cette fonction est de garder, pour chaque bloc de 1024 heures, les positions de ses nb_max plus fortes et plus faibles charges.
+    :param version: version des données du lecteur (clé du cache)
+    :param _index: l'index temporel de cette version
+    :param nb_max: nombre de lignes maximum que l'on pourra demander dans le top / low
+    :return: le moteur, qui donne le top N et le low N de n'importe quelle sélection"""
 
-def afficher_top_10(dataframe_top10 : pd.DataFrame, nb_lignes : int=10) -> pd.DataFrame : 
-    """L'objectif de cette fonction est de sélectionner les 10 premiers enregistrements présentant la charge la plus élevée.
-    :param dataframe_top10: dataFrame contenant la colonne PJM_Load_MW, les autres colonnes sont conservées dans le résultat auquel on applique donc la méthode nlargest pour avoir le top10
-    :param nb_lignes: nombre de lignes à extraire
-    :return: renvoie un sous ensemble du dataframe limité aux 10 lignes présentant les valeurs les plus fortes."""
+    return MoteurTopK(_index, nb_max=nb_max)
 
-    top_10 = dataframe_top10.nlargest(nb_lignes, "PJM_Load_MW")
-    return top_10
 
 # --------------------------------------------------------------------------------------------------------------------------------
-#                             Fonction pour afficher le low 10 sur le dataset
+#                             Fonction pour préparer le cache des graphiques rendus (partagé par toutes les sessions)
 # -------------------------------------------------------------------------------------------------------------------------------- 
 
-def afficher_low_10(dataframe_low10 : pd.DataFrame, nb_lignes: int=10) -> pd.DataFrame : 
-    """L'objectif de cette fonction est de sélectionner les 10 premiers enregistrements présentant la charge la moins élevée.
-    :param df: dataFrame contenant la colonne PJM_Load_MW, les autres colonnes sont conservées dans le résultat
-    :param n: nombre de lignes à extraire
-    :return: renvoie un sous ensemble du dataframe limité aux 10 lignes présentant les valeurs les moins fortes."""
-
-    low_10 = dataframe_low10.nsmallest(nb_lignes, "PJM_Load_MW")
-    return low_10
-
-
+@st.cache_resource
+def preparer_cache_rendu(taille_max_octets : int) -> CacheRendu :
+    """L'objectif de cette fonction est de créer une seule fois, pour tout le serveur, le cache LRU des images des graphiques.
+    :param taille_max_octets: taille maximale du cache en octets, les images les moins récemment utilisées sont retirées au-delà
+    :return: le cache des images"""
 
+    return CacheRendu(taille_max_octets)
 
 
 #-----------------------------------------------------------------------------------------------------------------------------------
@@ -272,37 +165,60 @@ initial_sidebar_state="expanded",
 )
 
 
-st.title("Dashboard charge du réseau électrique - Pennsylvania-New Jersey-Maryland Interconnection")
-#  Je commence par appeler notre fonction de lecture de notre de jeu de données 
-df = lire_csv("PJM_Load_hourly.csv") 
+# Nombre de lignes maximum proposé pour le top N / low N (taille des listes précalculées par bloc)
+NB_LIGNES_MAX = 100
+# Libellés des tris proposés pour le tableau paginé
+TRIS_TABLEAU = {"Date": "chronologique", "Charge décroissante": "charge_decroissante", "Charge croissante": "charge_croissante"}
+# Taille maximale du cache des graphiques (une image de 8x4 pouces pèse quelques dizaines de Ko)
+TAILLE_CACHE_RENDU = 32 * 1024 * 1024
 
-#  Ensuite on appelle notre fonction de conversion de date pour pouvoir faire nos actions d'affichage de graphique
-df = conversion_en_date(df,format_date="%Y-%m-%d %H:%M:%S")
-df = preparation_date_en_semaine(df)
+# Profilage des étapes (PJM_PROFILAGE=1 : durées et mémoire, PJM_PROFILAGE=temps : durées seulement). Désactivé par défaut : chaque
+# « with profileur.etape(...) » ne fait alors rien. Le profileur est gardé dans la session avec l'historique de ses dernières exécutions ;
+# si PJM_PROFILAGE_FICHIER est renseigné, chaque exécution est aussi ajoutée à ce fichier JSON lines
+if "profileur" not in st.session_state :
+    st.session_state["profileur"] = Profileur()
+profileur = st.session_state["profileur"]
+profileur.nouvelle_execution()
 
-# J'affiche les principales statistiques du jeu de données : total, moyenne, pic et creux sur la période de notre jeu de donnée
-st.title("Principaux indicateurs sur la période (1998 - 2001)")
-total = charge_totale(df)
-moyenne = charge_moyenne(df)
-pic = charge_maximale(df)
-creux = charge_minimale(df)
-
-col1, col2 = st.columns(2)
-col1.metric("⚡ Charge totale", f"{total:,.0f} MW")
-col2.metric("⚡ Charge moyenne", f"{moyenne:,.0f} MW")
-col3, col4 = st.columns(2)
-col3.metric("⚡ Pic sur la période", f"{pic:,.0f} MW")
-col4.metric("⚡ Creux sur la période", f"{creux:,.0f} MW")
+st.title("Dashboard charge du réseau électrique - Pennsylvania-New Jersey-Maryland Interconnection")
+#  Je commence par charger notre jeu de données via le lecteur partagé : au premier lancement il reprend le cache binaire (colonnes déjà
+#  converties et triées par heure, donc plus besoin d'appeler conversion_en_date), ensuite chaque interaction ne lit que les lignes
+#  ajoutées à la fin du csv. Les structures dérivées (calendrier, agrégats, pyramide...) sont recalculées depuis les tableaux en mémoire,
+#  seulement quand la version des données change : ni nouvelle analyse du texte, ni nouveau hash, ni nouveau tri
+lecteur = preparer_lecteur("PJM_Load_hourly.csv")
+rapport, erreur_lecture = None, None
+try :
+    with profileur.etape("chargement_index") as mesure :
+        try :
+            rapport = lecteur.lire_nouveautes()
+        except ValueError as erreur :
+            # Une ligne illisible n'est pas intégrée : on garde les données déjà reçues et on le signale dans le suivi du fichier
+            erreur_lecture = str(erreur)
+        version, index = lecteur.instantane()
+        mesure.lignes_sortie = len(index)
+except FileNotFoundError :
+    st.error("Fichier introuvable : PJM_Load_hourly.csv")
+    st.stop()
+if len(index) == 0 :
+    st.error(erreur_lecture or "Aucune ligne lue dans PJM_Load_hourly.csv")
+    st.stop()
+
+# Le jour de la semaine et la saison ne sont plus des colonnes de chaînes : ce sont des codes int8 précalculés (calendrier),
+# les libellés ne sont ajoutés qu'au moment d'afficher le tableau
+df = index.dataframe
+with profileur.etape("calendrier", len(index)) as mesure :
+    calendrier = preparer_calendrier(version, index)
+    mesure.lignes_sortie = len(index)
 
 # Pour l'intéraction avec l'utilisateur, je choisi de mettre en place une sidebar avec tous les éléments paramétrables 
 st.sidebar.title("Paramètres temporels")
 
 # Module de sélection des dates
-premiere_date = df["Datetime"].min().date()
-derniere_date = df["Datetime"].max().date()
+# Les heures de l'index sont triées : la première et la dernière donnent les bornes sans parcourir le dataframe
+premiere_date = np.datetime64(int(index.heures[0]), "h").astype("datetime64[D]").item()
+derniere_date = np.datetime64(int(index.heures[-1]), "h").astype("datetime64[D]").item()
 debut = st.sidebar.date_input("Début", value=premiere_date, min_value=premiere_date, max_value=derniere_date)
 fin = st.sidebar.date_input("Fin", value=derniere_date, min_value=premiere_date, max_value=derniere_date) 
-df_date = filtrer_par_date(df, debut, fin)
 
 # Module de sélection des saisons
 choix = st.sidebar.multiselect(
@@ -311,43 +227,225 @@ choix = st.sidebar.multiselect(
     default=["Hiver", "Printemps", "Eté", "Automne"]
 )
 
-df_filtre = ajouter_colonne_saison(df_date, choix)
+# La sélection (dates + saisons) est une liste de plages de lignes de l'index trié : pas de masque sur tout le dataframe, pas de copie
+# ni de nouveau tri. Les lignes ne sont lues qu'au moment où on en a besoin (page du tableau, export)
+with profileur.etape("selection", len(index)) as mesure :
+    plages_selection = calendrier.plages(*index.bornes(debut, fin), codes_depuis_noms(choix))
+    nb_lignes_selection = sum(b - a for a, b in plages_selection)
+    mesure.lignes_sortie = nb_lignes_selection
+
+# J'affiche les principales statistiques sur la sélection : total, moyenne, pic et creux. Ils sont lus dans les agrégats précalculés
+# (sommes cumulées et tables de maximum/minimum), donc ils suivent les dates et les saisons sans reparcourir les données
+st.title(f"Principaux indicateurs sur la période ({debut} → {fin})")
+with profileur.etape("indicateurs", nb_lignes_selection) as mesure :
+    agregats = preparer_agregats(version, index, calendrier)
+    indicateurs = agregats.indicateurs_periode(debut, fin, choix)
+    mesure.lignes_sortie = 1
+
+col1, col2 = st.columns(2)
+col1.metric("⚡ Charge totale", f"{indicateurs.total:,.0f} MW")
+col2.metric("⚡ Charge moyenne", f"{indicateurs.moyenne:,.0f} MW")
+col3, col4 = st.columns(2)
+col3.metric("⚡ Pic sur la période", f"{indicateurs.maximum:,.0f} MW")
+col4.metric("⚡ Creux sur la période", f"{indicateurs.minimum:,.0f} MW")
+if indicateurs.heure_maximum is not None :
+    col3.caption(f"Atteint le {indicateurs.heure_maximum:%d/%m/%Y à %Hh}")
+    col4.caption(f"Atteint le {indicateurs.heure_minimum:%d/%m/%Y à %Hh}")
 
 
 st.sidebar.title("Options avancées")
 # Module de sélection de sélection du seuil
 seuil_fourni = st.sidebar.number_input("Veuillez renseigner le pic recherché")
 afficher_pic = st.sidebar.toggle("Afficher les pics", value = False)
+suivre_fichier = st.sidebar.toggle("Afficher le suivi du fichier", value = False)
+
+# Suivi du fichier : le lecteur partagé a déjà lu, au chargement, les lignes ajoutées à la fin du csv depuis la dernière interaction.
+# On affiche ici son rapport (lignes ajoutées, doublons et lignes hors ordre écartés, heures manquantes) et ses agrégats courants
+# (somme, nombre, pic, creux), mis à jour avec ces seules lignes. Le bouton permet de tout relire après une erreur de lecture
+if suivre_fichier :
+    st.title("Suivi du fichier")
+    if erreur_lecture is not None :
+        st.error(erreur_lecture)
+    if st.button("Relire le fichier depuis le début") :
+        lecteur.reinitialiser()
+        st.rerun()
+    if rapport is not None :
+        if len(rapport.doublons) :
+            st.warning(f"{len(rapport.doublons)} heure(s) en double ignorée(s)")
+        if len(rapport.hors_ordre) :
+            st.warning(f"{len(rapport.hors_ordre)} ligne(s) antérieure(s) à la dernière heure reçue ignorée(s)")
+        if rapport.nb_heures_manquantes :
+            st.warning(f"{rapport.nb_heures_manquantes} heure(s) manquante(s) dans {len(rapport.trous)} trou(s)")
+    courants = lecteur.agregats
+    if courants is not None :
+        col_f1, col_f2, col_f3 = st.columns(3)
+        col_f1.metric("Heures reçues", f"{courants.nb_heures:,}", delta=f"+{rapport.nb_ajoutees:,}" if rapport is not None else None)
+        col_f2.metric("Charge moyenne", f"{courants.moyenne:,.0f} MW")
+        col_f3.metric("Pic", f"{courants.maximum:,.0f} MW")
+        st.caption(f"Dernière heure reçue : {np.datetime64(int(index.heures[-1]), 'h')}")
 
 # Affichage du graphique avec vue d'ensemble
 st.title("Charge – vue d’ensemble")
 st.markdown("Ce graphique représente une vue d'ensemble de l'évolution de la charge électrique s'étalant sur toute la durée du jeu de données, donc de 1998 à 2001. Vous pouvez interargir avec le graphique avec la sidebar à gauche de l'écran et choisir une de changer la durée, de jouer avec les saisons, ou encore de définir un seuil de pic.")
 
-tracer_vue_ensemble(df_filtre,title=f"PJM — {debut} → {fin}")  
-if afficher_pic :
-    tracer_pic(df_filtre, seuil_fourni)
-
-st.pyplot(plt)  
+# Les heures au-dessus du seuil sont lues dans l'index des valeurs (charges triées) puis croisées avec la sélection, sans comparer
+# toute la sélection au seuil. Le nuage de points ne reçoit donc que les pics
+afficher_episodes = afficher_pic and seuil_fourni > 0
+if afficher_episodes :
+    with profileur.etape("pics", nb_lignes_selection) as mesure :
+        positions_pics = preparer_index_valeurs(version, index).positions_au_dessus(seuil_fourni, plages_selection)
+        mesure.lignes_sortie = positions_pics.size
+
+# Les graphiques sont rendus en PNG puis fermés, et gardés dans un cache LRU commun à toutes les sessions. La clé reprend tout ce
+# dont dépend l'image (version des données, dates, saisons, seuil et affichage des pics) : revenir à un filtre déjà vu ne retrace rien
+cache_rendu = preparer_cache_rendu(TAILLE_CACHE_RENDU)
+cle_saisons = tuple(codes_depuis_noms(choix))
+
+
+def rendre_vue_ensemble() -> bytes :
+    # Je ne trace pas toutes les heures : la pyramide min/max garde environ deux points par pixel de large (la figure fait 8 pouces),
+    # en conservant le pic et le creux de chaque paquet, donc le graphique a le même aspect pour beaucoup moins de points
+    with profileur.etape("pyramide", nb_lignes_selection) as mesure :
+        positions_vue = preparer_pyramide(version, index).positions_plages(plages_selection, nb_points_pour_figure(8, plt.rcParams["figure.dpi"]))
+        mesure.lignes_sortie = positions_vue.size
+    with profileur.etape("trace_vue_ensemble", positions_vue.size) as mesure :
+        figure = tracer_vue_ensemble(df.iloc[positions_vue], title=f"PJM — {debut} → {fin}")
+        # Si le tracé des pics échoue, la figure est fermée quand même (fermer une figure déjà fermée par figure_en_octets ne fait rien)
+        try :
+            if afficher_episodes :
+                tracer_pic(df.iloc[positions_pics], seuil_fourni, axe=figure.axes[0])
+            return figure_en_octets(figure)
+        finally :
+            plt.close(figure)
+
+
+# Sur un succès du cache, l'étape ne contient que la lecture de l'image : les sous-étapes pyramide et tracé n'apparaissent qu'à un échec
+cle_vue = ("vue_ensemble", version, debut, fin, cle_saisons, float(seuil_fourni) if afficher_episodes else None, afficher_episodes)
+with profileur.etape("graphique_vue_ensemble", nb_lignes_selection) :
+    st.image(cache_rendu.obtenir(cle_vue, rendre_vue_ensemble), use_container_width=True)
+
+# Les heures de pic consécutives sont regroupées en épisodes : début, fin, durée, pic atteint et énergie au-dessus du seuil
+if afficher_episodes :
+    with profileur.etape("episodes", positions_pics.size) as mesure :
+        episodes = regrouper_episodes(index, positions_pics, seuil_fourni)
+        mesure.lignes_sortie = len(episodes)
+    st.title(f"Épisodes de pic au-dessus de {seuil_fourni:,.0f} MW")
+    col_ep1, col_ep2 = st.columns(2)
+    col_ep1.metric("Heures au-dessus du seuil", f"{positions_pics.size:,}")
+    col_ep2.metric("Nombre d'épisodes", f"{len(episodes):,}")
+    st.dataframe(episodes, use_container_width=True)
 
 #Affichage du graphique avec distribution de charge 
 st.title("Distribution de la charge électrique horaire (MW)")
 st.markdown("Ce graphique représente une distribution de la charge électrique horaire. En d'autres termes, ce graphique est capable de montrer la charge électrique horaire normale (celle qu'on retrouve le plus souvent), les pics de production, les creux... C'est un bon complément au premier graphique. Comme pour le premier, il vous est possible d'intérargir avec le graphique avec les élements interactifs de la sidebar. ")
-tracer_distibution_charge(df_filtre)
-st.pyplot(plt)
+# L'histogramme est lu dans le cube (comptes cumulés par jour sur des classes fixes), sans refaire le classement des heures sélectionnées
+with profileur.etape("histogramme", nb_lignes_selection) as mesure :
+    cube = preparer_cube(version, index)
+    comptes_selection = cube.comptes(plages_selection)
+    p50, p95, p99 = cube.quantiles(comptes_selection, [0.50, 0.95, 0.99])
+    mesure.lignes_sortie = comptes_selection.size
 
 
-# Module de sélection top 1à ou low 10 du tableau
-choix_tableau = st.sidebar.radio("Afficher :",["Tout", "Top 10 charge MW", "Low 10 charge MW"])
+def rendre_distribution() -> bytes :
+    with profileur.etape("trace_distribution", comptes_selection.size) :
+        return figure_en_octets(tracer_histogramme(comptes_selection, cube.bords))
 
-if choix_tableau == "Top 10 charge MW" :
-    df_tableau = afficher_top_10(df_filtre, 10)
-elif choix_tableau == "Low 10 charge MW" :
-    df_tableau = afficher_low_10(df_filtre, 10)
-else :
-    df_tableau = df_filtre
+
+# Le seuil et les pics ne changent pas la distribution : ils ne font pas partie de sa clé
+cle_distribution = ("distribution", version, debut, fin, cle_saisons)
+with profileur.etape("graphique_distribution", comptes_selection.size) :
+    st.image(cache_rendu.obtenir(cle_distribution, rendre_distribution), use_container_width=True)
+
+col5, col6, col7 = st.columns(3)
+col5.metric("Médiane (P50)", f"{p50:,.0f} MW")
+col6.metric("P95", f"{p95:,.0f} MW")
+col7.metric("P99", f"{p99:,.0f} MW")
+st.caption(f"Quantiles estimés à partir de l'histogramme, à une classe près ({cube.bords[1] - cube.bords[0]:,.0f} MW)")
+
+
+statistiques_rendu = cache_rendu.statistiques
+st.sidebar.caption(f"Cache des graphiques : {statistiques_rendu.succes} succès, {statistiques_rendu.echecs} échecs, {statistiques_rendu.evictions} évictions ({len(cache_rendu)} images, {cache_rendu.taille_octets / 1024:,.0f} Ko)")
+
+# Module de sélection top N ou low N du tableau. Le classement est lu dans les listes précalculées par bloc (MoteurTopK) :
+# on ne construit pas la sélection complète pour lui appliquer nlargest / nsmallest
+
+choix_tableau = st.sidebar.radio("Afficher :",["Tout", "Top N charge MW", "Low N charge MW"])
+nb_lignes = st.sidebar.number_input("Nombre de lignes (top / low)", min_value=1, max_value=NB_LIGNES_MAX, value=10, step=1)
+
+df_tableau = None
+if choix_tableau != "Tout" :
+    with profileur.etape("top_k", nb_lignes_selection) as mesure :
+        moteur_top = preparer_moteur_top(version, index, NB_LIGNES_MAX)
+        if choix_tableau == "Top N charge MW" :
+            df_tableau = df.iloc[moteur_top.plus_fortes(plages_selection, int(nb_lignes))]
+        else :
+            df_tableau = df.iloc[moteur_top.plus_faibles(plages_selection, int(nb_lignes))]
+        mesure.lignes_sortie = len(df_tableau)
 
 # Affichage du jeu de donnée qui prend en compte les paramètres choisis par l'utilisateur
 st.title("Jeu de données")
 st.markdown("Affichage du jeu de données qui a été utilisé dans le cadre de l'exercice. Ce jeu de donnée a été quelque peu modié avec la possibilité de voir les saisons correspondantes. Il est également possible de faire des petites action comme : 1.afficher le top 10 des charges les plus importantes, 2. Afficher le low 10 des charges les moins importante. ")
-st.dataframe(df_tableau, use_container_width=True)
 
+if df_tableau is not None :
+    with profileur.etape("tableau", len(df_tableau)) as mesure :
+        st.dataframe(ajouter_libelles(df_tableau, calendrier), use_container_width=True)
+        mesure.lignes_sortie = len(df_tableau)
+else :
+    # Tout afficher : le tableau est paginé côté serveur. Seule la page visible est lue dans les colonnes de l'index (sans copie si
+    # elle tient dans une seule plage) puis envoyée au navigateur en Arrow, au lieu de toute la sélection à chaque interaction
+    def revenir_premiere_page() -> None :
+        st.session_state["page_tableau"] = 1
+
+    col_t1, col_t2, col_t3 = st.columns(3)
+    libelle_tri = col_t1.selectbox("Trier par", list(TRIS_TABLEAU), on_change=revenir_premiere_page)
+    taille_page = col_t2.selectbox("Lignes par page", [50, 100, 500, 1000], index=1, on_change=revenir_premiere_page)
+    pagination = PaginationSelection(index, plages_selection, int(taille_page))
+    tri = TRIS_TABLEAU[libelle_tri]
+
+    def aller_a_la_date() -> None :
+        st.session_state["page_tableau"] = pagination.page_de_date(st.session_state["date_tableau"]) + 1
+
+    # Le saut à une date n'a de sens que dans l'ordre chronologique
+    col_t3.date_input("Aller au", value=debut, min_value=premiere_date, max_value=derniere_date, key="date_tableau", on_change=aller_a_la_date, disabled=tri != "chronologique")
+    # La page n'est renseignée que par la session (pas de valeur par défaut sur le widget, qu'on modifie aussi depuis les callbacks).
+    # Si la sélection a rétréci, la page retenue peut ne plus exister
+    st.session_state.setdefault("page_tableau", 1)
+    if st.session_state["page_tableau"] > pagination.nb_pages :
+        st.session_state["page_tableau"] = pagination.nb_pages
+    page = st.number_input(f"Page (sur {pagination.nb_pages:,})", min_value=1, max_value=pagination.nb_pages, step=1, key="page_tableau")
+
+    # L'étape couvre la recherche des lignes de la page, leur encodage en Arrow et l'envoi au navigateur
+    with profileur.etape("tableau", pagination.nb_lignes) as mesure :
+        index_valeurs = preparer_index_valeurs(version, index) if tri != "chronologique" else None
+        positions_page = pagination.positions(int(page) - 1, tri, index_valeurs)
+        table_page = table_arrow(index, calendrier, positions_page)
+        st.dataframe(table_page, use_container_width=True)
+        mesure.lignes_sortie = table_page.num_rows
+    st.caption(f"{pagination.nb_lignes:,} lignes sélectionnées")
+
+    # L'export parcourt toute la sélection par morceaux (csv ou parquet). Il n'est préparé que sur demande, pas à chaque interaction
+    col_e1, col_e2 = st.columns(2)
+    format_export = col_e1.selectbox("Format d'export", ["csv", "parquet"])
+    cle_export = (version, debut, fin, tuple(codes_depuis_noms(choix)), format_export)
+    if col_e2.button("Préparer l'export") :
+        morceaux = morceaux_csv if format_export == "csv" else morceaux_parquet
+        with profileur.etape("export", pagination.nb_lignes) as mesure :
+            st.session_state["export_tableau"] = (cle_export, b"".join(morceaux(index, calendrier, plages_selection)))
+            mesure.lignes_sortie = pagination.nb_lignes
+    export = st.session_state.get("export_tableau")
+    if export is not None and export[0] == cle_export :
+        st.download_button(f"Télécharger ({len(export[1]) / 1024:,.0f} Ko)", export[1], file_name=f"pjm_{debut}_{fin}.{format_export}", mime="text/csv" if format_export == "csv" else "application/octet-stream")
+
+
+# Panneau « Performance » : les étapes de cette exécution, le résumé de l'historique de la session et son export en JSON lines.
+# Il n'existe que si le profilage est activé ; son propre affichage n'est pas mesuré
+if profileur.actif :
+    if os.environ.get("PJM_PROFILAGE_FICHIER") :
+        profileur.ecrire_jsonl(os.environ["PJM_PROFILAGE_FICHIER"], [profileur.execution_courante])
+    with st.sidebar.expander("Performance") :
+        execution = profileur.execution_courante
+        st.caption(f"Exécution n°{execution.numero} : {execution.duree_s * 1000:,.1f} ms mesurées" + ("" if profileur.avec_memoire else " (mémoire non suivie)"))
+        st.dataframe(execution.tableau(), hide_index=True, use_container_width=True)
+        st.caption(f"Historique ({len(profileur.executions())} exécutions)")
+        st.dataframe(profileur.resume(), use_container_width=True)
+        st.download_button("Télécharger l'historique (JSON lines)", profileur.lignes_jsonl(), file_name="profilage_pjm.jsonl", mime="application/jsonl")
@@ -0,0 +1,91 @@
+"""Moteur de calcul du dashboard PJM : fonctions du devoir, ingestion et structures de données précalculées, sans dépendance à streamlit
+(matplotlib et pyarrow ne sont importés qu'à l'appel des fonctions qui en ont besoin)."""
+
+from .agregats import AgregatsCharge, Indicateurs, TableClairsemee
+from .calculs import (
+    afficher_low_10,
+    afficher_top_10,
+    ajouter_colonne_saison,
+    charge_maximale,
+    charge_minimale,
+    charge_moyenne,
+    charge_totale,
+    conversion_en_date,
+    detecter_pic_en_fonction_du_seuil,
+    filtrer_par_date,
+    lire_csv,
+    preparation_date_en_semaine,
+)
+from .calendrier import JOURS_SEMAINE, SAISONS, CalendrierCodes, ajouter_libelles, codes_depuis_noms, codes_saison
+from .flux import AgregatsCourants, LecteurIncremental, RapportAjout
+from .graphiques import tracer_distibution_charge, tracer_histogramme, tracer_pic, tracer_vue_ensemble
+from .histogramme import CubeHistogramme
+from .hors_memoire import StatistiquesCharge, statistiques_fichier, statistiques_fichiers
+from .index_temporel import IndexTemporel, extraire_plages, filtrer_par_date_indexe, jour_vers_heure
+from .ingestion import charger_colonnes, charger_donnees, colonnes_vers_dataframe
+from .pagination import TRIS, PaginationSelection, morceaux_csv, morceaux_parquet, table_arrow
+from .pics import COLONNES_EPISODES, IndexValeurs, detecter_episodes, regrouper_episodes
+from .profilage import Execution, MesureEtape, Profileur, mode_profilage
+from .rendu import CacheRendu, StatistiquesCache, figure_en_octets
+from .sous_echantillonnage import PyramideMinMax, nb_points_pour_figure
+from .topk import MoteurTopK
+
+__all__ = [
+    "COLONNES_EPISODES",
+    "AgregatsCharge",
+    "CacheRendu",
+    "CalendrierCodes",
+    "CubeHistogramme",
+    "Execution",
+    "Indicateurs",
+    "IndexTemporel",
+    "IndexValeurs",
+    "JOURS_SEMAINE",
+    "LecteurIncremental",
+    "MesureEtape",
+    "MoteurTopK",
+    "PaginationSelection",
+    "Profileur",
+    "PyramideMinMax",
+    "RapportAjout",
+    "SAISONS",
+    "StatistiquesCache",
+    "StatistiquesCharge",
+    "TRIS",
+    "TableClairsemee",
+    "afficher_low_10",
+    "afficher_top_10",
+    "ajouter_colonne_saison",
+    "ajouter_libelles",
+    "charge_maximale",
+    "charge_minimale",
+    "charge_moyenne",
+    "charge_totale",
+    "charger_colonnes",
+    "charger_donnees",
+    "codes_depuis_noms",
+    "codes_saison",
+    "colonnes_vers_dataframe",
+    "conversion_en_date",
+    "detecter_episodes",
+    "detecter_pic_en_fonction_du_seuil",
+    "extraire_plages",
+    "figure_en_octets",
+    "filtrer_par_date",
+    "filtrer_par_date_indexe",
+    "jour_vers_heure",
+    "lire_csv",
+    "mode_profilage",
+    "morceaux_csv",
+    "morceaux_parquet",
+    "nb_points_pour_figure",
+    "preparation_date_en_semaine",
+    "regrouper_episodes",
+    "statistiques_fichier",
+    "statistiques_fichiers",
+    "table_arrow",
+    "tracer_distibution_charge",
+    "tracer_histogramme",
+    "tracer_pic",
+    "tracer_vue_ensemble",
+]
@@ -0,0 +1,194 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .calendrier import SAISONS, CalendrierCodes, codes_depuis_noms
+from .index_temporel import IndexTemporel
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                             Agrégats précalculés pour les indicateurs sur une plage de dates
+# --------------------------------------------------------------------------------------------------------------------------------
+# Total et moyenne : sommes cumulées (préfixes) des charges et du nombre d'heures renseignées, une plage [i, j) coûte deux lectures.
+# Pic et creux : table clairsemée (sparse table) construite sur des blocs de TAILLE_BLOC heures. Une requête lit au plus deux bouts
+# de blocs et deux cases de la table, donc un temps constant, pour une mémoire de l'ordre de n / TAILLE_BLOC * log(n).
+# Saisons : les lignes triées sont découpées en segments d'une seule saison (environ quatre par an, voir CalendrierCodes). Pour chaque
+# saison, on garde les préfixes des totaux et des nombres d'heures par segment, et une table clairsemée des pics et des creux par segment.
+# Une sélection [i, j) + saisons se lit donc en deux bouts de segments (préfixes et tables des lignes) et, pour chaque saison demandée,
+# deux lectures de préfixes et une requête de table : un temps constant, quel que soit le nombre d'années de la fenêtre.
+
+TAILLE_BLOC = 64
+
+
+class TableClairsemee :
+    """Position du maximum d'une plage [i, j) en temps constant. En cas d'égalité, on renvoie la première position, comme idxmax."""
+
+    def __init__(self, valeurs : np.ndarray, taille_bloc : int = TAILLE_BLOC) -> None :
+        self.valeurs = valeurs
+        self.taille_bloc = taille_bloc
+        n = valeurs.size
+        nb_blocs = -(-n // taille_bloc)
+        if nb_blocs == 0 :
+            self.niveaux = [np.zeros(0, dtype=np.int64)]
+            return
+
+        # Maximum de chaque bloc complet (le dernier bloc est complété par -inf)
+        complete = np.full(nb_blocs * taille_bloc, -np.inf)
+        complete[:n] = valeurs
+        blocs = complete.reshape(nb_blocs, taille_bloc)
+        niveau = np.argmax(blocs, axis=1) + np.arange(nb_blocs) * taille_bloc
+
+        # Niveau k : position du maximum des blocs [b, b + 2^k)
+        self.niveaux = [niveau]
+        largeur = 1
+        while 2 * largeur <= nb_blocs :
+            gauche, droite = niveau[:-largeur], niveau[largeur:]
+            niveau = np.where(complete[droite] > complete[gauche], droite, gauche)
+            self.niveaux.append(niveau)
+            largeur *= 2
+
+    def _position_locale(self, i : int, j : int) -> int :
+        return i + int(np.argmax(self.valeurs[i:j]))
+
+    def position_max(self, i : int, j : int) -> int :
+        """L'objectif de cette méthode est de donner la position du maximum sur la plage [i, j), qui ne doit pas être vide.
+        :param i: début de la plage (inclus)
+        :param j: fin de la plage (exclue)
+        :return: la position du premier maximum"""
+
+        b = self.taille_bloc
+        bloc_i, bloc_j = i // b, (j - 1) // b
+        if bloc_j - bloc_i <= 1 :
+            return self._position_locale(i, j)
+
+        # Bout du premier bloc, blocs complets du milieu (deux cases de la table qui se chevauchent), bout du dernier bloc
+        candidats = [self._position_locale(i, (bloc_i + 1) * b)]
+        nb = bloc_j - bloc_i - 1
+        k = nb.bit_length() - 1
+        candidats.append(int(self.niveaux[k][bloc_i + 1]))
+        candidats.append(int(self.niveaux[k][bloc_j - (1 << k)]))
+        candidats.append(self._position_locale(bloc_j * b, j))
+
+        meilleur = candidats[0]
+        for position in candidats[1:] :
+            if self.valeurs[position] > self.valeurs[meilleur] :
+                meilleur = position
+        return meilleur
+
+
+@dataclass(frozen=True)
+class Indicateurs :
+    """Les quatre indicateurs du dashboard sur une sélection, avec l'heure du pic et du creux."""
+
+    total : float
+    moyenne : float
+    maximum : float
+    heure_maximum : pd.Timestamp | None
+    minimum : float
+    heure_minimum : pd.Timestamp | None
+    nb_heures : int
+
+
+class AgregatsCharge :
+    """Structures précalculées sur un IndexTemporel pour répondre aux indicateurs de n'importe quelle plage et combinaison de saisons."""
+
+    def __init__(self, index : IndexTemporel, calendrier : CalendrierCodes | None = None) -> None :
+        self.index = index
+        charge = np.asarray(index.charge, dtype=np.float64)
+        renseignee = ~np.isnan(charge)
+
+        # Préfixes : cumul_charge[j] - cumul_charge[i] = somme de charge[i:j] (les NaN comptent pour 0, comme avec sum)
+        self.cumul_charge = np.concatenate(([0.0], np.cumsum(np.where(renseignee, charge, 0.0))))
+        self.cumul_nb = np.concatenate(([0], np.cumsum(renseignee, dtype=np.int64)))
+
+        # Les NaN sont ignorés par max et min : on les remplace par -inf dans les deux tables
+        self.table_max = TableClairsemee(np.where(renseignee, charge, -np.inf))
+        self.table_min = TableClairsemee(np.where(renseignee, -charge, -np.inf))
+
+        self.calendrier = calendrier if calendrier is not None else CalendrierCodes.depuis_heures(index.heures)
+
+        # Agrégats de chaque segment de saison : total, nombre d'heures renseignées, positions du pic et du creux
+        debuts, fins = self.calendrier.debuts_segments, self.calendrier.fins_segments
+        total_segments = self.cumul_charge[fins] - self.cumul_charge[debuts]
+        nb_segments = self.cumul_nb[fins] - self.cumul_nb[debuts]
+        self.max_segments = np.array([self.table_max.position_max(a, b) for a, b in zip(debuts.tolist(), fins.tolist())], dtype=np.int64)
+        self.min_segments = np.array([self.table_min.position_max(a, b) for a, b in zip(debuts.tolist(), fins.tolist())], dtype=np.int64)
+
+        # Pour chaque saison : préfixes sur les segments (ceux des autres saisons comptent pour 0) et tables clairsemées des segments
+        # (ceux des autres saisons valent -inf). Un segment sans heure renseignée vaut aussi -inf et n'est jamais retenu
+        self.cumul_charge_saison, self.cumul_nb_saison, self.table_max_saison, self.table_min_saison = [], [], [], []
+        for code in range(len(SAISONS)) :
+            dans_saison = self.calendrier.saison_segments == code
+            self.cumul_charge_saison.append(np.concatenate(([0.0], np.cumsum(np.where(dans_saison, total_segments, 0.0)))))
+            self.cumul_nb_saison.append(np.concatenate(([0], np.cumsum(np.where(dans_saison, nb_segments, 0), dtype=np.int64))))
+            self.table_max_saison.append(TableClairsemee(np.where(dans_saison, self.table_max.valeurs[self.max_segments], -np.inf), taille_bloc=1))
+            self.table_min_saison.append(TableClairsemee(np.where(dans_saison, self.table_min.valeurs[self.min_segments], -np.inf), taille_bloc=1))
+
+    def _heure(self, position : int) -> pd.Timestamp :
+        return pd.Timestamp(np.datetime64(int(self.index.heures[position]), "h"))
+
+    def indicateurs(self, i : int, j : int, saisons : list[int] | None = None) -> Indicateurs :
+        """L'objectif de cette méthode est de calculer total, moyenne, pic et creux sur la plage [i, j) restreinte aux saisons demandées.
+        :param i: début de la plage (inclus)
+        :param j: fin de la plage (exclue)
+        :param saisons: codes de saison à garder, None pour toutes
+        :return: les indicateurs, avec NaN (et des heures à None) si aucune heure renseignée n'est sélectionnée"""
+
+        i, j = int(i), int(j)
+        codes = list(range(len(SAISONS))) if saisons is None else sorted(set(saisons) & set(range(len(SAISONS))))
+        if j <= i or not codes :
+            return Indicateurs(0.0, np.nan, np.nan, None, np.nan, None, 0)
+
+        if len(codes) == len(SAISONS) :
+            # Toutes les saisons : une seule plage
+            plages, complets = [(i, j)], None
+        else :
+            # Segments touchés par [i, j) : le premier et le dernier peuvent être coupés, ceux du milieu sont complets
+            debuts, fins, saisons_segments = self.calendrier.debuts_segments, self.calendrier.fins_segments, self.calendrier.saison_segments
+            premier = int(np.searchsorted(fins, i, side="right"))
+            dernier = int(np.searchsorted(debuts, j, side="left")) - 1
+            bouts = {premier, dernier}
+            plages = [(max(int(debuts[k]), i), min(int(fins[k]), j)) for k in sorted(bouts) if int(saisons_segments[k]) in codes]
+            complets = (premier + 1, dernier) if dernier - premier >= 2 else None
+
+        total = float(sum(self.cumul_charge[b] - self.cumul_charge[a] for a, b in plages))
+        nb = int(sum(self.cumul_nb[b] - self.cumul_nb[a] for a, b in plages))
+        candidats_max = [self.table_max.position_max(a, b) for a, b in plages]
+        candidats_min = [self.table_min.position_max(a, b) for a, b in plages]
+        if complets is not None :
+            p, q = complets
+            for code in codes :
+                total += float(self.cumul_charge_saison[code][q] - self.cumul_charge_saison[code][p])
+                nb += int(self.cumul_nb_saison[code][q] - self.cumul_nb_saison[code][p])
+                segment = self.table_max_saison[code].position_max(p, q)
+                if self.table_max_saison[code].valeurs[segment] > -np.inf :
+                    candidats_max.append(int(self.max_segments[segment]))
+                segment = self.table_min_saison[code].position_max(p, q)
+                if self.table_min_saison[code].valeurs[segment] > -np.inf :
+                    candidats_min.append(int(self.min_segments[segment]))
+
+        if nb == 0 :
+            return Indicateurs(total, np.nan, np.nan, None, np.nan, None, 0)
+
+        # À égalité, la première heure l'emporte, comme avec idxmax / idxmin
+        position_max = max(candidats_max, key=lambda p: (self.table_max.valeurs[p], -p))
+        position_min = max(candidats_min, key=lambda p: (self.table_min.valeurs[p], -p))
+        return Indicateurs(
+            total=total,
+            moyenne=total / nb,
+            maximum=float(self.index.charge[position_max]),
+            heure_maximum=self._heure(position_max),
+            minimum=float(self.index.charge[position_min]),
+            heure_minimum=self._heure(position_min),
+            nb_heures=nb,
+        )
+
+    def indicateurs_periode(self, debut, fin, saisons_selectionnees : list[str] | None = None) -> Indicateurs :
+        """L'objectif de cette méthode est de calculer les indicateurs entre deux jours inclus pour une liste de noms de saisons.
+        :param debut: premier jour conservé
+        :param fin: dernier jour conservé
+        :param saisons_selectionnees: noms de saisons (Hiver, Printemps, Eté, Automne), None pour toutes
+        :return: les indicateurs de la sélection"""
+
+        i, j = self.index.bornes(debut, fin)
+        return self.indicateurs(i, j, codes_depuis_noms(saisons_selectionnees))
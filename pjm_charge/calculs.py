@@ -0,0 +1,217 @@
+import sys
+import warnings
+
+import pandas as pd
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                               Fonctions de calcul du devoir maison, importables sans streamlit
+# --------------------------------------------------------------------------------------------------------------------------------
+# Ce sont les fonctions écrites au départ dans devoir-maison.py. Elles ne dépendent que de pandas : on peut les importer, les
+# mesurer ou les réutiliser dans un script sans lancer streamlit. Les messages destinés à l'utilisateur passent par signaler.
+
+
+def signaler(message : str, niveau : str = "warning") -> None :
+    """L'objectif de cette fonction est d'afficher un message dans l'application si elle tourne, et sinon de lever un avertissement python.
+    :param message: le message à afficher
+    :param niveau: warning ou error, la fonction streamlit correspondante est utilisée dans l'application"""
+
+    # streamlit n'est importé que s'il est déjà chargé par l'application : dans un script, rien ne le charge
+    if "streamlit" in sys.modules :
+        import streamlit as st
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        if get_script_run_ctx() is not None :
+            getattr(st, niveau)(message)
+            return
+    warnings.warn(message, stacklevel=3)
+
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                                         Fonction de lecture du jeu de données 
+# --------------------------------------------------------------------------------------------------------------------------------
+
+def lire_csv(filename: str) -> pd.DataFrame | None :
+    """Pour commencer, on commence par créer une fonction qui va lire un fichier csv et renvoyer un
+    dataframe, prêt à être utilisé dans streamlit pour être affiché.
+    En cas de fichier introuvable, on lève une exception nommée FileNotFoundError
+    :param filename: le nom du fichier que l'on souhaite lire
+    :return: Si le nom du fichier spécifié existe, la fonction retourne le dataframe du fichier csv. 
+    Si le nom du fichier spécifié n'existe pas, la fonction ne retourne rien (None) et on met un message d'erreur dans streamlit"""
+
+    try:
+        data = pd.read_csv(filename)
+        return data
+    except Exception as e:
+        signaler(f"Fichier introuvable : {filename}", "error")
+        return None
+
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                                         Fonction de calcul de la charge totale
+# --------------------------------------------------------------------------------------------------------------------------------  
+
+def charge_totale(dataframe_total : pd.DataFrame) -> float :
+    """L'objectif de cette fonction est de calculer la charge totale sur toute la période de notre jeu de donnée (1998 à 2002)
+    :param dataframe_total: le dataframe auquel on applique à la colonne PJM_Load_MW la méthode mean (ne prend pas en compte les NaN)
+    :return: retourne le résultat du calcul charge moyenne MW"""
+
+    charge_totale_MW = dataframe_total["PJM_Load_MW"].sum()
+    return charge_totale_MW
+
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                                         Fonction de calcul de la charge moyenne
+# --------------------------------------------------------------------------------------------------------------------------------  
+
+def charge_moyenne(dataframe_moy : pd.DataFrame) -> float:
+    """L'objectif de cette fonction est de calculer la charge moyenne sur toute la période de notre jeu de donnée (1998 à 2002)
+    :param dataframe_moy: le dataframe auquel on applique à la colonne PJM_Load_MW la méthode mean (ne prend pas en compte les NaN)
+    :return: retourne le résultat du calcul charge moyenne MW"""
+
+    charge_moyenne_MW = dataframe_moy["PJM_Load_MW"].mean()
+    return charge_moyenne_MW
+
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                                         Fonction de calcul de la charge maximale
+# -------------------------------------------------------------------------------------------------------------------------------- 
+
+def charge_maximale(dataframe_pic : pd.DataFrame) -> float:
+    """L'objectif de cette fonction est de calculer la charge maximale, en d'autre terme le pic de charge sur toute la période de notre jeu de donnée (1998 à 2002)
+    :param dataframe_pic: le dataframe auquel on applique à la colonne PJM_Load_MW la méthode mean (ne prend pas en compte les NaN)
+    :return: retourne le résultat du calcul charge moyenne MW"""
+
+    charge_maximale_MW = dataframe_pic["PJM_Load_MW"].max()
+    return charge_maximale_MW
+
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                                         Fonction de calcul de la charge minimale
+# -------------------------------------------------------------------------------------------------------------------------------- 
+
+def charge_minimale(dataframe_creux : pd.DataFrame) -> float:
+    """L'objectif de cette fonction est de calculer  la charge minimale, en d'autre terme, le creux de charge sur toute la période de notre jeu de donnée (1998 à 2002)
+    :param dataframe_creux: le dataframe auquel on applique à la colonne PJM_Load_MW la méthode mean (ne prend pas en compte les NaN)
+    :return: retourne le résultat du calcul charge moyenne MW"""
+
+    charge_minimale_MW = dataframe_creux["PJM_Load_MW"].min()
+    return charge_minimale_MW
+
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                                         Fonction de conversion en type Datetime
+# -------------------------------------------------------------------------------------------------------------------------------- 
+
+def conversion_en_date(dataframe_a_convertir : pd.DataFrame, format_date : str="%Y-%m-%d %H:%M:%S") -> pd.DataFrame : 
+    """Cette fonction a pour objectif de transformer la colonne datetime de notre fichier csv en type datetime pour pouvoir ensuite l'utiliser dans un graphique matplotlib
+    :param dataframe_a_convertir: DataFrame d’origine contenant une colonne nommée Datetime dont les valeurs sont des chaînes représentant une date et une heure.
+    :param format_date: Spécifie la structure des dates/heures dans la colonne. %Y correspond aux années %m correspond aux mois %d correspond aux jours 
+    %H correspond aux heures %M correspond aux minutes
+    :return: retourne le nouveau dataframe avec la colonne convertie"""
+
+    #Je ne veux pas modifier directement le dataframe d'origne (dataframe_a_convertir) pour éviter d'altérer les données d'origine, donc je fais une copie du dataframe d'origine.
+    df_conversion = dataframe_a_convertir.copy()
+    df_conversion["Datetime"] = pd.to_datetime(df_conversion["Datetime"],format=format_date)
+    return df_conversion
+
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                               Fonction de conversion pour préparation de la date en semaine
+# -------------------------------------------------------------------------------------------------------------------------------- 
+
+def preparation_date_en_semaine(dataframe_prepa_semaine: pd.DataFrame) -> pd.DataFrame : 
+    """L'objectif de la fonction est de convertir df["Datetime"] au type datetime64 et de créer une nouvelle colonne intitulé jour_semaine qui regroupera les jours de la semaine
+    :param dataframe_prepa_semaine: DataFrame comprenant obligatoirement Datetime convertible en type datetime
+    :return: Le même DataFrame **avec deux garanties : Datetime est bien au type datetime et une colonne jour_semaine a été ajoutée."""
+    
+    dataframe_prepa_semaine["Datetime"] = pd.to_datetime(dataframe_prepa_semaine["Datetime"])
+    dataframe_prepa_semaine["jour_semaine"] = dataframe_prepa_semaine["Datetime"].dt.day_name()
+    return dataframe_prepa_semaine
+
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                                                   Fonction pour filtrer par date
+# -------------------------------------------------------------------------------------------------------------------------------- 
+
+def filtrer_par_date(dataframe_filtre_date : pd.DataFrame, debut, fin) -> pd.DataFrame : 
+    """L'objectif de cette fonction est de filtrer un dataFrame entre deux dates incluses et renvoie la sous‐partie triéechronologiquement.
+    :param dataframe_filtre-date: on prend le dataframe d'origine auquel on va ajouter un masque permettant de dessiner les bornes correspondant à notre jeu de donnée
+    :param debut: la variable début qui contient la date à laquelle commence le datset
+    :param fin: la variable fin qui contient la dernière date du dataset
+    :return: retourne une copie du dataframe `df` restreinte à l’intervalle demandé"""
+
+    debut = pd.to_datetime(debut).date()
+    fin = pd.to_datetime(fin).date()
+
+    mask = (dataframe_filtre_date["Datetime"].dt.date >= debut) & (dataframe_filtre_date["Datetime"].dt.date <= fin)
+    selection = dataframe_filtre_date[mask].sort_values("Datetime") 
+
+    return selection
+
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                             Fonction pour ajouter une colonne saison au dataframe
+# -------------------------------------------------------------------------------------------------------------------------------- 
+
+def ajouter_colonne_saison(dataframe_saison : pd.DataFrame, saisons_selectionnees: list[str]) -> pd.DataFrame : 
+    """L'objectif de cette fonction est d'ajouter une colonne « saison » au dataFrame à partir des mois, puis de conserver uniquement les lignes dont la saison figure dans
+    saisons_selectionnees.
+    :param dataframe_saison: on prend le dataframe d'origine dont la colonne datetime est utilisée pour pouvoir déterminer la saison
+    :param saisons_selectionnees: correspond à la liste des saisons à choisir par l'utilisateur, la casse est importante
+    :return: retourne un nouveau dataframe enrichi d'une nouvelle colonne nommée saison et filtrée sur les saisons demandées"""
+
+    saison = {12:"Hiver", 1:"Hiver", 2:"Hiver",
+              3:"Printemps", 4:"Printemps", 5:"Printemps",
+              6:"Eté", 7:"Eté", 8:"Eté",
+              9:"Automne", 10:"Automne", 11:"Automne"}
+    
+    df = dataframe_saison.copy()
+    df["saison"] = df["Datetime"].dt.month.map(saison) 
+    mask = df["saison"].isin(saisons_selectionnees)     
+    
+    return df[mask].sort_values("Datetime")
+
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                             Fonction détecter un pic en fonction d'un seuil donné
+# -------------------------------------------------------------------------------------------------------------------------------- 
+
+def detecter_pic_en_fonction_du_seuil(dataframe_detecter_pic_seuil : pd.DataFrame, seuil_fourni: float) -> pd.DataFrame | None :
+    """L'objectif de cette fonction est de sélectionner les pics de charge en MW dont la valeur dépasse un seuil donné. 
+    :param dataframe_detecter_pic_seuil: dataFrame contenant une colonne numérique PJM_Load_MW représentant la charge en mégawatts auquel on va appliquer le filtre en fonction du seuil fourni
+    :param seuil_fourni: Valeur de seuil choisie par l'utilisateur. Toutes les lignes qui sont supérieure ou égale à ce seuil sont conservées.
+    :return: si la valeur de seuol (seuil_fourni) est inférieur ou égal à 0, on ne retourne rien car ce sont des valeurs impossible. 
+    Sinon, on renvoit le dataframe filtré, le sous ensemble limitée au charges qui sont supérieure ou égales au seuil choisi par l'utilisateur (seuil_fourni)"""
+    if seuil_fourni <= 0 :
+        signaler("Le seuil doit être supérieur à 0")
+        return None
+    else : 
+        pic = dataframe_detecter_pic_seuil[dataframe_detecter_pic_seuil["PJM_Load_MW"] >= seuil_fourni]
+        return pic
+
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                             Fonction pour afficher le top 10 sur le dataset
+# -------------------------------------------------------------------------------------------------------------------------------- 
+
+def afficher_top_10(dataframe_top10 : pd.DataFrame, nb_lignes : int=10) -> pd.DataFrame : 
+    """L'objectif de cette fonction est de sélectionner les 10 premiers enregistrements présentant la charge la plus élevée.
+    :param dataframe_top10: dataFrame contenant la colonne PJM_Load_MW, les autres colonnes sont conservées dans le résultat auquel on applique donc la méthode nlargest pour avoir le top10
+    :param nb_lignes: nombre de lignes à extraire
+    :return: renvoie un sous ensemble du dataframe limité aux 10 lignes présentant les valeurs les plus fortes."""
+
+    top_10 = dataframe_top10.nlargest(nb_lignes, "PJM_Load_MW")
+    return top_10
+
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                             Fonction pour afficher le low 10 sur le dataset
+# -------------------------------------------------------------------------------------------------------------------------------- 
+
+def afficher_low_10(dataframe_low10 : pd.DataFrame, nb_lignes: int=10) -> pd.DataFrame : 
+    """L'objectif de cette fonction est de sélectionner les 10 premiers enregistrements présentant la charge la moins élevée.
+    :param df: dataFrame contenant la colonne PJM_Load_MW, les autres colonnes sont conservées dans le résultat
+    :param n: nombre de lignes à extraire
+    :return: renvoie un sous ensemble du dataframe limité aux 10 lignes présentant les valeurs les moins fortes."""
+
+    low_10 = dataframe_low10.nsmallest(nb_lignes, "PJM_Load_MW")
+    return low_10
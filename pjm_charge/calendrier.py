@@ -0,0 +1,134 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                                   Variables calendaires codées en entiers
+# --------------------------------------------------------------------------------------------------------------------------------
+# Heure, jour de la semaine, mois et saison sont calculés en une seule passe vectorisée à partir des heures depuis l'epoch et
+# rangés en int8 (1 octet par ligne au lieu d'un objet chaîne de caractères). Les libellés ne sont produits qu'à l'affichage.
+
+# Même découpage que ajouter_colonne_saison : décembre à février = Hiver, mars à mai = Printemps, etc.
+SAISONS = ("Hiver", "Printemps", "Eté", "Automne")
+# Même ordre et mêmes libellés que Series.dt.day_name() : lundi = 0
+JOURS_SEMAINE = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+
+def mois_depuis_heures(heures : np.ndarray) -> np.ndarray :
+    """L'objectif de cette fonction est de calculer le mois (1 à 12) de chaque heure, sans passer par des objets datetime python.
+    :param heures: heures depuis l'epoch en int64
+    :return: tableau int8 des mois"""
+
+    mois_epoch = np.asarray(heures, dtype=np.int64).astype("datetime64[h]").astype("datetime64[M]").astype(np.int64)
+    return (mois_epoch % 12 + 1).astype(np.int8)
+
+
+def codes_saison(heures : np.ndarray) -> np.ndarray :
+    """L'objectif de cette fonction est de donner le code de saison de chaque heure (position dans SAISONS).
+    :param heures: heures depuis l'epoch en int64
+    :return: tableau int8 : 0 = Hiver, 1 = Printemps, 2 = Eté, 3 = Automne"""
+
+    return ((mois_depuis_heures(heures) % 12) // 3).astype(np.int8)
+
+
+def codes_depuis_noms(saisons_selectionnees : list[str] | None) -> list[int] :
+    """L'objectif de cette fonction est de traduire une liste de noms de saisons en codes, la casse est importante comme dans ajouter_colonne_saison.
+    :param saisons_selectionnees: liste de noms parmi SAISONS, None pour toutes les saisons
+    :return: liste triée des codes de saison (les noms inconnus sont ignorés, comme avec isin)"""
+
+    if saisons_selectionnees is None :
+        return list(range(len(SAISONS)))
+    return sorted({SAISONS.index(nom) for nom in saisons_selectionnees if nom in SAISONS})
+
+
+@dataclass(eq=False)
+class CalendrierCodes :
+    """Variables calendaires en int8 alignées sur un IndexTemporel, et découpage des lignes triées en segments d'une seule saison."""
+
+    heure : np.ndarray
+    jour_semaine : np.ndarray
+    mois : np.ndarray
+    saison : np.ndarray
+    debuts_segments : np.ndarray
+    fins_segments : np.ndarray
+    saison_segments : np.ndarray
+
+    @classmethod
+    def depuis_heures(cls, heures : np.ndarray) -> "CalendrierCodes" :
+        """L'objectif de cette méthode est de calculer toutes les variables calendaires en une passe, à partir des heures depuis l'epoch.
+        :param heures: heures depuis l'epoch en int64, triées (sinon les segments de saison sont simplement plus nombreux)
+        :return: les codes calendaires"""
+
+        heures = np.asarray(heures, dtype=np.int64)
+        jours = heures // 24
+        heure = (heures - jours * 24).astype(np.int8)
+        # Le 1er janvier 1970 était un jeudi (code 3)
+        jour_semaine = ((jours + 3) % 7).astype(np.int8)
+        mois = mois_depuis_heures(heures)
+        saison = ((mois % 12) // 3).astype(np.int8)
+
+        # Segments de saison : positions où la saison change dans les données triées (environ quatre par an)
+        changements = np.flatnonzero(saison[1:] != saison[:-1]) + 1
+        debuts = np.concatenate(([0], changements)).astype(np.int64) if saison.size else np.zeros(0, dtype=np.int64)
+        fins = np.concatenate((changements, [saison.size])).astype(np.int64) if saison.size else np.zeros(0, dtype=np.int64)
+        return cls(heure, jour_semaine, mois, saison, debuts, fins, saison[debuts])
+
+    def plages_saison(self, code : int) -> tuple[np.ndarray, np.ndarray] :
+        """L'objectif de cette méthode est de donner la liste des plages de lignes qui appartiennent à une saison.
+        :param code: code de la saison (position dans SAISONS)
+        :return: un tuple (debuts, fins) : la saison couvre les lignes [debuts[k], fins[k]) pour chaque k"""
+
+        garder = self.saison_segments == code
+        return self.debuts_segments[garder], self.fins_segments[garder]
+
+    def plages(self, i : int, j : int, saisons : list[int] | None = None) -> list[tuple[int, int]] :
+        """L'objectif de cette méthode est de découper la plage [i, j) en plages contiguës qui ne contiennent que les saisons demandées.
+        :param i: début de la plage (inclus)
+        :param j: fin de la plage (exclue)
+        :param saisons: codes de saison à garder (voir SAISONS), None pour toutes
+        :return: liste de plages (a, b) disjointes et triées"""
+
+        if j <= i :
+            return []
+        if saisons is None or set(saisons) >= set(range(len(SAISONS))) :
+            return [(i, j)]
+
+        premier = int(np.searchsorted(self.fins_segments, i, side="right"))
+        dernier = int(np.searchsorted(self.debuts_segments, j, side="left"))
+        garder = np.isin(self.saison_segments[premier:dernier], list(saisons))
+        debuts = np.maximum(self.debuts_segments[premier:dernier][garder], i)
+        fins = np.minimum(self.fins_segments[premier:dernier][garder], j)
+
+        # On recolle les segments voisins (par exemple Hiver puis Printemps quand les deux sont sélectionnés)
+        resultat = []
+        for a, b in zip(debuts.tolist(), fins.tolist()) :
+            if resultat and resultat[-1][1] == a :
+                resultat[-1] = (resultat[-1][0], b)
+            else :
+                resultat.append((a, b))
+        return resultat
+
+    def masque(self, saisons : list[int] | None = None) -> np.ndarray :
+        """L'objectif de cette méthode est de donner le masque booléen des lignes des saisons demandées, pour les traitements qui en ont besoin.
+        :param saisons: codes de saison à garder, None pour toutes
+        :return: tableau booléen aligné sur l'index"""
+
+        if saisons is None :
+            return np.ones(self.saison.size, dtype=bool)
+        # Un bit par saison : la sélection devient un simple test de bit sur chaque code
+        bits = np.uint8(sum(1 << code for code in saisons))
+        return (np.left_shift(np.uint8(1), self.saison.astype(np.uint8)) & bits) != 0
+
+
+def ajouter_libelles(dataframe : pd.DataFrame, calendrier : CalendrierCodes) -> pd.DataFrame :
+    """L'objectif de cette fonction est de produire, au moment de l'affichage seulement, les colonnes jour_semaine et saison d'un extrait.
+    :param dataframe: extrait de index.dataframe (son index donne la position de chaque ligne dans l'index temporel)
+    :param calendrier: les codes calendaires de l'index
+    :return: une copie superficielle de l'extrait avec jour_semaine et saison en colonnes catégorielles (codes int8 + libellés)"""
+
+    positions = dataframe.index.to_numpy()
+    resultat = dataframe.copy(deep=False)
+    resultat["jour_semaine"] = pd.Categorical.from_codes(calendrier.jour_semaine[positions], categories=list(JOURS_SEMAINE))
+    resultat["saison"] = pd.Categorical.from_codes(calendrier.saison[positions], categories=list(SAISONS))
+    return resultat
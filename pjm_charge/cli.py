@@ -0,0 +1,125 @@
+import argparse
+import datetime
+import json
+import math
+import sys
+
+import numpy as np
+
+from .agregats import AgregatsCharge
+from .calendrier import SAISONS, CalendrierCodes, codes_depuis_noms
+from .index_temporel import IndexTemporel
+from .ingestion import FORMAT_DATE_DEFAUT, charger_colonnes
+from .pics import IndexValeurs, detecter_episodes
+from .topk import MoteurTopK
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                         Ligne de commande : indicateurs, top / low N et épisodes de pic en JSON
+# --------------------------------------------------------------------------------------------------------------------------------
+# python -m pjm_charge --debut 2000-06-01 --fin 2000-08-31 --saisons Eté --nb 10 --seuil 45000
+# Les calculs sont ceux du dashboard (mêmes structures précalculées), sans streamlit ni matplotlib : le résultat est écrit en JSON
+# sur la sortie standard pour être repris par une tâche batch.
+
+
+def _valeur_json(valeur) :
+    # Dates en ISO 8601, scalaires numpy en types python, NaN en null (le JSON n'a pas de NaN)
+    if valeur is None :
+        return None
+    if hasattr(valeur, "isoformat") :
+        return valeur.isoformat()
+    if isinstance(valeur, np.generic) :
+        valeur = valeur.item()
+    if isinstance(valeur, float) and math.isnan(valeur) :
+        return None
+    return valeur
+
+
+def _lignes(index : IndexTemporel, positions : np.ndarray) -> list[dict] :
+    heures = np.asarray(index.heures, dtype=np.int64)[positions]
+    charge = np.asarray(index.charge, dtype=np.float64)[positions]
+    return [{"Datetime": _valeur_json(np.datetime64(int(h), "h").astype(datetime.datetime)), "PJM_Load_MW": _valeur_json(c)} for h, c in zip(heures, charge)]
+
+
+def resume_selection(index : IndexTemporel, debut, fin, saisons_selectionnees : list[str] | None = None, nb_lignes : int = 10, seuil : float | None = None) -> dict :
+    """L'objectif de cette fonction est de rassembler, pour une période et des saisons, tout ce que montre le dashboard sous une forme sérialisable en JSON.
+    :param index: l'index temporel trié
+    :param debut: premier jour conservé
+    :param fin: dernier jour conservé
+    :param saisons_selectionnees: noms de saisons (Hiver, Printemps, Eté, Automne), None pour toutes
+    :param nb_lignes: nombre de lignes du top et du low
+    :param seuil: seuil des épisodes de pic en MW, None pour ne pas les calculer
+    :return: un dictionnaire avec les clés selection, indicateurs, top, low et episodes"""
+
+    calendrier = CalendrierCodes.depuis_heures(index.heures)
+    agregats = AgregatsCharge(index, calendrier)
+    plages = calendrier.plages(*index.bornes(debut, fin), codes_depuis_noms(saisons_selectionnees))
+    indicateurs = agregats.indicateurs_periode(debut, fin, saisons_selectionnees)
+
+    moteur = MoteurTopK(index, nb_max=nb_lignes)
+    episodes = None
+    if seuil is not None :
+        tableau = detecter_episodes(IndexValeurs(index), seuil, plages)
+        episodes = [{colonne: _valeur_json(valeur) for colonne, valeur in ligne.items()} for ligne in tableau.to_dict("records")]
+
+    return {
+        "selection": {
+            "debut": _valeur_json(debut),
+            "fin": _valeur_json(fin),
+            "saisons": list(saisons_selectionnees) if saisons_selectionnees is not None else list(SAISONS),
+            "nb_heures": indicateurs.nb_heures,
+        },
+        "indicateurs": {
+            "charge_totale_MW": _valeur_json(indicateurs.total),
+            "charge_moyenne_MW": _valeur_json(indicateurs.moyenne),
+            "charge_maximale_MW": _valeur_json(indicateurs.maximum),
+            "heure_maximum": _valeur_json(indicateurs.heure_maximum),
+            "charge_minimale_MW": _valeur_json(indicateurs.minimum),
+            "heure_minimum": _valeur_json(indicateurs.heure_minimum),
+        },
+        "top": _lignes(index, moteur.plus_fortes(plages, nb_lignes)),
+        "low": _lignes(index, moteur.plus_faibles(plages, nb_lignes)),
+        "episodes": episodes,
+    }
+
+
+def _jour(texte : str) -> datetime.date :
+    try :
+        return datetime.date.fromisoformat(texte)
+    except ValueError :
+        raise argparse.ArgumentTypeError(f"date attendue au format AAAA-MM-JJ : {texte}")
+
+
+def main(arguments : list[str] | None = None) -> int :
+    parser = argparse.ArgumentParser(prog="python -m pjm_charge", description="Indicateurs, top / low N et épisodes de pic d'une sélection du fichier PJM, en JSON.")
+    parser.add_argument("--fichier", default="PJM_Load_hourly.csv", help="fichier csv Datetime,PJM_Load_MW")
+    parser.add_argument("--debut", type=_jour, help="premier jour (AAAA-MM-JJ), le début des données par défaut")
+    parser.add_argument("--fin", type=_jour, help="dernier jour inclus (AAAA-MM-JJ), la fin des données par défaut")
+    parser.add_argument("--saisons", nargs="+", choices=SAISONS, help="saisons conservées, toutes par défaut")
+    parser.add_argument("--nb", type=int, default=10, help="nombre de lignes du top et du low")
+    parser.add_argument("--seuil", type=float, help="seuil des épisodes de pic en MW (pas d'épisodes si absent)")
+    parser.add_argument("--dossier-cache", help="dossier du cache binaire, .cache_pjm à côté du csv par défaut")
+    parser.add_argument("--format-date", default=FORMAT_DATE_DEFAUT)
+    parser.add_argument("--indent", type=int, help="indentation du JSON (une seule ligne par défaut)")
+    args = parser.parse_args(arguments)
+
+    if args.nb <= 0 :
+        parser.error("--nb doit être supérieur à 0")
+    if args.seuil is not None and args.seuil <= 0 :
+        parser.error("--seuil doit être supérieur à 0")
+
+    try :
+        heures, charge = charger_colonnes(args.fichier, args.dossier_cache, args.format_date)
+    except FileNotFoundError :
+        print(f"Fichier introuvable : {args.fichier}", file=sys.stderr)
+        return 1
+    index = IndexTemporel.depuis_colonnes(heures, charge)
+    if len(index) == 0 :
+        print(f"Aucune ligne dans {args.fichier}", file=sys.stderr)
+        return 1
+
+    debut = args.debut or np.datetime64(int(index.heures[0]), "h").astype(datetime.datetime).date()
+    fin = args.fin or np.datetime64(int(index.heures[-1]), "h").astype(datetime.datetime).date()
+    resume = resume_selection(index, debut, fin, args.saisons, args.nb, args.seuil)
+    json.dump(resume, sys.stdout, ensure_ascii=False, indent=args.indent)
+    sys.stdout.write("\n")
+    return 0
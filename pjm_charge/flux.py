@@ -0,0 +1,248 @@
+import io
+import os
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from .histogramme import NB_CLASSES_DEFAUT
+from .index_temporel import IndexTemporel
+from .ingestion import FORMAT_DATE_DEFAUT, analyser_csv, charger_colonnes, lire_meta_cache
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                             Lecture incrémentale d'un fichier csv qui grossit heure après heure
+# --------------------------------------------------------------------------------------------------------------------------------
+# Le lecteur retient la position (en octets) de la fin de la dernière ligne complète lue. À chaque appel, il ne lit que les octets
+# ajoutés depuis, vérifie les nouvelles heures (croissantes, sans doublon, trous signalés), les ajoute au bout de ses tableaux
+# (réservés avec de la marge pour éviter une copie à chaque ajout) et met à jour les agrégats courants sans relire l'historique.
+# Le premier chargement passe par le cache binaire (.npy déjà triés) quand il est à jour, plutôt que de relire le texte.
+# Une ligne dont l'heure est antérieure à la dernière heure reçue n'est pas intégrée : elle est mise de côté dans le rapport
+# (hors_ordre) et la lecture continue après elle, pour ne pas bloquer le suivi sur les mêmes octets à chaque appel.
+
+
+@dataclass
+class AgregatsCourants :
+    """Somme, nombre, pic, creux et histogramme (sur des classes fixes) de toutes les heures reçues jusqu'ici."""
+
+    bords : np.ndarray
+    total : float = 0.0
+    nb_heures : int = 0
+    maximum : float = -np.inf
+    heure_maximum : int | None = None
+    minimum : float = np.inf
+    heure_minimum : int | None = None
+    comptes : np.ndarray | None = None
+    # Heures dont la charge sort des bords fixés au premier chargement : elles ne sont dans aucune classe de l'histogramme
+    hors_classes : int = 0
+
+    def __post_init__(self) -> None :
+        if self.comptes is None :
+            self.comptes = np.zeros(self.bords.size - 1, dtype=np.int64)
+
+    def ajouter(self, heures : np.ndarray, charge : np.ndarray) -> None :
+        """L'objectif de cette méthode est d'intégrer de nouvelles heures aux agrégats, sans revenir sur les précédentes.
+        :param heures: heures depuis l'epoch des nouvelles lignes
+        :param charge: charges des nouvelles lignes (les NaN sont ignorés)"""
+
+        renseignee = ~np.isnan(charge)
+        if not renseignee.any() :
+            return
+        heures, charge = heures[renseignee], charge[renseignee]
+
+        self.total += float(charge.sum())
+        self.nb_heures += int(charge.size)
+        # En cas d'égalité on garde la première heure atteinte, comme idxmax / idxmin
+        position = int(np.argmax(charge))
+        if charge[position] > self.maximum :
+            self.maximum, self.heure_maximum = float(charge[position]), int(heures[position])
+        position = int(np.argmin(charge))
+        if charge[position] < self.minimum :
+            self.minimum, self.heure_minimum = float(charge[position]), int(heures[position])
+
+        dans_bornes = (charge >= self.bords[0]) & (charge <= self.bords[-1])
+        self.hors_classes += int(np.count_nonzero(~dans_bornes))
+        classes = np.clip(np.searchsorted(self.bords, charge[dans_bornes], side="right") - 1, 0, self.comptes.size - 1)
+        self.comptes += np.bincount(classes, minlength=self.comptes.size)
+
+    @property
+    def moyenne(self) -> float :
+        return self.total / self.nb_heures if self.nb_heures else np.nan
+
+
+@dataclass(frozen=True)
+class RapportAjout :
+    """Résultat d'une lecture : lignes lues et ajoutées, doublons et heures hors ordre écartés, heures manquantes détectées."""
+
+    nb_lues : int
+    nb_ajoutees : int
+    doublons : np.ndarray
+    hors_ordre : np.ndarray
+    nb_heures_manquantes : int
+    trous : list[tuple[int, int]]
+
+
+def _rapport_vide() -> RapportAjout :
+    vide = np.zeros(0, dtype=np.int64)
+    return RapportAjout(0, 0, vide, vide, 0, [])
+
+
+class LecteurIncremental :
+    """Suit un fichier csv Datetime,PJM_Load_MW auquel on ajoute des lignes à la fin. Un même lecteur peut être partagé entre plusieurs
+    threads (sessions streamlit) : les lectures et les instantanés sont protégés par un verrou."""
+
+    def __init__(self, chemin : str | os.PathLike, format_date : str = FORMAT_DATE_DEFAUT, bords : np.ndarray | None = None, nb_classes : int = NB_CLASSES_DEFAUT, capacite : int = 1024, dossier_cache : str | os.PathLike | None = None, depuis_cache : bool = True) -> None :
+        self.chemin = chemin
+        self.format_date = format_date
+        self.nb_classes = nb_classes
+        self.dossier_cache = dossier_cache
+        self.depuis_cache = depuis_cache
+        self._bords = bords
+        self._capacite = capacite
+        self._verrou = threading.RLock()
+        self._heures = np.empty(capacite, dtype=np.int64)
+        self._charge = np.empty(capacite, dtype=np.float64)
+        self.nb_lignes = 0
+        self.position_octets = 0
+        self.agregats : AgregatsCourants | None = None
+        # Augmente à chaque changement des données (lignes ajoutées, fichier relu depuis le début) : sert de clé aux caches du dashboard
+        self.version = 0
+        # Index de la version courante, gardé pour que son dataframe (construit à la demande) serve à toutes les interactions
+        self._index : IndexTemporel | None = None
+        self._version_index = -1
+
+    @property
+    def heures(self) -> np.ndarray :
+        return self._heures[: self.nb_lignes]
+
+    @property
+    def charge(self) -> np.ndarray :
+        return self._charge[: self.nb_lignes]
+
+    def index(self) -> IndexTemporel :
+        """L'index temporel des lignes reçues (vues sur les tableaux du lecteur, déjà triées), le même objet tant que la version ne change pas."""
+
+        with self._verrou :
+            if self._index is None or self._version_index != self.version :
+                self._index, self._version_index = IndexTemporel(self.heures, self.charge), self.version
+            return self._index
+
+    def instantane(self) -> tuple[int, IndexTemporel] :
+        """L'objectif de cette méthode est de donner, de façon cohérente, la version des données et l'index des lignes reçues.
+        :return: un tuple (version, index). L'index est fait de vues sur les tableaux du lecteur : les ajouts suivants s'écrivent après
+        ses lignes (ou dans de nouveaux tableaux), il ne change donc plus. Il est réutilisé tant que la version est la même"""
+
+        with self._verrou :
+            return self.version, self.index()
+
+    def _etendre(self, heures : np.ndarray, charge : np.ndarray) -> None :
+        # Capacité doublée quand elle est atteinte : un ajout coûte en moyenne O(taille de l'ajout), pas O(taille de l'historique)
+        besoin = self.nb_lignes + heures.size
+        if besoin > self._heures.size :
+            capacite = max(2 * self._heures.size, besoin)
+            for nom in ("_heures", "_charge") :
+                ancien = getattr(self, nom)
+                nouveau = np.empty(capacite, dtype=ancien.dtype)
+                nouveau[: self.nb_lignes] = ancien[: self.nb_lignes]
+                setattr(self, nom, nouveau)
+        self._heures[self.nb_lignes:besoin] = heures
+        self._charge[self.nb_lignes:besoin] = charge
+        self.nb_lignes = besoin
+
+    def _lire_octets(self) -> bytes :
+        with open(self.chemin, "rb") as fichier :
+            fichier.seek(self.position_octets)
+            donnees = fichier.read()
+        # On s'arrête à la dernière ligne complète, une ligne en cours d'écriture sera lue au prochain appel
+        fin = donnees.rfind(b"\n") + 1
+        return donnees[:fin]
+
+    def _lire_cache(self) -> tuple[np.ndarray, np.ndarray, int] | None :
+        # Colonnes du cache binaire (reconstruit s'il ne correspond plus au csv) et taille du csv qu'elles couvrent. Si le fichier ne
+        # finissait pas par une ligne complète quand le cache a été construit, on relit le texte pour ne pas garder une ligne tronquée
+        heures, charge = charger_colonnes(self.chemin, self.dossier_cache, self.format_date)
+        taille = int(lire_meta_cache(self.chemin, self.dossier_cache)["taille"])
+        if taille == 0 :
+            return None
+        with open(self.chemin, "rb") as fichier :
+            fichier.seek(taille - 1)
+            if fichier.read(1) != b"\n" :
+                return None
+        return heures, charge, taille
+
+    def reinitialiser(self) -> None :
+        """Oublie tout ce qui a été lu (les bords de l'histogramme fournis au départ sont conservés). De nouveaux tableaux sont réservés :
+        les index déjà donnés par instantane() gardent leurs lignes."""
+
+        with self._verrou :
+            self._heures = np.empty(self._capacite, dtype=np.int64)
+            self._charge = np.empty(self._capacite, dtype=np.float64)
+            self.nb_lignes = 0
+            self.position_octets = 0
+            self.agregats = None
+            self.version += 1
+
+    def lire_nouveautes(self) -> RapportAjout :
+        """L'objectif de cette méthode est de lire les lignes ajoutées au fichier depuis le dernier appel et de les intégrer.
+        Au premier appel, tout le fichier est chargé (depuis le cache binaire s'il est à jour, sinon lu et trié : le fichier d'origine n'est
+        pas dans l'ordre chronologique). Ensuite, les lignes ajoutées doivent arriver dans l'ordre : une ligne dont l'heure est antérieure
+        à la dernière heure connue est écartée (rapport.hors_ordre). Si le fichier a rétréci, il a été remplacé : on repart du début.
+        Une ligne illisible lève une ValueError sans rien intégrer ; reinitialiser() permet alors de tout relire.
+        :return: le rapport de la lecture (lignes ajoutées, doublons et lignes hors ordre écartés, heures manquantes)"""
+
+        with self._verrou :
+            if os.path.getsize(self.chemin) < self.position_octets :
+                self.reinitialiser()
+            # Calculé après le contrôle de taille : après une remise à zéro, la relecture repart de la ligne d'en-tête
+            premier_appel = self.position_octets == 0
+
+            if premier_appel and self.depuis_cache :
+                colonnes = self._lire_cache()
+                if colonnes is not None :
+                    heures, charge, taille = colonnes
+                    return self._integrer(np.asarray(heures), np.asarray(charge), taille, trier=False)
+
+            donnees = self._lire_octets()
+            if not donnees.strip() :
+                self.position_octets += len(donnees)
+                return _rapport_vide()
+            heures, charge = analyser_csv(io.BytesIO(donnees), self.format_date, avec_entete=premier_appel)
+            return self._integrer(heures, charge, len(donnees), trier=premier_appel)
+
+    def _integrer(self, heures : np.ndarray, charge : np.ndarray, nb_octets : int, trier : bool) -> RapportAjout :
+        nb_lues = int(heures.size)
+        if nb_lues == 0 :
+            self.position_octets += nb_octets
+            return _rapport_vide()
+
+        if trier and not bool(np.all(heures[1:] >= heures[:-1])) :
+            ordre = np.argsort(heures, kind="stable")
+            heures, charge = heures[ordre], charge[ordre]
+
+        # Chaque ligne est comparée à la plus grande heure vue avant elle (dernière heure reçue comprise) : plus petite = hors ordre,
+        # égale = doublon, plus grande d'au moins deux = trou. Les lignes écartées ne changent pas ce maximum
+        if self.nb_lignes :
+            precedente = np.maximum.accumulate(np.concatenate(([self.heures[-1]], heures)))[:-1]
+        else :
+            precedente = np.concatenate(([heures[0] - 1], np.maximum.accumulate(heures)[:-1]))
+        ecarts = heures - precedente
+        hors_ordre = heures[ecarts < 0]
+        doublons = heures[ecarts == 0]
+        trous = [(int(a), int(b)) for a, b in zip(precedente[ecarts > 1] + 1, heures[ecarts > 1])]
+        garder = ecarts > 0
+        heures, charge = heures[garder], charge[garder]
+
+        self._etendre(heures, charge)
+        self.position_octets += nb_octets
+        if heures.size :
+            self.version += 1
+
+        if self.agregats is None :
+            bords = self._bords
+            if bords is None :
+                renseignee = charge[~np.isnan(charge)]
+                bas, haut = (float(renseignee.min()), float(renseignee.max())) if renseignee.size else (0.0, 1.0)
+                bords = np.linspace(bas, haut, self.nb_classes + 1)
+            self.agregats = AgregatsCourants(bords)
+        self.agregats.ajouter(heures, charge)
+
+        return RapportAjout(nb_lues, int(heures.size), doublons, hors_ordre, int(sum(b - a for a, b in trous)), trous)
@@ -0,0 +1,109 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from .calculs import detecter_pic_en_fonction_du_seuil
+
+if TYPE_CHECKING :
+    from matplotlib.axes import Axes
+    from matplotlib.figure import Figure
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                               Fonctions de tracé du devoir maison (matplotlib importé à l'appel)
+# --------------------------------------------------------------------------------------------------------------------------------
+# matplotlib n'est importé qu'à l'intérieur des fonctions : importer le paquet pour faire des calculs ne charge pas matplotlib.
+
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                               Fonction pour tracer le premier graphique - vue d'ensemble
+# -------------------------------------------------------------------------------------------------------------------------------- 
+
+def tracer_vue_ensemble(dataframe_pour_vue_ensemble: pd.DataFrame,title: str = "Vue d'ensemble de la charge PJM en MW de 1998 à 2001", xlabel : str = "Date", ylabel : str = "charge en MW") -> "Figure":
+    """L'objectif de cette fonction est de s'occuper de la partie traçage du graphique contenue dans une dataframe qui montre une vue d'ensemble de la charge PJM en MW de 1998 à 2001
+    :param dataframe_pour_vue_ensemble: le dataframe devant contenir les informations nécessaire à la construction de notre graphique (ici des dates et la charge en megaWatts)
+    :param y: on place sur cette axe y les valeurs de la colonne PJM_Load_MW
+    :param title: titre du graphique 
+    :param xlabel: libellé de l'axe x, à savoir la date
+    :param ylabel: libellé de l'axe y, à savoir la charge en MW
+    :return: La figure Matplotlib créée. Elle n'est plus dessinée dans l'état global de plt : c'est à l'appelant de l'afficher puis de la fermer (voir figure_en_octets)"""
+
+    import matplotlib.pyplot as plt
+
+    figure, axe = plt.subplots(figsize=(8, 4))
+    axe.plot(dataframe_pour_vue_ensemble["Datetime"], dataframe_pour_vue_ensemble["PJM_Load_MW"], lw=0.4) # je rend la ligne plus fine avec line width (lw) car sinon le graphique n'est pas très lisible...
+    axe.set_title(title)
+    axe.set_xlabel(xlabel)
+    axe.set_ylabel(ylabel)
+    return figure
+
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                     Fonction pour tracer le deuxième graphique - distribution de la charge électrique
+# -------------------------------------------------------------------------------------------------------------------------------- 
+
+def tracer_distibution_charge(dataframe_pour_distribution: pd.DataFrame, title : str = "Distribution de la charge électrique horaire (MW)", xlabel : str = "charge en MW", ylabel : str = "Fréquence") -> "Figure" : 
+    """L'objectif de cette fonction est de s'occuper de la partie traçage du graphique qui montre la distribution de la charge horaire sur la période donnée (possibilité de jouer avec les dates sur streamlit)
+    :param dataframe_pour_distribution: le dataframe qui contient toutes les informations nécessaire à la construction de notre graphique ici PJM_Load_MW
+    :param title: titre du graphique 
+    :param xlabel: libellé de l'axe x, à savoir la charge en MW
+    :param ylabel: libellé de l'axe y, à savoir la fréquence à laquelle chaque valeur apparaît dans le jeu de données 
+    :return: La figure matplotlib créée, à afficher puis fermer par l'appelant"""
+
+    import matplotlib.pyplot as plt
+
+    figure, axe = plt.subplots(figsize=(8, 4))
+    axe.hist(dataframe_pour_distribution["PJM_Load_MW"], bins=80)
+    axe.set_title(title)
+    axe.set_xlabel(xlabel)
+    axe.set_ylabel(ylabel)
+    return figure
+
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                     Fonction pour tracer la distribution à partir d'un histogramme déjà calculé
+# -------------------------------------------------------------------------------------------------------------------------------- 
+
+def tracer_histogramme(comptes : np.ndarray, bords : np.ndarray, title : str = "Distribution de la charge électrique horaire (MW)", xlabel : str = "charge en MW", ylabel : str = "Fréquence") -> "Figure" :
+    """L'objectif de cette fonction est de tracer le même graphique que tracer_distibution_charge à partir de comptes déjà calculés (par exemple avec le cube d'histogrammes), sans reclasser les heures.
+    :param comptes: nombre d'heures dans chaque classe
+    :param bords: bords des classes (un de plus que de comptes)
+    :param title: titre du graphique
+    :param xlabel: libellé de l'axe x, à savoir la charge en MW
+    :param ylabel: libellé de l'axe y, à savoir le nombre d'heures dans chaque classe
+    :return: La figure matplotlib créée, à afficher puis fermer par l'appelant"""
+
+    import matplotlib.pyplot as plt
+
+    figure, axe = plt.subplots(figsize=(8, 4))
+    axe.stairs(comptes, bords, fill=True)
+    axe.set_title(title)
+    axe.set_xlabel(xlabel)
+    axe.set_ylabel(ylabel)
+    return figure
+
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                             Fonction tracer les pics dépassant un seuil donné
+# -------------------------------------------------------------------------------------------------------------------------------- 
+
+def tracer_pic(dataframe_pour_pic : pd.DataFrame, seuil: float, color: str = "#FF0000",s: int = 20, marker: str = "o", axe : "Axes | None" = None) -> None : 
+    """L'objectif de cette fonction est d'afficher, sous forme de nuage de points, les pics de charge de la colonne PJM_Load_MW qui dépassent un seuil donné.
+    :param df: dataframe utilisé contenant les colonnes datetime et PJM_Load_MW
+    :param seuil: La valeur seuil, seuls les enregistrements de la colonne PJM_Load_MW est supérieure ou égale au seuil sont représentés. Si le seuil est inférieur ou égal à 0, la fonction se termine sans rien tracer.
+    :param color: paramètre spécifique utilisé dans matplolib scatter pour spécifier la couleur des nuages de points
+    :param s: paramètre spécifique utilisé dans matplotlib scatter qui signifie size et désigne la taille des nuages de points
+    :param marker: paramètre spécifique utilisé dans matplotlib scatter qui dessine les nuages de points. Ici o, donc les nuages de points seront des o représentés dans le graphique
+    :param axe: les axes sur lesquels tracer, par exemple figure.axes[0] de la figure renvoyée par tracer_vue_ensemble (les axes courants de plt si None)
+    :return: La fonction ne renvoie rien, elle trace simplement des nuages de points, ce qui la rend compatible avec un graphique déjà existant"""
+
+    if seuil <= 0 : 
+        return None
+    
+    filtrer_pic = detecter_pic_en_fonction_du_seuil(dataframe_pour_pic, seuil)
+
+    if filtrer_pic is not None and not filtrer_pic.empty : 
+        if axe is None :
+            import matplotlib.pyplot as plt
+            axe = plt.gca()
+        axe.scatter(filtrer_pic["Datetime"], filtrer_pic["PJM_Load_MW"], color = color, s=s , marker = marker)
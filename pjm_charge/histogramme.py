@@ -0,0 +1,96 @@
+import numpy as np
+
+from .index_temporel import IndexTemporel
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                             Cube d'histogrammes journaliers pour la distribution de la charge
+# --------------------------------------------------------------------------------------------------------------------------------
+# Les bords des classes sont fixés une fois pour toutes sur l'ensemble du jeu de données. On compte, pour chaque jour, combien
+# d'heures tombent dans chaque classe, puis on cumule ces comptes jour après jour. L'histogramme d'une plage de jours est alors la
+# différence de deux lignes du cumul, sans relire les données brutes. Les quantiles (P50, P95, P99...) se lisent sur ces mêmes comptes.
+
+NB_CLASSES_DEFAUT = 80
+
+
+class CubeHistogramme :
+    """Comptes cumulés par jour et par classe de charge, alignés sur un IndexTemporel."""
+
+    def __init__(self, index : IndexTemporel, nb_classes : int = NB_CLASSES_DEFAUT) -> None :
+        self.index = index
+        charge = np.asarray(index.charge, dtype=np.float64)
+        renseignee = ~np.isnan(charge)
+
+        if renseignee.any() :
+            bas, haut = float(np.min(charge[renseignee])), float(np.max(charge[renseignee]))
+        else :
+            bas, haut = 0.0, 1.0
+        if bas == haut :
+            bas, haut = bas - 0.5, haut + 0.5
+        self.bords = np.linspace(bas, haut, nb_classes + 1)
+
+        # Classe de chaque heure (la dernière classe inclut son bord droit, comme np.histogram), -1 pour les NaN
+        classes = np.clip(np.searchsorted(self.bords, charge, side="right") - 1, 0, nb_classes - 1)
+        self.classes = np.where(renseignee, classes, -1).astype(np.int16 if nb_classes < 2**15 else np.int32)
+
+        # Première ligne de chaque jour dans les données triées, suivie de n : le jour d couvre les lignes [debuts_jours[d], debuts_jours[d + 1])
+        jours = np.asarray(index.heures, dtype=np.int64) // 24
+        nouveau_jour = np.concatenate(([True], jours[1:] != jours[:-1])) if jours.size else np.zeros(0, dtype=bool)
+        self.debuts_jours = np.concatenate((np.flatnonzero(nouveau_jour), [jours.size])).astype(np.int64)
+        numero_jour = np.cumsum(nouveau_jour) - 1
+        nb_jours = self.debuts_jours.size - 1
+
+        type_compte = np.int32 if charge.size < 2**31 else np.int64
+        comptes_jour = np.bincount(
+            numero_jour[renseignee] * nb_classes + self.classes[renseignee],
+            minlength=nb_jours * nb_classes,
+        ).reshape(nb_jours, nb_classes)
+        self.cumul = np.zeros((nb_jours + 1, nb_classes), dtype=type_compte)
+        np.cumsum(comptes_jour, axis=0, out=self.cumul[1:])
+
+    @property
+    def nb_classes(self) -> int :
+        return self.bords.size - 1
+
+    def _comptes_bruts(self, i : int, j : int) -> np.ndarray :
+        classes = self.classes[i:j]
+        return np.bincount(classes[classes >= 0], minlength=self.nb_classes)
+
+    def comptes(self, plages : list[tuple[int, int]]) -> np.ndarray :
+        """L'objectif de cette méthode est de donner l'histogramme des lignes comprises dans une liste de plages.
+        :param plages: liste de plages (a, b) de positions dans l'index, par exemple celles de CalendrierCodes.plages
+        :return: tableau int64 du nombre d'heures par classe (les classes sont décrites par self.bords)"""
+
+        total = np.zeros(self.nb_classes, dtype=np.int64)
+        for a, b in plages :
+            if b <= a :
+                continue
+            # Jours entièrement compris dans [a, b) : différence de deux lignes du cumul. Les bouts qui ne couvrent pas un jour
+            # entier sont comptés directement (ils sont vides pour les plages de l'index, qui commencent et finissent sur des jours)
+            jour_a = int(np.searchsorted(self.debuts_jours, a, side="left"))
+            jour_b = int(np.searchsorted(self.debuts_jours, b, side="right")) - 1
+            if jour_a <= jour_b :
+                total += self.cumul[jour_b] - self.cumul[jour_a]
+                total += self._comptes_bruts(a, int(self.debuts_jours[jour_a]))
+                total += self._comptes_bruts(int(self.debuts_jours[jour_b]), b)
+            else :
+                total += self._comptes_bruts(a, b)
+        return total
+
+    def quantiles(self, comptes : np.ndarray, probabilites : list[float]) -> np.ndarray :
+        """L'objectif de cette méthode est d'estimer des quantiles de la charge à partir d'un histogramme du cube.
+        :param comptes: histogramme renvoyé par comptes()
+        :param probabilites: probabilités voulues entre 0 et 1, par exemple [0.5, 0.95, 0.99]
+        :return: les quantiles en MW, interpolés linéairement dans la classe concernée (précision : la largeur d'une classe), NaN si l'histogramme est vide"""
+
+        probabilites = np.asarray(probabilites, dtype=np.float64)
+        n = int(comptes.sum())
+        if n == 0 :
+            return np.full(probabilites.shape, np.nan)
+
+        cumul = np.cumsum(comptes)
+        cible = probabilites * n
+        classe = np.clip(np.searchsorted(cumul, cible, side="left"), 0, self.nb_classes - 1)
+        avant = np.where(classe > 0, cumul[classe - 1], 0)
+        dans_classe = np.maximum(comptes[classe], 1)
+        fraction = np.clip((cible - avant) / dans_classe, 0.0, 1.0)
+        return self.bords[classe] + fraction * (self.bords[classe + 1] - self.bords[classe])
@@ -0,0 +1,226 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from .ingestion import FORMAT_DATE_DEFAUT
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                       Statistiques en un seul passage et en mémoire bornée sur de très gros fichiers
+# --------------------------------------------------------------------------------------------------------------------------------
+# Le fichier est lu par morceaux de taille fixe. Chaque morceau met à jour un petit état (somme, nombre, pic et creux avec leur
+# heure, histogramme sur des classes fixes, top / low k) puis est oublié : la mémoire utilisée ne dépend pas de la taille du
+# fichier. Ces états se fusionnent, ce qui permet de traiter plusieurs fichiers (ou zones) en parallèle dans un pool de processus.
+
+TAILLE_MORCEAU_DEFAUT = 1_000_000
+LARGEUR_CLASSE_DEFAUT = 100.0
+NB_TOP_DEFAUT = 10
+
+
+def _garder_meilleures(charges : np.ndarray, heures : np.ndarray, nb : int, plus_grandes : bool) -> tuple[np.ndarray, np.ndarray] :
+    """Garde les nb meilleures charges, les égalités étant départagées par l'heure la plus ancienne (comme nlargest sur des données triées)."""
+
+    cles = -charges if plus_grandes else charges
+    ordre = np.lexsort((heures, cles))[:nb]
+    return charges[ordre], heures[ordre]
+
+
+@dataclass
+class StatistiquesCharge :
+    """État fusionnable des statistiques d'un ou plusieurs fichiers.
+    Histogramme : si bords est fourni, classes fixes données (les valeurs hors bords sont comptées dans hors_classes) ;
+    sinon classes de largeur largeur_classe alignées sur 0 MW, étendues au fil de la lecture."""
+
+    nb_top : int = NB_TOP_DEFAUT
+    largeur_classe : float = LARGEUR_CLASSE_DEFAUT
+    bords : np.ndarray | None = None
+    total : float = 0.0
+    nb_heures : int = 0
+    maximum : float = -np.inf
+    heure_maximum : int | None = None
+    minimum : float = np.inf
+    heure_minimum : int | None = None
+    premiere_classe : int = 0
+    comptes : np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    hors_classes : int = 0
+    top_charges : np.ndarray = field(default_factory=lambda: np.zeros(0))
+    top_heures : np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    low_charges : np.ndarray = field(default_factory=lambda: np.zeros(0))
+    low_heures : np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+
+    def __post_init__(self) -> None :
+        if self.bords is not None and self.comptes.size == 0 :
+            self.comptes = np.zeros(self.bords.size - 1, dtype=np.int64)
+
+    def _retenir_extremes(self, maximum : float, heure_maximum : int, minimum : float, heure_minimum : int) -> None :
+        # À valeur égale, on garde l'heure la plus ancienne, comme idxmax / idxmin sur les données triées
+        if self.heure_maximum is None or (maximum, -heure_maximum) > (self.maximum, -self.heure_maximum) :
+            self.maximum, self.heure_maximum = maximum, heure_maximum
+        if self.heure_minimum is None or (minimum, heure_minimum) < (self.minimum, self.heure_minimum) :
+            self.minimum, self.heure_minimum = minimum, heure_minimum
+
+    def _ajouter_comptes(self, premiere_classe : int, comptes : np.ndarray) -> None :
+        # Étend le tableau des comptes pour couvrir [premiere_classe, premiere_classe + len(comptes)) puis les ajoute
+        if comptes.size == 0 :
+            return
+        if self.comptes.size == 0 :
+            self.premiere_classe, self.comptes = premiere_classe, comptes.astype(np.int64)
+            return
+        debut = min(self.premiere_classe, premiere_classe)
+        fin = max(self.premiere_classe + self.comptes.size, premiere_classe + comptes.size)
+        etendus = np.zeros(fin - debut, dtype=np.int64)
+        etendus[self.premiere_classe - debut : self.premiere_classe - debut + self.comptes.size] += self.comptes
+        etendus[premiere_classe - debut : premiere_classe - debut + comptes.size] += comptes
+        self.premiere_classe, self.comptes = debut, etendus
+
+    def ajouter_morceau(self, heures : np.ndarray, charge : np.ndarray) -> None :
+        """L'objectif de cette méthode est d'intégrer un morceau de lignes à l'état courant.
+        :param heures: heures depuis l'epoch des lignes du morceau
+        :param charge: charges du morceau (les NaN sont ignorés, comme par sum, mean, max, min et nlargest)"""
+
+        renseignee = ~np.isnan(charge)
+        heures, charge = np.asarray(heures, dtype=np.int64)[renseignee], np.asarray(charge, dtype=np.float64)[renseignee]
+        if charge.size == 0 :
+            return
+
+        self.total += float(charge.sum())
+        self.nb_heures += int(charge.size)
+
+        # Pic et creux du morceau : les lignes du fichier ne sont pas forcément dans l'ordre, on prend la plus ancienne heure à égalité
+        maximum, minimum = float(charge.max()), float(charge.min())
+        self._retenir_extremes(maximum, int(heures[charge == maximum].min()), minimum, int(heures[charge == minimum].min()))
+
+        if self.bords is not None :
+            dans_bornes = (charge >= self.bords[0]) & (charge <= self.bords[-1])
+            self.hors_classes += int(np.count_nonzero(~dans_bornes))
+            classes = np.clip(np.searchsorted(self.bords, charge[dans_bornes], side="right") - 1, 0, self.comptes.size - 1)
+            self.comptes += np.bincount(classes, minlength=self.comptes.size)
+        else :
+            classes = np.floor(charge / self.largeur_classe).astype(np.int64)
+            premiere = int(classes.min())
+            self._ajouter_comptes(premiere, np.bincount(classes - premiere))
+
+        self.top_charges, self.top_heures = _garder_meilleures(np.concatenate((self.top_charges, charge)), np.concatenate((self.top_heures, heures)), self.nb_top, True)
+        self.low_charges, self.low_heures = _garder_meilleures(np.concatenate((self.low_charges, charge)), np.concatenate((self.low_heures, heures)), self.nb_top, False)
+
+    def fusionner(self, autre : "StatistiquesCharge") -> "StatistiquesCharge" :
+        """L'objectif de cette méthode est d'ajouter à cet état les statistiques calculées sur d'autres lignes (un autre fichier, une autre zone).
+        :param autre: état calculé avec les mêmes paramètres (nb_top, largeur_classe ou bords)
+        :return: cet état, mis à jour"""
+
+        if autre.nb_heures == 0 :
+            return self
+        self.total += autre.total
+        self.nb_heures += autre.nb_heures
+        self._retenir_extremes(autre.maximum, autre.heure_maximum, autre.minimum, autre.heure_minimum)
+
+        if self.bords is not None :
+            self.comptes += autre.comptes
+            self.hors_classes += autre.hors_classes
+        else :
+            self._ajouter_comptes(autre.premiere_classe, autre.comptes)
+
+        self.top_charges, self.top_heures = _garder_meilleures(np.concatenate((self.top_charges, autre.top_charges)), np.concatenate((self.top_heures, autre.top_heures)), self.nb_top, True)
+        self.low_charges, self.low_heures = _garder_meilleures(np.concatenate((self.low_charges, autre.low_charges)), np.concatenate((self.low_heures, autre.low_heures)), self.nb_top, False)
+        return self
+
+    @property
+    def moyenne(self) -> float :
+        return self.total / self.nb_heures if self.nb_heures else np.nan
+
+    def histogramme(self) -> tuple[np.ndarray, np.ndarray] :
+        """Renvoie le couple (comptes, bords) de l'histogramme, directement utilisable par plt.stairs."""
+
+        if self.bords is not None :
+            return self.comptes, self.bords
+        return self.comptes, (self.premiere_classe + np.arange(self.comptes.size + 1)) * self.largeur_classe
+
+    def tableau_top(self, plus_grandes : bool = True) -> pd.DataFrame :
+        """Renvoie le top (ou le low) sous forme de dataframe Datetime / PJM_Load_MW, comme afficher_top_10 / afficher_low_10."""
+
+        charges, heures = (self.top_charges, self.top_heures) if plus_grandes else (self.low_charges, self.low_heures)
+        return pd.DataFrame({"Datetime": heures.astype("datetime64[h]").astype("datetime64[s]"), "PJM_Load_MW": charges})
+
+
+def colonnes_de_charge(chemin : str | os.PathLike) -> list[str] :
+    """L'objectif de cette fonction est de trouver les colonnes de charge d'un fichier : PJM_Load_MW ici, AEP_MW, DOM_MW... dans les fichiers
+    par zone, ou plusieurs colonnes (une par zone) dans une archive large.
+    :param chemin: chemin du fichier csv
+    :return: les noms des colonnes qui ne sont pas Datetime, dans l'ordre du fichier"""
+
+    colonnes = pd.read_csv(chemin, nrows=0).columns
+    autres = [colonne for colonne in colonnes if colonne != "Datetime"]
+    if "Datetime" not in colonnes or not autres :
+        raise ValueError(f"{chemin} doit contenir une colonne Datetime et au moins une colonne de charge")
+    return autres
+
+
+def statistiques_fichier(chemin : str | os.PathLike, nb_top : int = NB_TOP_DEFAUT, largeur_classe : float = LARGEUR_CLASSE_DEFAUT, bords : np.ndarray | None = None, taille_morceau : int = TAILLE_MORCEAU_DEFAUT, format_date : str = FORMAT_DATE_DEFAUT, colonne : str | None = None) -> StatistiquesCharge :
+    """L'objectif de cette fonction est de calculer les statistiques d'une colonne de charge d'un fichier en le lisant par morceaux de taille_morceau lignes.
+    :param chemin: chemin du fichier csv (colonne Datetime + une ou plusieurs colonnes de charge)
+    :param nb_top: nombre de lignes gardées pour le top et le low
+    :param largeur_classe: largeur des classes de l'histogramme en MW (si bords n'est pas fourni)
+    :param bords: bords fixes des classes de l'histogramme
+    :param taille_morceau: nombre de lignes lues à la fois, c'est ce paramètre qui borne la mémoire
+    :param format_date: format des dates de la colonne Datetime
+    :param colonne: colonne de charge à lire, obligatoire si le fichier en contient plusieurs (voir statistiques_fichiers pour toutes les traiter)
+    :return: l'état des statistiques de la colonne"""
+
+    if colonne is None :
+        colonnes = colonnes_de_charge(chemin)
+        if len(colonnes) > 1 :
+            raise ValueError(f"{chemin} contient plusieurs colonnes de charge ({', '.join(colonnes)}) : préciser colonne ou utiliser statistiques_fichiers")
+        colonne = colonnes[0]
+    statistiques = StatistiquesCharge(nb_top=nb_top, largeur_classe=largeur_classe, bords=bords)
+    lecteur = pd.read_csv(chemin, usecols=["Datetime", colonne], dtype={colonne: np.float64}, chunksize=taille_morceau)
+    for morceau in lecteur :
+        heures = pd.to_datetime(morceau["Datetime"], format=format_date).to_numpy().astype("datetime64[h]").astype(np.int64)
+        statistiques.ajouter_morceau(heures, morceau[colonne].to_numpy())
+    return statistiques
+
+
+def _statistiques_zone(zone : tuple[str | os.PathLike, str], **parametres) -> StatistiquesCharge :
+    # Une zone = (fichier, colonne de charge) : fonction du module pour pouvoir être envoyée aux processus du pool
+    chemin, colonne = zone
+    return statistiques_fichier(chemin, colonne=colonne, **parametres)
+
+
+def statistiques_fichiers(chemins : list[str | os.PathLike], nb_processus : int | None = None, **parametres) -> tuple[StatistiquesCharge, dict[str, StatistiquesCharge]] :
+    """L'objectif de cette fonction est de calculer les statistiques de plusieurs zones indépendantes en parallèle : une zone par fichier,
+    ou une zone par colonne de charge dans un fichier large (Datetime, AEP_MW, COMED_MW...).
+    :param chemins: liste des fichiers csv
+    :param nb_processus: taille du pool de processus (None : nombre de coeurs, 1 : pas de pool)
+    :param parametres: paramètres transmis à statistiques_fichier (nb_top, largeur_classe, bords, taille_morceau, format_date)
+    :return: un tuple (statistiques fusionnées de toutes les zones, statistiques de chaque zone). Une zone est désignée par le chemin
+    de son fichier, suivi de « :colonne » si le fichier contient plusieurs colonnes de charge"""
+
+    zones, noms = [], []
+    for chemin in chemins :
+        colonnes = colonnes_de_charge(chemin)
+        for colonne in colonnes :
+            zones.append((chemin, colonne))
+            noms.append(str(chemin) if len(colonnes) == 1 else f"{chemin}:{colonne}")
+
+    # Chaque zone d'un fichier large relit le fichier (seulement ses deux colonnes) : les zones restent indépendantes et se répartissent dans le pool
+    calcul = partial(_statistiques_zone, **parametres)
+    # Pas plus de processus que de zones ni de coeurs disponibles : sur une seule unité de calcul, le pool ne ferait que coûter
+    if nb_processus is None :
+        nb_processus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    nb_processus = min(nb_processus, len(zones))
+    if nb_processus <= 1 :
+        resultats = [calcul(zone) for zone in zones]
+    else :
+        with ProcessPoolExecutor(max_workers=nb_processus) as pool :
+            resultats = list(pool.map(calcul, zones))
+
+    fusion = StatistiquesCharge(
+        nb_top=parametres.get("nb_top", NB_TOP_DEFAUT),
+        largeur_classe=parametres.get("largeur_classe", LARGEUR_CLASSE_DEFAUT),
+        bords=parametres.get("bords"),
+    )
+    for resultat in resultats :
+        fusion.fusionner(resultat)
+    return fusion, dict(zip(noms, resultats))
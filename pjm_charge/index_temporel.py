@@ -0,0 +1,124 @@
+import datetime
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from .ingestion import colonnes_vers_dataframe
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                                   Index temporel trié pour le filtrage par date
+# --------------------------------------------------------------------------------------------------------------------------------
+# Les données sont triées une seule fois par heure croissante. Un filtre [debut, fin] (jours inclus) devient alors deux
+# recherches dichotomiques (searchsorted) sur un tableau int64, et le résultat est une simple tranche, sans copie.
+
+
+def jour_vers_heure(jour) -> int :
+    """L'objectif de cette fonction est de convertir une date (date, datetime, chaîne...) en heure depuis l'epoch, à minuit ce jour-là.
+    :param jour: la date à convertir, seule la partie jour est conservée
+    :return: le nombre d'heures entre 1970-01-01 00:00 et ce jour à 00:00"""
+
+    # Les dates python sont utilisées telles quelles : pd.to_datetime les limiterait aux années 1677 à 2262 (datetime64[ns])
+    if isinstance(jour, datetime.datetime) :
+        jour = jour.date()
+    elif not isinstance(jour, datetime.date) :
+        jour = pd.to_datetime(jour).date()
+    return int(np.datetime64(jour, "D").astype("datetime64[h]").astype(np.int64))
+
+
+@dataclass(eq=False)
+class IndexTemporel :
+    """Colonnes heures / charge triées par heure croissante.
+    heures: heures depuis l'epoch en int64, monotones croissantes
+    charge: charge en MW alignée sur heures
+    ordre: permutation appliquée aux lignes d'origine (None si elles étaient déjà triées)"""
+
+    heures : np.ndarray
+    charge : np.ndarray
+    ordre : np.ndarray | None = None
+    _dataframe : pd.DataFrame | None = field(default=None, init=False, repr=False)
+
+    @classmethod
+    def depuis_colonnes(cls, heures : np.ndarray, charge : np.ndarray) -> "IndexTemporel" :
+        """L'objectif de cette méthode est de construire l'index en triant les colonnes, seulement si elles ne le sont pas déjà.
+        :param heures: heures depuis l'epoch en int64, dans n'importe quel ordre
+        :param charge: charge en MW alignée sur heures
+        :return: l'index trié (les tableaux d'origine sont réutilisés tels quels s'ils étaient déjà dans l'ordre)"""
+
+        heures = np.asarray(heures, dtype=np.int64)
+        charge = np.asarray(charge)
+        if heures.size < 2 or bool(np.all(heures[1:] >= heures[:-1])) :
+            return cls(heures, charge)
+
+        # Tri stable : deux lignes à la même heure gardent l'ordre du fichier, comme avec sort_values
+        ordre = np.argsort(heures, kind="stable")
+        return cls(heures[ordre], charge[ordre], ordre)
+
+    @classmethod
+    def depuis_dataframe(cls, dataframe : pd.DataFrame) -> "IndexTemporel" :
+        """L'objectif de cette méthode est de construire l'index à partir d'un dataframe avec les colonnes Datetime et PJM_Load_MW.
+        :param dataframe: dataframe dont la colonne Datetime est déjà au type datetime64
+        :return: l'index trié"""
+
+        heures = dataframe["Datetime"].to_numpy().astype("datetime64[h]").astype(np.int64)
+        return cls.depuis_colonnes(heures, dataframe["PJM_Load_MW"].to_numpy())
+
+    def __len__(self) -> int :
+        return int(self.heures.size)
+
+    @property
+    def dataframe(self) -> pd.DataFrame :
+        """Le dataframe Datetime / PJM_Load_MW trié, construit une seule fois puis réutilisé."""
+
+        if self._dataframe is None :
+            self._dataframe = colonnes_vers_dataframe(self.heures, self.charge)
+        return self._dataframe
+
+    def bornes(self, debut, fin) -> tuple[int, int] :
+        """L'objectif de cette méthode est de trouver les positions de la tranche correspondant aux jours [debut, fin] inclus.
+        :param debut: premier jour conservé (à partir de 00:00)
+        :param fin: dernier jour conservé (jusqu'à 23:00 inclus)
+        :return: un couple (i, j) tel que heures[i:j] couvre exactement les jours demandés"""
+
+        heure_debut = jour_vers_heure(debut)
+        heure_fin = jour_vers_heure(fin) + 24
+        i = int(np.searchsorted(self.heures, heure_debut, side="left"))
+        j = int(np.searchsorted(self.heures, heure_fin, side="left"))
+        return i, max(i, j)
+
+    def tranche(self, debut, fin) -> tuple[np.ndarray, np.ndarray] :
+        """L'objectif de cette méthode est de renvoyer les colonnes restreintes aux jours [debut, fin] inclus.
+        :param debut: premier jour conservé
+        :param fin: dernier jour conservé
+        :return: un tuple (heures, charge) de vues sur les tableaux de l'index (aucune copie)"""
+
+        i, j = self.bornes(debut, fin)
+        return self.heures[i:j], self.charge[i:j]
+
+
+def filtrer_par_date_indexe(dataframe_trie : pd.DataFrame, index : IndexTemporel, debut, fin) -> pd.DataFrame :
+    """L'objectif de cette fonction est de remplacer filtrer_par_date lorsque le dataframe est aligné sur un index temporel trié.
+    :param dataframe_trie: dataframe dont les lignes sont dans le même ordre que index (par exemple index.dataframe enrichi de colonnes)
+    :param index: l'index temporel trié
+    :param debut: premier jour conservé
+    :param fin: dernier jour conservé
+    :return: la tranche du dataframe entre les deux dates incluses, déjà triée chronologiquement, sans copie des données"""
+
+    if len(dataframe_trie) != len(index) :
+        raise ValueError("Le dataframe n'est pas aligné sur l'index temporel")
+
+    i, j = index.bornes(debut, fin)
+    return dataframe_trie.iloc[i:j]
+
+
+def extraire_plages(dataframe_trie : pd.DataFrame, plages : list[tuple[int, int]]) -> pd.DataFrame :
+    """L'objectif de cette fonction est de récupérer les lignes d'une liste de plages de positions (par exemple une sélection de saisons).
+    :param dataframe_trie: dataframe aligné sur l'index temporel
+    :param plages: liste de plages (a, b) disjointes et triées
+    :return: une tranche sans copie s'il n'y a qu'une plage, sinon les lignes des plages mises bout à bout (dans l'ordre chronologique)"""
+
+    if not plages :
+        return dataframe_trie.iloc[0:0]
+    if len(plages) == 1 :
+        return dataframe_trie.iloc[plages[0][0]:plages[0][1]]
+    return dataframe_trie.iloc[np.concatenate([np.arange(a, b) for a, b in plages])]
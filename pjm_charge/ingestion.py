@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import IO
+
+import numpy as np
+import pandas as pd
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                                   Cache binaire en colonnes du fichier csv
+# --------------------------------------------------------------------------------------------------------------------------------
+# Le fichier csv n'est analysé qu'une seule fois : on écrit ensuite deux fichiers .npy (les heures depuis l'epoch en int64 et la
+# charge en float64) accompagnés d'un petit fichier json qui garde l'empreinte du csv source. Les chargements suivants ouvrent les
+# .npy en memory-map, sans relire ni recopier le texte.
+# Les colonnes sont écrites triées par heure croissante (le csv d'origine ne l'est pas) : le tri est fait une seule fois, à la
+# construction du cache, et l'index temporel peut ensuite reprendre les tableaux du memory-map sans copie.
+
+VERSION_CACHE = 2
+DOSSIER_CACHE_DEFAUT = ".cache_pjm"
+FORMAT_DATE_DEFAUT = "%Y-%m-%d %H:%M:%S"
+
+
+def empreinte_fichier(chemin : str | os.PathLike, taille_bloc : int = 1 << 20) -> dict :
+    """L'objectif de cette fonction est de calculer l'empreinte d'un fichier : sa taille, sa date de modification et un hash de son contenu.
+    :param chemin: chemin du fichier csv source
+    :param taille_bloc: taille des blocs lus pour calculer le hash (1 Mo par défaut)
+    :return: un dictionnaire avec les clés taille, mtime_ns et hash"""
+
+    infos = os.stat(chemin)
+    hash_contenu = hashlib.blake2b(digest_size=16)
+    with open(chemin, "rb") as fichier :
+        for bloc in iter(lambda: fichier.read(taille_bloc), b"") :
+            hash_contenu.update(bloc)
+    return {"taille": infos.st_size, "mtime_ns": infos.st_mtime_ns, "hash": hash_contenu.hexdigest()}
+
+
+def chemins_cache(chemin : str | os.PathLike, dossier_cache : str | os.PathLike | None = None) -> dict[str, Path] :
+    """L'objectif de cette fonction est de donner l'emplacement des fichiers du cache associés à un fichier csv.
+    :param chemin: chemin du fichier csv source
+    :param dossier_cache: dossier où ranger le cache, par défaut un dossier .cache_pjm à côté du csv
+    :return: un dictionnaire avec les chemins des fichiers heures, charge et meta"""
+
+    source = Path(chemin)
+    dossier = Path(dossier_cache) if dossier_cache is not None else source.parent / DOSSIER_CACHE_DEFAUT
+    return {
+        "heures": dossier / f"{source.stem}.heures.npy",
+        "charge": dossier / f"{source.stem}.charge.npy",
+        "meta": dossier / f"{source.stem}.meta.json",
+    }
+
+
+def analyser_csv(chemin : str | os.PathLike | IO[bytes], format_date : str = FORMAT_DATE_DEFAUT, avec_entete : bool = True) -> tuple[np.ndarray, np.ndarray] :
+    """L'objectif de cette fonction est de lire le csv texte une seule fois et de le transformer en deux colonnes numpy compactes.
+    :param chemin: chemin du fichier csv contenant les colonnes Datetime et PJM_Load_MW, ou un objet fichier (par exemple des lignes ajoutées lues en binaire)
+    :param format_date: format des dates de la colonne Datetime
+    :param avec_entete: False si les lignes lues ne commencent pas par la ligne d'en-tête Datetime,PJM_Load_MW
+    :return: un tuple (heures, charge) : heures en int64 (heures depuis 1970-01-01) et charge en float64, dans l'ordre du fichier"""
+
+    if avec_entete :
+        data = pd.read_csv(chemin, dtype={"PJM_Load_MW": np.float64})
+    else :
+        data = pd.read_csv(chemin, header=None, names=["Datetime", "PJM_Load_MW"], dtype={"PJM_Load_MW": np.float64})
+    dates = pd.to_datetime(data["Datetime"], format=format_date).to_numpy()
+    dates_heure = dates.astype("datetime64[h]")
+
+    # Je refuse les horodatages qui ne tombent pas pile sur une heure, sinon on perdrait de l'information en passant aux heures
+    if not np.array_equal(dates_heure, dates) :
+        raise ValueError(f"{chemin} contient des horodatages qui ne sont pas des heures pleines")
+
+    heures = dates_heure.astype(np.int64)
+    charge = data["PJM_Load_MW"].to_numpy(dtype=np.float64)
+    return heures, charge
+
+
+def _ecrire_npy(chemin : Path, tableau : np.ndarray) -> None :
+    """Écrit un tableau .npy dans un fichier temporaire puis le renomme, pour ne jamais laisser un cache à moitié écrit."""
+
+    temporaire = chemin.with_name(chemin.name + ".tmp")
+    with open(temporaire, "wb") as fichier :
+        np.save(fichier, tableau)
+    os.replace(temporaire, chemin)
+
+
+def cache_valide(chemin : str | os.PathLike, dossier_cache : str | os.PathLike | None = None, verifier_hash : bool = True) -> bool :
+    """L'objectif de cette fonction est de dire si le cache binaire correspond encore au fichier csv source.
+    :param chemin: chemin du fichier csv source
+    :param dossier_cache: dossier du cache
+    :param verifier_hash: si True, on recalcule aussi le hash du contenu en plus de la taille et de la date de modification
+    :return: True si les fichiers du cache existent et que la taille, le mtime et (si demandé) le hash n'ont pas changé"""
+
+    chemins = chemins_cache(chemin, dossier_cache)
+    if not all(p.exists() for p in chemins.values()) :
+        return False
+
+    try :
+        meta = json.loads(chemins["meta"].read_text(encoding="utf-8"))
+    except (OSError, ValueError) :
+        return False
+
+    if meta.get("version") != VERSION_CACHE :
+        return False
+
+    infos = os.stat(chemin)
+    if meta.get("taille") != infos.st_size or meta.get("mtime_ns") != infos.st_mtime_ns :
+        return False
+
+    if verifier_hash and meta.get("hash") != empreinte_fichier(chemin)["hash"] :
+        return False
+
+    return True
+
+
+def lire_meta_cache(chemin : str | os.PathLike, dossier_cache : str | os.PathLike | None = None) -> dict :
+    """L'objectif de cette fonction est de relire l'empreinte enregistrée avec le cache (taille et date du csv couvert, nombre de lignes).
+    :param chemin: chemin du fichier csv source
+    :param dossier_cache: dossier du cache
+    :return: le dictionnaire meta écrit par construire_cache"""
+
+    return json.loads(chemins_cache(chemin, dossier_cache)["meta"].read_text(encoding="utf-8"))
+
+
+def construire_cache(chemin : str | os.PathLike, dossier_cache : str | os.PathLike | None = None, format_date : str = FORMAT_DATE_DEFAUT) -> dict :
+    """L'objectif de cette fonction est d'analyser le csv puis d'écrire sa version binaire (.npy) et son empreinte (.json).
+    :param chemin: chemin du fichier csv source
+    :param dossier_cache: dossier du cache
+    :param format_date: format des dates de la colonne Datetime
+    :return: le dictionnaire meta écrit à côté des fichiers .npy"""
+
+    chemins = chemins_cache(chemin, dossier_cache)
+    chemins["meta"].parent.mkdir(parents=True, exist_ok=True)
+
+    # On prend l'empreinte avant l'analyse : si le fichier bouge pendant la lecture, le prochain chargement reconstruira le cache
+    empreinte = empreinte_fichier(chemin)
+    heures, charge = analyser_csv(chemin, format_date)
+    # Tri stable : deux lignes à la même heure gardent l'ordre du fichier, comme avec sort_values
+    if heures.size > 1 and not bool(np.all(heures[1:] >= heures[:-1])) :
+        ordre = np.argsort(heures, kind="stable")
+        heures, charge = heures[ordre], charge[ordre]
+
+    _ecrire_npy(chemins["heures"], heures)
+    _ecrire_npy(chemins["charge"], charge)
+
+    meta = {"version": VERSION_CACHE, "nb_lignes": int(heures.size), **empreinte}
+    temporaire = chemins["meta"].with_name(chemins["meta"].name + ".tmp")
+    temporaire.write_text(json.dumps(meta), encoding="utf-8")
+    os.replace(temporaire, chemins["meta"])
+    return meta
+
+
+def charger_colonnes(chemin : str | os.PathLike, dossier_cache : str | os.PathLike | None = None, format_date : str = FORMAT_DATE_DEFAUT, verifier_hash : bool = True) -> tuple[np.ndarray, np.ndarray] :
+    """L'objectif de cette fonction est de renvoyer les colonnes heures et charge, en reconstruisant le cache seulement si le csv a changé.
+    :param chemin: chemin du fichier csv source
+    :param dossier_cache: dossier du cache
+    :param format_date: format des dates de la colonne Datetime
+    :param verifier_hash: si True, le hash du contenu fait partie du contrôle de validité du cache
+    :return: un tuple (heures, charge) de tableaux numpy ouverts en memory-map et en lecture seule, triés par heure croissante"""
+
+    if not os.path.exists(chemin) :
+        raise FileNotFoundError(chemin)
+
+    if not cache_valide(chemin, dossier_cache, verifier_hash) :
+        construire_cache(chemin, dossier_cache, format_date)
+
+    chemins = chemins_cache(chemin, dossier_cache)
+    heures = np.load(chemins["heures"], mmap_mode="r")
+    charge = np.load(chemins["charge"], mmap_mode="r")
+    return heures, charge
+
+
+def colonnes_vers_dataframe(heures : np.ndarray, charge : np.ndarray) -> pd.DataFrame :
+    """L'objectif de cette fonction est de reconstruire le dataframe Datetime / PJM_Load_MW à partir des colonnes binaires.
+    :param heures: heures depuis l'epoch en int64
+    :param charge: charge en MW
+    :return: un dataframe dont la colonne PJM_Load_MW partage la mémoire de charge (pas de copie) et dont Datetime est déjà au type datetime64"""
+
+    # Datetime demande une seule conversion vectorisée (heures -> secondes), plus aucune analyse de chaînes de caractères
+    dates = (np.asarray(heures, dtype=np.int64) * 3600).view("datetime64[s]")
+    return pd.DataFrame({"Datetime": dates, "PJM_Load_MW": charge}, copy=False)
+
+
+def charger_donnees(chemin : str | os.PathLike, dossier_cache : str | os.PathLike | None = None, format_date : str = FORMAT_DATE_DEFAUT, verifier_hash : bool = True) -> pd.DataFrame :
+    """L'objectif de cette fonction est de remplacer l'enchaînement lire_csv + conversion_en_date par une lecture du cache binaire.
+    :param chemin: chemin du fichier csv source
+    :param dossier_cache: dossier du cache, par défaut .cache_pjm à côté du csv
+    :param format_date: format des dates de la colonne Datetime (utilisé seulement à la construction du cache)
+    :param verifier_hash: si True, le hash du contenu fait partie du contrôle de validité du cache
+    :return: le dataframe avec Datetime déjà converti et PJM_Load_MW en memory-map, trié par date croissante"""
+
+    heures, charge = charger_colonnes(chemin, dossier_cache, format_date, verifier_hash)
+    return colonnes_vers_dataframe(heures, charge)
@@ -0,0 +1,223 @@
+import io
+from collections.abc import Iterator
+
+import numpy as np
+import pandas as pd
+
+from .calendrier import JOURS_SEMAINE, SAISONS, CalendrierCodes
+from .index_temporel import IndexTemporel, jour_vers_heure
+from .ingestion import colonnes_vers_dataframe
+from .pics import IndexValeurs
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                             Pagination du tableau des données côté serveur et export par morceaux
+# --------------------------------------------------------------------------------------------------------------------------------
+# La sélection reste une liste de plages de lignes de l'index trié. Une page est la k-ième tranche de taille_page lignes de ces
+# plages mises bout à bout : on ne lit que ces lignes (une vue sans copie quand la page tient dans une seule plage), puis on
+# l'encode en table Arrow, avec les libellés jour / saison sous forme de dictionnaire. Le tri par charge lit la permutation déjà
+# triée de l'index des valeurs, en s'arrêtant dès que la page demandée est remplie.
+
+TRIS = ("chronologique", "charge_decroissante", "charge_croissante")
+TAILLE_PAGE_DEFAUT = 100
+TAILLE_MORCEAU_EXPORT = 100_000
+
+
+class PaginationSelection :
+    """Découpage en pages d'une sélection de plages (a, b) disjointes et triées d'un IndexTemporel."""
+
+    def __init__(self, index : IndexTemporel, plages : list[tuple[int, int]], taille_page : int = TAILLE_PAGE_DEFAUT) -> None :
+        if taille_page <= 0 :
+            raise ValueError("La taille de page doit être supérieure à 0")
+        self.index = index
+        self.plages = [(a, b) for a, b in plages if b > a]
+        self.taille_page = taille_page
+        self.debuts = np.array([a for a, _ in self.plages], dtype=np.int64)
+        self.fins = np.array([b for _, b in self.plages], dtype=np.int64)
+        # cumul[k] : nombre de lignes sélectionnées avant la plage k
+        self.cumul = np.concatenate(([0], np.cumsum(self.fins - self.debuts))).astype(np.int64)
+        self._positions_nan : np.ndarray | None = None
+
+    @property
+    def nb_lignes(self) -> int :
+        return int(self.cumul[-1])
+
+    @property
+    def nb_pages(self) -> int :
+        return max(1, -(-self.nb_lignes // self.taille_page))
+
+    def _verifier(self, page : int) -> tuple[int, int] :
+        if not 0 <= page < self.nb_pages :
+            raise ValueError(f"La page doit être comprise entre 0 et {self.nb_pages - 1}")
+        return page * self.taille_page, min((page + 1) * self.taille_page, self.nb_lignes)
+
+    def rangs_vers_positions(self, debut : int, fin : int) -> slice | np.ndarray :
+        """L'objectif de cette méthode est de traduire les rangs [debut, fin) de la sélection en positions dans l'index.
+        :param debut: rang de la première ligne dans la sélection
+        :param fin: rang suivant la dernière ligne
+        :return: une tranche si les lignes sont contiguës dans l'index (lecture sans copie), sinon un tableau de positions"""
+
+        if fin <= debut :
+            return slice(0, 0)
+        premiere = int(np.searchsorted(self.cumul, debut, side="right")) - 1
+        derniere = int(np.searchsorted(self.cumul, fin, side="left")) - 1
+        if premiere == derniere :
+            decalage = int(self.debuts[premiere] - self.cumul[premiere])
+            return slice(debut + decalage, fin + decalage)
+        rangs = np.arange(debut, fin, dtype=np.int64)
+        plage = np.searchsorted(self.cumul, rangs, side="right") - 1
+        return rangs + (self.debuts - self.cumul[:-1])[plage]
+
+    def _dans_selection(self, positions : np.ndarray) -> np.ndarray :
+        # Une position est dans la sélection si elle tombe entre un début et une fin : rang impair dans la liste des bornes
+        bornes = np.column_stack((self.debuts, self.fins)).ravel()
+        return (np.searchsorted(bornes, positions, side="right") % 2) == 1
+
+    def _positions_nan_selection(self) -> np.ndarray :
+        if self._positions_nan is None :
+            charge = np.asarray(self.index.charge, dtype=np.float64)
+            morceaux = [a + np.flatnonzero(np.isnan(charge[a:b])) for a, b in self.plages]
+            self._positions_nan = np.concatenate(morceaux).astype(np.int64) if morceaux else np.zeros(0, dtype=np.int64)
+        return self._positions_nan
+
+    def _positions_triees(self, debut : int, fin : int, index_valeurs : IndexValeurs, decroissant : bool) -> np.ndarray :
+        # On parcourt la permutation triée par paquets de taille croissante (depuis la fin si décroissant) et on ne garde que les
+        # positions de la sélection, jusqu'à en avoir fin. Les premières pages ne lisent donc qu'un petit bout de la permutation.
+        # À charge égale, l'heure la plus ancienne vient d'abord dans les deux sens, comme sort_values(kind="stable") et MoteurTopK
+        ordre, valeurs = index_valeurs.ordre, index_valeurs.valeurs_triees
+        toute_la_serie = self.plages == [(0, len(self.index))]
+        trouvees : list[np.ndarray] = []
+        nb_trouvees, lues, paquet = 0, 0, max(4 * fin, 1024)
+        while nb_trouvees < fin and lues < ordre.size :
+            if decroissant :
+                # Le paquet commence au début d'un groupe de charges égales, pour ne jamais en couper un entre deux paquets.
+                # Dans la permutation, un groupe est rangé par position croissante : on inverse l'ordre des groupes, pas celui de
+                # leurs lignes. La ligne de rang s du groupe [g, h) va au rang (fin - h) + (s - g) du paquet [bas, fin)
+                haut = ordre.size - lues
+                bas = int(np.searchsorted(valeurs, valeurs[max(0, haut - paquet)], side="left"))
+                rangs = np.arange(bas, haut)
+                debuts_groupes = np.searchsorted(valeurs, valeurs[bas:haut], side="left")
+                fins_groupes = np.searchsorted(valeurs, valeurs[bas:haut], side="right")
+                morceau = np.empty(haut - bas, dtype=ordre.dtype)
+                morceau[(haut - fins_groupes) + (rangs - debuts_groupes)] = ordre[bas:haut]
+            else :
+                morceau = ordre[lues : lues + paquet]
+            lues += morceau.size
+            if not toute_la_serie :
+                morceau = morceau[self._dans_selection(morceau)]
+            trouvees.append(morceau)
+            nb_trouvees += morceau.size
+            paquet *= 2
+        positions = np.concatenate(trouvees) if trouvees else np.zeros(0, dtype=np.int64)
+        # Les heures sans valeur ne sont pas dans la permutation : elles viennent après toutes les autres, comme avec sort_values
+        if positions.size < fin :
+            positions = np.concatenate((positions, self._positions_nan_selection()))
+        return positions[debut:fin]
+
+    def positions(self, page : int, tri : str = "chronologique", index_valeurs : IndexValeurs | None = None) -> slice | np.ndarray :
+        """L'objectif de cette méthode est de donner les positions dans l'index des lignes d'une page.
+        :param page: numéro de page, à partir de 0
+        :param tri: un des TRIS : chronologique, charge_decroissante ou charge_croissante
+        :param index_valeurs: l'index des valeurs de l'index temporel, nécessaire pour les tris par charge
+        :return: une tranche (page contiguë, lecture sans copie) ou un tableau de positions"""
+
+        debut, fin = self._verifier(page)
+        if tri == "chronologique" :
+            return self.rangs_vers_positions(debut, fin)
+        if tri not in TRIS :
+            raise ValueError(f"Tri inconnu : {tri}, valeurs possibles : {', '.join(TRIS)}")
+        if index_valeurs is None :
+            raise ValueError("Le tri par charge demande l'index des valeurs")
+        return self._positions_triees(debut, fin, index_valeurs, tri == "charge_decroissante")
+
+    def page_de_date(self, jour) -> int :
+        """L'objectif de cette méthode est de trouver la page (en ordre chronologique) qui contient la première heure sélectionnée à partir d'un jour.
+        :param jour: le jour recherché
+        :return: le numéro de page, la dernière page si le jour est après la fin de la sélection"""
+
+        position = int(np.searchsorted(self.index.heures, jour_vers_heure(jour), side="left"))
+        # Nombre de lignes sélectionnées avant cette position
+        rang = int(np.sum(np.clip(position - self.debuts, 0, self.fins - self.debuts)))
+        return min(rang // self.taille_page, self.nb_pages - 1)
+
+
+def table_arrow(index : IndexTemporel, calendrier : CalendrierCodes, positions : slice | np.ndarray) :
+    """L'objectif de cette fonction est d'encoder des lignes de l'index en table Arrow, prête à être envoyée au navigateur.
+    :param index: l'index temporel trié
+    :param calendrier: les codes calendaires de l'index
+    :param positions: tranche ou tableau de positions (voir PaginationSelection.positions)
+    :return: une pyarrow.Table Datetime, PJM_Load_MW, jour_semaine, saison (les deux dernières en dictionnaire : codes int8 + libellés)"""
+
+    # pyarrow n'est importé qu'ici : il est installé avec streamlit, mais le reste du paquet n'en dépend pas
+    import pyarrow as pa
+
+    heures = np.asarray(index.heures[positions], dtype=np.int64)
+    return pa.table({
+        "Datetime": pa.array((heures * 3600).view("datetime64[s]")),
+        # Une tranche de l'index est un tableau contigu : Arrow le reprend sans copie
+        "PJM_Load_MW": pa.array(np.asarray(index.charge[positions], dtype=np.float64)),
+        "jour_semaine": pa.DictionaryArray.from_arrays(pa.array(calendrier.jour_semaine[positions]), pa.array(list(JOURS_SEMAINE))),
+        "saison": pa.DictionaryArray.from_arrays(pa.array(calendrier.saison[positions]), pa.array(list(SAISONS))),
+    })
+
+
+def morceaux_csv(index : IndexTemporel, calendrier : CalendrierCodes, plages : list[tuple[int, int]], taille_morceau : int = TAILLE_MORCEAU_EXPORT) -> Iterator[bytes] :
+    """L'objectif de cette fonction est d'exporter toute la sélection en csv, morceau par morceau, sans jamais la construire en entier.
+    :param index: l'index temporel trié
+    :param calendrier: les codes calendaires de l'index
+    :param plages: plages (a, b) de la sélection
+    :param taille_morceau: nombre de lignes encodées à la fois
+    :return: un générateur d'octets, l'en-tête étant dans le premier morceau"""
+
+    pagination = PaginationSelection(index, plages, taille_morceau)
+    yield b"Datetime,PJM_Load_MW,jour_semaine,saison\n"
+    for debut in range(0, pagination.nb_lignes, taille_morceau) :
+        positions = pagination.rangs_vers_positions(debut, min(debut + taille_morceau, pagination.nb_lignes))
+        morceau = colonnes_vers_dataframe(index.heures[positions], index.charge[positions])
+        morceau["jour_semaine"] = pd.Categorical.from_codes(calendrier.jour_semaine[positions], categories=list(JOURS_SEMAINE))
+        morceau["saison"] = pd.Categorical.from_codes(calendrier.saison[positions], categories=list(SAISONS))
+        yield morceau.to_csv(index=False, header=False).encode("utf-8")
+
+
+class _SortieComptee(io.RawIOBase) :
+    """Fichier en écriture seule qui garde les octets reçus jusqu'à ce qu'on les récupère, en comptant la position totale écrite."""
+
+    def __init__(self) -> None :
+        self.morceaux : list[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool :
+        return True
+
+    def write(self, octets) -> int :
+        self.morceaux.append(bytes(octets))
+        self.position += len(octets)
+        return len(octets)
+
+    def tell(self) -> int :
+        return self.position
+
+    def vider(self) -> bytes :
+        octets = b"".join(self.morceaux)
+        self.morceaux.clear()
+        return octets
+
+
+def morceaux_parquet(index : IndexTemporel, calendrier : CalendrierCodes, plages : list[tuple[int, int]], taille_morceau : int = TAILLE_MORCEAU_EXPORT) -> Iterator[bytes] :
+    """L'objectif de cette fonction est d'exporter toute la sélection en parquet, un groupe de lignes par morceau.
+    :param index: l'index temporel trié
+    :param calendrier: les codes calendaires de l'index
+    :param plages: plages (a, b) de la sélection
+    :param taille_morceau: nombre de lignes par groupe de lignes parquet
+    :return: un générateur d'octets dont la concaténation est un fichier parquet"""
+
+    import pyarrow.parquet as pq
+
+    pagination = PaginationSelection(index, plages, taille_morceau)
+    sortie = _SortieComptee()
+    schema = table_arrow(index, calendrier, slice(0, 0)).schema
+    with pq.ParquetWriter(sortie, schema) as ecrivain :
+        for debut in range(0, pagination.nb_lignes, taille_morceau) :
+            positions = pagination.rangs_vers_positions(debut, min(debut + taille_morceau, pagination.nb_lignes))
+            ecrivain.write_table(table_arrow(index, calendrier, positions))
+            yield sortie.vider()
+    yield sortie.vider()
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+from .index_temporel import IndexTemporel
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                             Détection des pics au-dessus d'un seuil et regroupement en épisodes
+# --------------------------------------------------------------------------------------------------------------------------------
+# Les positions des heures sont triées une fois par charge croissante. « Toutes les heures >= seuil » devient alors une recherche
+# dichotomique suivie d'une lecture de la fin de cette permutation, qu'on croise ensuite avec les plages de la sélection.
+# Les heures consécutives au-dessus du seuil forment un épisode de pic (début, fin, durée, pic, énergie au-dessus du seuil).
+
+COLONNES_EPISODES = ["debut", "fin", "duree_h", "charge_max_MW", "heure_max", "energie_au_dessus_MWh"]
+
+
+class IndexValeurs :
+    """Permutation des lignes d'un IndexTemporel triée par charge croissante (les NaN sont exclus)."""
+
+    def __init__(self, index : IndexTemporel) -> None :
+        self.index = index
+        charge = np.asarray(index.charge, dtype=np.float64)
+        ordre = np.argsort(charge, kind="stable")
+        # argsort range les NaN à la fin : on les retire de la permutation
+        nb_valides = int(np.count_nonzero(~np.isnan(charge)))
+        self.ordre = ordre[:nb_valides]
+        self.valeurs_triees = charge[self.ordre]
+
+    def nb_au_dessus(self, seuil : float) -> int :
+        """Nombre d'heures (toutes dates confondues) dont la charge est supérieure ou égale au seuil."""
+
+        return self.ordre.size - int(np.searchsorted(self.valeurs_triees, seuil, side="left"))
+
+    def positions_au_dessus(self, seuil : float, plages : list[tuple[int, int]] | None = None) -> np.ndarray :
+        """L'objectif de cette méthode est de donner les positions des heures dont la charge est supérieure ou égale au seuil, dans la sélection.
+        :param seuil: valeur de seuil en MW
+        :param plages: plages (a, b) de la sélection (voir CalendrierCodes.plages), None pour tout le jeu de données
+        :return: positions triées chronologiquement"""
+
+        if plages is None :
+            plages = [(0, len(self.index))]
+        plages = [(a, b) for a, b in plages if b > a]
+        if not plages :
+            return np.zeros(0, dtype=np.int64)
+
+        debut_permutation = int(np.searchsorted(self.valeurs_triees, seuil, side="left"))
+        nb_candidats = self.ordre.size - debut_permutation
+        taille_selection = sum(b - a for a, b in plages)
+
+        # Si le seuil est bas, il y a plus de candidats que de lignes sélectionnées : comparer directement la sélection coûte moins cher
+        if nb_candidats >= taille_selection :
+            morceaux = [a + np.flatnonzero(self.index.charge[a:b] >= seuil) for a, b in plages]
+            return np.concatenate(morceaux).astype(np.int64)
+
+        candidats = np.sort(self.ordre[debut_permutation:])
+        # Une position est dans la sélection si elle tombe entre un début et une fin : rang impair dans la liste des bornes
+        bornes = np.array(plages, dtype=np.int64).ravel()
+        dedans = (np.searchsorted(bornes, candidats, side="right") % 2) == 1
+        return candidats[dedans]
+
+
+def regrouper_episodes(index : IndexTemporel, positions : np.ndarray, seuil : float) -> pd.DataFrame :
+    """L'objectif de cette fonction est de regrouper des heures au-dessus du seuil en épisodes d'heures consécutives.
+    :param index: l'index temporel trié
+    :param positions: positions des heures au-dessus du seuil, triées chronologiquement (voir IndexValeurs.positions_au_dessus)
+    :param seuil: le seuil utilisé, pour calculer l'énergie au-dessus du seuil
+    :return: un dataframe avec une ligne par épisode : debut, fin, duree_h, charge_max_MW, heure_max, energie_au_dessus_MWh"""
+
+    if positions.size == 0 :
+        types = ["datetime64[s]", "datetime64[s]", "int64", "float64", "datetime64[s]", "float64"]
+        return pd.DataFrame({colonne: pd.Series(dtype=type_colonne) for colonne, type_colonne in zip(COLONNES_EPISODES, types)})
+
+    heures = np.asarray(index.heures, dtype=np.int64)[positions]
+    charge = np.asarray(index.charge, dtype=np.float64)[positions]
+
+    # Nouvel épisode dès qu'on saute au moins une heure (une heure manquante dans les données coupe aussi l'épisode)
+    coupures = np.flatnonzero(np.diff(heures) > 1) + 1
+    debuts = np.concatenate(([0], coupures))
+    fins = np.concatenate((coupures, [positions.size])) - 1
+
+    charge_max = np.maximum.reduceat(charge, debuts)
+    # Première heure de chaque épisode où le maximum est atteint
+    numero_episode = np.repeat(np.arange(debuts.size), np.diff(np.concatenate((debuts, [positions.size]))))
+    candidats = np.flatnonzero(charge == charge_max[numero_episode])
+    _, premiers = np.unique(numero_episode[candidats], return_index=True)
+    premiere_max = candidats[premiers]
+
+    return pd.DataFrame({
+        "debut": heures[debuts].astype("datetime64[h]").astype("datetime64[s]"),
+        "fin": heures[fins].astype("datetime64[h]").astype("datetime64[s]"),
+        "duree_h": heures[fins] - heures[debuts] + 1,
+        "charge_max_MW": charge_max,
+        "heure_max": heures[premiere_max].astype("datetime64[h]").astype("datetime64[s]"),
+        # Données horaires : une heure à (charge - seuil) MW représente (charge - seuil) MWh
+        "energie_au_dessus_MWh": np.add.reduceat(charge - seuil, debuts),
+    })
+
+
+def detecter_episodes(index_valeurs : IndexValeurs, seuil : float, plages : list[tuple[int, int]] | None = None) -> pd.DataFrame :
+    """L'objectif de cette fonction est de donner les épisodes de pic au-dessus d'un seuil dans une sélection.
+    :param index_valeurs: l'index des valeurs construit sur l'index temporel
+    :param seuil: valeur de seuil en MW, strictement positive comme dans detecter_pic_en_fonction_du_seuil
+    :param plages: plages (a, b) de la sélection, None pour tout le jeu de données
+    :return: le dataframe des épisodes (voir regrouper_episodes)"""
+
+    if seuil <= 0 :
+        raise ValueError("Le seuil doit être supérieur à 0")
+    positions = index_valeurs.positions_au_dessus(seuil, plages)
+    return regrouper_episodes(index_valeurs.index, positions, seuil)
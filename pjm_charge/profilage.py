@@ -0,0 +1,213 @@
+import json
+import os
+import time
+import tracemalloc
+from collections import deque
+from dataclasses import asdict, dataclass, field, fields
+
+import pandas as pd
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                                   Mesure des étapes d'une exécution du dashboard
+# --------------------------------------------------------------------------------------------------------------------------------
+# Chaque étape (chargement, sélection, indicateurs, graphiques, tableau...) est entourée d'un « with profileur.etape(...) » qui
+# note sa durée, ses lignes en entrée et en sortie et les octets alloués (pic tracemalloc pendant l'étape). Les mesures d'une
+# exécution sont gardées dans un historique glissant, que l'on peut écrire en JSON lines.
+# La variable d'environnement PJM_PROFILAGE active la mesure : absente ou 0, rien n'est mesuré (ni chronomètre, ni tracemalloc),
+# chaque étape ne coûte qu'un test ; « temps » mesure seulement les durées ; 1 mesure aussi la mémoire.
+
+VARIABLE_ENVIRONNEMENT = "PJM_PROFILAGE"
+TAILLE_HISTORIQUE_DEFAUT = 50
+
+
+def mode_profilage(valeur : str | None = None) -> str | None :
+    """L'objectif de cette fonction est de lire le mode de profilage demandé dans l'environnement.
+    :param valeur: valeur à interpréter, celle de la variable PJM_PROFILAGE par défaut
+    :return: None (désactivé), "temps" (durées seulement) ou "complet" (durées et mémoire)"""
+
+    if valeur is None :
+        valeur = os.environ.get(VARIABLE_ENVIRONNEMENT, "")
+    valeur = valeur.strip().lower()
+    if valeur in ("", "0", "non", "false") :
+        return None
+    if valeur == "temps" :
+        return "temps"
+    return "complet"
+
+
+@dataclass
+class MesureEtape :
+    """Mesure d'une étape : durée, lignes en entrée / en sortie, octets alloués au plus fort de l'étape (None si non mesurés)
+    et niveau d'imbrication (0 pour une étape de premier niveau)."""
+
+    nom : str
+    duree_s : float = 0.0
+    lignes_entree : int | None = None
+    lignes_sortie : int | None = None
+    octets_alloues : int | None = None
+    niveau : int = 0
+
+
+@dataclass
+class Execution :
+    """Les étapes mesurées pendant une exécution du script, dans l'ordre où elles ont commencé (une sous-étape suit son étape parente)."""
+
+    numero : int
+    horodatage : float
+    etapes : list[MesureEtape] = field(default_factory=list)
+
+    @property
+    def duree_s(self) -> float :
+        # Les sous-étapes sont déjà comptées dans la durée de leur étape parente : on ne somme que les étapes de premier niveau
+        return sum(etape.duree_s for etape in self.etapes if etape.niveau == 0)
+
+    def tableau(self) -> pd.DataFrame :
+        """L'objectif de cette méthode est de présenter les étapes de l'exécution en tableau (une ligne par étape, durées en millisecondes).
+        :return: un dataframe etape, duree_ms, lignes_entree, lignes_sortie, octets_alloues"""
+
+        return pd.DataFrame({
+            "etape": ["  " * etape.niveau + etape.nom for etape in self.etapes],
+            "duree_ms": [etape.duree_s * 1000 for etape in self.etapes],
+            "lignes_entree": pd.array([etape.lignes_entree for etape in self.etapes], dtype="Int64"),
+            "lignes_sortie": pd.array([etape.lignes_sortie for etape in self.etapes], dtype="Int64"),
+            "octets_alloues": pd.array([etape.octets_alloues for etape in self.etapes], dtype="Int64"),
+        })
+
+
+class _EtapeInactive :
+    """Contexte renvoyé quand le profilage est désactivé : ne mesure rien, toujours la même instance."""
+
+    mesure = MesureEtape("inactive")
+
+    def __enter__(self) -> MesureEtape :
+        return self.mesure
+
+    def __exit__(self, *exception) -> bool :
+        return False
+
+
+_ETAPE_INACTIVE = _EtapeInactive()
+
+
+class _EtapeMesuree :
+    """Contexte d'une étape mesurée. Les étapes peuvent s'imbriquer : le pic mémoire d'une étape inclut celui de ses sous-étapes."""
+
+    def __init__(self, profileur : "Profileur", mesure : MesureEtape) -> None :
+        self.profileur = profileur
+        self.mesure = mesure
+        self.base = 0
+        self.pic = 0
+
+    def __enter__(self) -> MesureEtape :
+        pile = self.profileur._pile
+        self.mesure.niveau = len(pile)
+        if self.profileur.avec_memoire :
+            # Le pic de l'étape parente est relevé avant la remise à zéro du pic pour cette étape
+            if pile :
+                pile[-1].pic = max(pile[-1].pic, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self.base = self.pic = tracemalloc.get_traced_memory()[0]
+        pile.append(self)
+        self.profileur._courante.etapes.append(self.mesure)
+        self.depart = time.perf_counter()
+        return self.mesure
+
+    def __exit__(self, *exception) -> bool :
+        self.mesure.duree_s = time.perf_counter() - self.depart
+        pile = self.profileur._pile
+        pile.pop()
+        if self.profileur.avec_memoire :
+            self.pic = max(self.pic, tracemalloc.get_traced_memory()[1])
+            self.mesure.octets_alloues = self.pic - self.base
+            if pile :
+                pile[-1].pic = max(pile[-1].pic, self.pic)
+        return False
+
+
+class Profileur :
+    """Mesure des étapes des exécutions successives d'une session, avec un historique glissant des dernières exécutions."""
+
+    def __init__(self, mode : str | None = None, taille_historique : int = TAILLE_HISTORIQUE_DEFAUT, lire_environnement : bool = True) -> None :
+        self.mode = mode_profilage() if mode is None and lire_environnement else mode
+        self.historique : deque[Execution] = deque(maxlen=taille_historique)
+        self._courante = Execution(0, time.time())
+        self._pile : list[_EtapeMesuree] = []
+        self._nb_executions = 0
+        # tracemalloc est global au processus : on le démarre une fois et on ne l'arrête pas (d'autres sessions peuvent mesurer).
+        # Avec plusieurs sessions en parallèle, les octets d'une étape comptent aussi ce qu'allouent les autres pendant ce temps
+        if self.avec_memoire and not tracemalloc.is_tracing() :
+            tracemalloc.start()
+
+    @property
+    def actif(self) -> bool :
+        return self.mode is not None
+
+    @property
+    def avec_memoire(self) -> bool :
+        return self.mode == "complet"
+
+    def nouvelle_execution(self) -> Execution :
+        """L'objectif de cette méthode est de commencer une nouvelle exécution (au début du script), l'exécution précédente passant dans l'historique.
+        :return: l'exécution commencée"""
+
+        if self.actif :
+            if self._courante.etapes :
+                self.historique.append(self._courante)
+            self._nb_executions += 1
+            self._courante = Execution(self._nb_executions, time.time())
+            self._pile.clear()
+        return self._courante
+
+    @property
+    def execution_courante(self) -> Execution :
+        return self._courante
+
+    def etape(self, nom : str, lignes_entree : int | None = None) :
+        """L'objectif de cette méthode est de mesurer le bloc « with » qui suit.
+        :param nom: nom de l'étape
+        :param lignes_entree: nombre de lignes reçues par l'étape ; les lignes en sortie se renseignent sur la mesure renvoyée par le with
+        :return: un contexte qui renvoie la MesureEtape à compléter (une mesure factice, partagée, si le profilage est désactivé)"""
+
+        if self.mode is None :
+            return _ETAPE_INACTIVE
+        return _EtapeMesuree(self, MesureEtape(nom, lignes_entree=lignes_entree))
+
+    def executions(self) -> list[Execution] :
+        """Les exécutions de l'historique suivies de l'exécution courante (si elle a des étapes)."""
+
+        return list(self.historique) + ([self._courante] if self._courante.etapes else [])
+
+    def resume(self) -> pd.DataFrame :
+        """L'objectif de cette méthode est de résumer l'historique par étape : nombre de mesures, durée médiane et maximale, pic mémoire maximal.
+        :return: un dataframe indexé par étape, dans l'ordre de la première apparition de chaque étape"""
+
+        mesures = pd.DataFrame([asdict(etape) for execution in self.executions() for etape in execution.etapes], columns=[f.name for f in fields(MesureEtape)])
+        groupes = mesures.groupby("nom", sort=False)
+        return pd.DataFrame({
+            "nb_mesures": groupes.size(),
+            "duree_mediane_ms": groupes["duree_s"].median() * 1000,
+            "duree_max_ms": groupes["duree_s"].max() * 1000,
+            "octets_alloues_max": groupes["octets_alloues"].max(),
+        })
+
+    def lignes_jsonl(self, executions : list[Execution] | None = None) -> str :
+        """L'objectif de cette méthode est de sérialiser des exécutions en JSON lines : une ligne par étape mesurée.
+        :param executions: exécutions à écrire, tout l'historique et l'exécution courante par défaut
+        :return: le texte JSON lines (chaque ligne porte le numéro et l'horodatage de son exécution)"""
+
+        lignes = []
+        for execution in self.executions() if executions is None else executions :
+            for etape in execution.etapes :
+                lignes.append(json.dumps({"execution": execution.numero, "horodatage": execution.horodatage, **asdict(etape)}, ensure_ascii=False))
+        return "".join(ligne + "\n" for ligne in lignes)
+
+    def ecrire_jsonl(self, chemin : str | os.PathLike, executions : list[Execution] | None = None) -> int :
+        """L'objectif de cette méthode est d'ajouter des exécutions à un fichier JSON lines.
+        :param chemin: chemin du fichier (créé s'il n'existe pas, complété sinon)
+        :param executions: exécutions à écrire, tout l'historique et l'exécution courante par défaut
+        :return: le nombre de lignes écrites"""
+
+        texte = self.lignes_jsonl(executions)
+        with open(chemin, "a", encoding="utf-8") as fichier :
+            fichier.write(texte)
+        return texte.count("\n")
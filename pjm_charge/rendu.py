@@ -0,0 +1,93 @@
+import io
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                                   Cache des graphiques déjà rendus (images PNG / SVG)
+# --------------------------------------------------------------------------------------------------------------------------------
+# Une figure matplotlib n'est construite que si son image n'est pas déjà en cache : elle est alors rendue en octets puis fermée
+# aussitôt, pour ne pas accumuler de figures ouvertes dans un serveur qui tourne longtemps. Les images sont gardées dans un cache LRU
+# limité en octets : revenir à un filtre déjà vu (ou annuler un changement) ressert l'image sans rien recalculer.
+
+TAILLE_MAX_OCTETS_DEFAUT = 64 * 1024 * 1024
+
+
+def figure_en_octets(figure, format_image : str = "png", dpi : float | None = None) -> bytes :
+    """L'objectif de cette fonction est de rendre une figure matplotlib en image puis de la fermer.
+    :param figure: la figure matplotlib (par exemple celle renvoyée par tracer_vue_ensemble)
+    :param format_image: png ou svg
+    :param dpi: résolution du rendu, celle de la figure par défaut
+    :return: les octets de l'image"""
+
+    # pyplot n'est importé qu'ici : le reste du paquet ne dépend pas de matplotlib
+    import matplotlib.pyplot as plt
+
+    tampon = io.BytesIO()
+    try :
+        figure.savefig(tampon, format=format_image, dpi=dpi if dpi is not None else "figure")
+    finally :
+        plt.close(figure)
+    return tampon.getvalue()
+
+
+@dataclass
+class StatistiquesCache :
+    """Compteurs du cache : images resservies (succes), images à construire (echecs) et images retirées pour faire de la place."""
+
+    succes : int = 0
+    echecs : int = 0
+    evictions : int = 0
+
+
+class CacheRendu :
+    """Cache LRU d'images rendues, limité en octets, partageable entre les sessions (accès protégé par un verrou)."""
+
+    def __init__(self, taille_max_octets : int = TAILLE_MAX_OCTETS_DEFAUT) -> None :
+        self.taille_max_octets = taille_max_octets
+        self.taille_octets = 0
+        self.statistiques = StatistiquesCache()
+        self._images : OrderedDict[Hashable, bytes] = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def __len__(self) -> int :
+        return len(self._images)
+
+    def obtenir(self, cle : Hashable, fabriquer : Callable[[], bytes]) -> bytes :
+        """L'objectif de cette méthode est de renvoyer l'image associée à une clé, en ne la fabriquant que si elle n'est pas en cache.
+        :param cle: tout ce dont dépend l'image, par exemple (graphique, début, fin, saisons, seuil, afficher les pics)
+        :param fabriquer: fonction sans argument qui trace la figure et renvoie ses octets (voir figure_en_octets)
+        :return: les octets de l'image"""
+
+        with self._verrou :
+            image = self._images.get(cle)
+            if image is not None :
+                self._images.move_to_end(cle)
+                self.statistiques.succes += 1
+                return image
+            self.statistiques.echecs += 1
+
+        # Le rendu se fait hors du verrou : deux sessions qui demandent la même image au même moment la fabriquent chacune une fois
+        image = fabriquer()
+
+        with self._verrou :
+            if cle in self._images :
+                self.taille_octets -= len(self._images.pop(cle))
+            # Une image plus grosse que tout le cache est servie sans être gardée
+            if len(image) > self.taille_max_octets :
+                return image
+            self._images[cle] = image
+            self.taille_octets += len(image)
+            while self.taille_octets > self.taille_max_octets :
+                _, retiree = self._images.popitem(last=False)
+                self.taille_octets -= len(retiree)
+                self.statistiques.evictions += 1
+        return image
+
+    def vider(self) -> None :
+        """Retire toutes les images (les compteurs sont conservés)."""
+
+        with self._verrou :
+            self._images.clear()
+            self.taille_octets = 0
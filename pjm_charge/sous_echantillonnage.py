@@ -0,0 +1,142 @@
+import numpy as np
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                             Sous-échantillonnage min/max pour le graphique de vue d'ensemble
+# --------------------------------------------------------------------------------------------------------------------------------
+# Un écran de 800 pixels ne peut pas montrer 300 000 points : on découpe la fenêtre en paquets et on ne garde que le minimum et
+# le maximum de chaque paquet, ce qui conserve visuellement les pics et les creux. Les paquets de 2, 4, 8... heures sont
+# précalculés une fois pour toutes (pyramide), un zoom sur n'importe quelle plage de dates revient donc à lire un niveau.
+
+
+def nb_points_pour_figure(largeur_pouces : float = 8, dpi : float = 100) -> int :
+    """L'objectif de cette fonction est de donner le nombre de points à tracer pour une figure : deux par pixel de largeur.
+    :param largeur_pouces: largeur de la figure matplotlib en pouces (figsize)
+    :param dpi: résolution de la figure
+    :return: le nombre de points à garder"""
+
+    return 2 * int(round(largeur_pouces * dpi))
+
+
+class PyramideMinMax :
+    """Positions du minimum et du maximum de chaque bloc de 2^k lignes, pour k = 1, 2, ... jusqu'à couvrir toute la série."""
+
+    def __init__(self, charge : np.ndarray) -> None :
+        charge = np.asarray(charge, dtype=np.float64)
+        renseignee = ~np.isnan(charge)
+        # Les NaN ne doivent jamais être choisis comme pic ou creux d'un bloc
+        self.valeurs_max = np.where(renseignee, charge, -np.inf)
+        self.valeurs_min = np.where(renseignee, charge, np.inf)
+
+        self.niveaux_max : list[np.ndarray] = []
+        self.niveaux_min : list[np.ndarray] = []
+        positions_max = np.arange(charge.size, dtype=np.int64)
+        positions_min = positions_max
+        while positions_max.size >= 2 :
+            m = positions_max.size // 2 * 2
+            a, b = positions_max[0:m:2], positions_max[1:m:2]
+            positions_max = np.where(self.valeurs_max[b] > self.valeurs_max[a], b, a)
+            a, b = positions_min[0:m:2], positions_min[1:m:2]
+            positions_min = np.where(self.valeurs_min[b] < self.valeurs_min[a], b, a)
+            self.niveaux_max.append(positions_max)
+            self.niveaux_min.append(positions_min)
+
+    def _extremes(self, debuts : np.ndarray, fins : np.ndarray) -> tuple[np.ndarray, np.ndarray] :
+        """L'objectif de cette méthode est de trouver le minimum et le maximum de plusieurs plages à la fois, en lisant la pyramide.
+        :param debuts: débuts des plages (inclus)
+        :param fins: fins des plages (exclues), chaque plage doit être non vide
+        :return: un tuple (positions_min, positions_max), une position par plage"""
+
+        # Chaque plage est découpée en blocs alignés de la pyramide, en remontant un niveau à la fois depuis ses deux bords : au plus
+        # deux blocs par niveau, donc environ 2 log2(n) lectures vectorisées pour toutes les plages ensemble
+        positions_min = np.full(debuts.size, -1, dtype=np.int64)
+        positions_max = np.full(debuts.size, -1, dtype=np.int64)
+        bas, haut = debuts.astype(np.int64), fins.astype(np.int64)
+        niveau = 0
+        while True :
+            actives = bas < haut
+            if not actives.any() :
+                break
+            for depuis_le_bas in (True, False) :
+                if depuis_le_bas :
+                    prendre = actives & (bas % 2 == 1)
+                    blocs = bas[prendre]
+                    bas[prendre] += 1
+                else :
+                    prendre = (bas < haut) & (haut % 2 == 1)
+                    haut[prendre] -= 1
+                    blocs = haut[prendre]
+                candidats_max = blocs if niveau == 0 else self.niveaux_max[niveau - 1][blocs]
+                candidats_min = blocs if niveau == 0 else self.niveaux_min[niveau - 1][blocs]
+                lignes = np.flatnonzero(prendre)
+                actuels = positions_max[lignes]
+                mieux = (actuels < 0) | (self.valeurs_max[candidats_max] > self.valeurs_max[np.maximum(actuels, 0)])
+                positions_max[lignes[mieux]] = candidats_max[mieux]
+                actuels = positions_min[lignes]
+                mieux = (actuels < 0) | (self.valeurs_min[candidats_min] < self.valeurs_min[np.maximum(actuels, 0)])
+                positions_min[lignes[mieux]] = candidats_min[mieux]
+            bas //= 2
+            haut //= 2
+            niveau += 1
+        return positions_min, positions_max
+
+    def positions(self, i : int, j : int, nb_points : int) -> np.ndarray :
+        """L'objectif de cette méthode est de choisir environ nb_points positions dans [i, j) en gardant le min et le max de chaque paquet.
+        :param i: début de la plage (inclus)
+        :param j: fin de la plage (exclue)
+        :param nb_points: nombre de points visés (deux par paquet)
+        :return: positions triées, qui contiennent toujours le maximum et le minimum exacts de la plage ainsi que ses deux extrémités"""
+
+        return self.positions_plages([(i, j)], nb_points)
+
+    def positions_plages(self, plages : list[tuple[int, int]], nb_points : int) -> np.ndarray :
+        """L'objectif de cette méthode est de sous-échantillonner plusieurs plages (par exemple une sélection de saisons) avec un budget commun.
+        :param plages: liste de plages (a, b) disjointes et triées
+        :param nb_points: nombre total de points visés pour toute la sélection (entre nb_points et 2 * nb_points, plus les deux extrémités)
+        :return: positions triées, qui contiennent toujours le maximum et le minimum exacts de la sélection ainsi que sa première et sa dernière ligne"""
+
+        plages = [(int(a), int(b)) for a, b in plages if b > a]
+        debuts = np.array([a for a, _ in plages], dtype=np.int64)
+        fins = np.array([b for _, b in plages], dtype=np.int64)
+        total = int(np.sum(fins - debuts))
+        if total <= max(nb_points, 2) :
+            return np.concatenate([np.arange(a, b, dtype=np.int64) for a, b in plages]) if plages else np.zeros(0, dtype=np.int64)
+
+        # Taille de paquet 2^k choisie sur toute la sélection : la plus grande puissance de 2 qui donne au moins nb_points / 2 paquets
+        k = int(np.floor(np.log2(2 * total / max(nb_points, 2))))
+        k = min(max(k, 1), len(self.niveaux_max))
+        taille = 1 << k
+
+        # Blocs complets de la pyramide contenus dans chaque plage : leur min et leur max sont déjà calculés
+        premiers_blocs = -(-debuts // taille)
+        nb_blocs = np.maximum(fins // taille - premiers_blocs, 0)
+        blocs = np.repeat(premiers_blocs - np.concatenate(([0], np.cumsum(nb_blocs)[:-1])), nb_blocs) + np.arange(int(nb_blocs.sum()))
+        morceaux = [debuts[:1], fins[-1:] - 1, self.niveaux_max[k - 1][blocs], self.niveaux_min[k - 1][blocs]]
+
+        # Les bouts de plage qui ne remplissent pas un bloc (bords de chaque plage, plages plus courtes qu'un bloc, par exemple une
+        # saison dans un grand zoom arrière) sont regroupés dans l'ordre en paquets d'environ taille lignes, un min et un max par paquet,
+        # au lieu de deux points par bout : le nombre de points ne dépend donc pas du nombre de plages
+        avec_blocs = nb_blocs > 0
+        fin_gauche = np.where(avec_blocs, premiers_blocs * taille, fins)
+        debut_droite = np.where(avec_blocs, (premiers_blocs + nb_blocs) * taille, fins)
+        debuts_bouts = np.column_stack((debuts, debut_droite)).ravel()
+        fins_bouts = np.column_stack((fin_gauche, fins)).ravel()
+        non_vides = fins_bouts > debuts_bouts
+        debuts_bouts, fins_bouts = debuts_bouts[non_vides], fins_bouts[non_vides]
+        if debuts_bouts.size :
+            longueurs = fins_bouts - debuts_bouts
+            paquets = (np.cumsum(longueurs) - longueurs) // taille
+            positions_min, positions_max = self._extremes(debuts_bouts, fins_bouts)
+            morceaux.append(self._meilleur_par_paquet(paquets, positions_max, self.valeurs_max, plus_grand=True))
+            morceaux.append(self._meilleur_par_paquet(paquets, positions_min, self.valeurs_min, plus_grand=False))
+        return np.unique(np.concatenate(morceaux))
+
+    @staticmethod
+    def _meilleur_par_paquet(paquets : np.ndarray, positions : np.ndarray, valeurs : np.ndarray, plus_grand : bool) -> np.ndarray :
+        # Position du maximum (ou du minimum) de chaque paquet de bouts consécutifs, le premier à égalité
+        debuts_paquets = np.flatnonzero(np.concatenate(([True], paquets[1:] != paquets[:-1])))
+        cles = valeurs[positions] if plus_grand else -valeurs[positions]
+        meilleures = np.maximum.reduceat(cles, debuts_paquets)
+        numeros = np.repeat(np.arange(debuts_paquets.size), np.diff(np.append(debuts_paquets, paquets.size)))
+        egales = np.flatnonzero(cles == meilleures[numeros])
+        _, premieres = np.unique(numeros[egales], return_index=True)
+        return positions[egales[premieres]]
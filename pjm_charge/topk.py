@@ -0,0 +1,110 @@
+import numpy as np
+
+from .index_temporel import IndexTemporel
+
+# --------------------------------------------------------------------------------------------------------------------------------
+#                             Top N / Low N sur une sélection sans extraire les lignes sélectionnées
+# --------------------------------------------------------------------------------------------------------------------------------
+# Les lignes triées sont découpées en blocs de TAILLE_BLOC heures. Pour chaque bloc, on garde une fois pour toutes les positions de
+# ses nb_max plus fortes (et plus faibles) charges. Pour une sélection, le N-ième meilleur maximum de bloc donne un seuil : seuls les
+# blocs qui l'atteignent peuvent contenir une ligne du résultat, et seules leurs listes précalculées sont fusionnées. Les bouts de
+# plage qui ne couvrent pas un bloc entier sont traités directement.
+
+TAILLE_BLOC = 1024
+NB_MAX_DEFAUT = 100
+
+
+def _meilleures(positions : np.ndarray, cles : np.ndarray, nb : int) -> np.ndarray :
+    """Garde les nb positions de plus grande clé, les égalités étant départagées par la position la plus ancienne (comme nlargest)."""
+
+    ordre = np.lexsort((positions, -cles))
+    return positions[ordre[:nb]]
+
+
+class ListesBlocs :
+    """Positions des nb_max plus grandes valeurs de chaque bloc, rangées par valeur décroissante puis position croissante."""
+
+    def __init__(self, cles : np.ndarray, nb_max : int, taille_bloc : int) -> None :
+        self.cles = cles
+        self.taille_bloc = taille_bloc
+        n = cles.size
+        nb_blocs = n // taille_bloc
+        k = min(nb_max, taille_bloc)
+
+        # Seuls les blocs complets sont précalculés, le dernier bloc incomplet est toujours traité directement
+        blocs = cles[: nb_blocs * taille_bloc].reshape(nb_blocs, taille_bloc)
+        # Tri stable par valeur décroissante : à valeur égale, la position la plus ancienne du bloc passe devant
+        colonnes = np.argsort(-blocs, axis=1, kind="stable")[:, :k]
+        self.positions = colonnes + (np.arange(nb_blocs, dtype=np.int64) * taille_bloc)[:, None]
+        self.valeurs = np.take_along_axis(blocs, colonnes, axis=1)
+
+    def meilleures(self, plages : list[tuple[int, int]], nb : int) -> np.ndarray :
+        """L'objectif de cette méthode est de donner les positions des nb plus grandes clés dans les plages, sans parcourir les blocs complets.
+        :param plages: plages (a, b) disjointes et triées
+        :param nb: nombre de positions voulues, au plus nb_max
+        :return: positions rangées par clé décroissante (les égalités par position croissante)"""
+
+        b = self.taille_bloc
+        nb_blocs = self.positions.shape[0]
+        blocs = []
+        bouts = []
+        for a, fin in plages :
+            bloc_a, bloc_b = -(-a // b), min(fin // b, nb_blocs)
+            if bloc_a >= bloc_b :
+                bouts.append((a, fin))
+                continue
+            blocs.append(np.arange(bloc_a, bloc_b))
+            bouts.append((a, bloc_a * b))
+            bouts.append((bloc_b * b, fin))
+        blocs = np.concatenate(blocs) if blocs else np.zeros(0, dtype=np.int64)
+
+        # Seuil : N-ième plus grand maximum de bloc. Ce sont des valeurs de la sélection, donc tout élément du résultat l'atteint
+        tetes = self.valeurs[blocs, 0]
+        seuil = np.partition(tetes, tetes.size - nb)[tetes.size - nb] if tetes.size >= nb else -np.inf
+
+        # Blocs complets : seules les listes des blocs qui atteignent le seuil sont lues
+        utiles = blocs[tetes >= seuil]
+        valeurs = self.valeurs[utiles, :nb].ravel()
+        morceaux = [self.positions[utiles, :nb].ravel()[valeurs >= seuil]]
+        # Bouts de plage qui ne remplissent pas un bloc : comparaison directe au seuil
+        for a, fin in bouts :
+            if fin > a :
+                morceaux.append(a + np.flatnonzero(self.cles[a:fin] >= seuil))
+
+        candidats = np.concatenate(morceaux)
+        candidats = candidats[np.isfinite(self.cles[candidats])]
+        return _meilleures(candidats, self.cles[candidats], nb)
+
+
+class MoteurTopK :
+    """Top N et Low N de n'importe quelle sélection de plages d'un IndexTemporel, pour N jusqu'à nb_max."""
+
+    def __init__(self, index : IndexTemporel, nb_max : int = NB_MAX_DEFAUT, taille_bloc : int = TAILLE_BLOC) -> None :
+        self.index = index
+        self.nb_max = nb_max
+        charge = np.asarray(index.charge, dtype=np.float64)
+        # Les NaN sont ignorés comme dans nlargest / nsmallest : ils deviennent -inf et ne sont jamais renvoyés
+        self.hauts = ListesBlocs(np.where(np.isnan(charge), -np.inf, charge), nb_max, taille_bloc)
+        self.bas = ListesBlocs(np.where(np.isnan(charge), -np.inf, -charge), nb_max, taille_bloc)
+
+    def _verifier(self, nb : int) -> None :
+        if not 0 < nb <= self.nb_max :
+            raise ValueError(f"Le nombre de lignes doit être compris entre 1 et {self.nb_max}")
+
+    def plus_fortes(self, plages : list[tuple[int, int]], nb : int = 10) -> np.ndarray :
+        """L'objectif de cette méthode est de donner les positions des nb charges les plus élevées de la sélection (équivalent de nlargest).
+        :param plages: plages (a, b) de la sélection (voir CalendrierCodes.plages)
+        :param nb: nombre de lignes à extraire, entre 1 et nb_max
+        :return: positions rangées par charge décroissante"""
+
+        self._verifier(nb)
+        return self.hauts.meilleures(plages, nb)
+
+    def plus_faibles(self, plages : list[tuple[int, int]], nb : int = 10) -> np.ndarray :
+        """L'objectif de cette méthode est de donner les positions des nb charges les moins élevées de la sélection (équivalent de nsmallest).
+        :param plages: plages (a, b) de la sélection
+        :param nb: nombre de lignes à extraire, entre 1 et nb_max
+        :return: positions rangées par charge croissante"""
+
+        self._verifier(nb)
+        return self.bas.meilleures(plages, nb)
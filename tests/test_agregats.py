@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from pjm_charge import AgregatsCharge, CalendrierCodes, IndexTemporel
+
+HEURE_DEPART = int(np.datetime64("1998-04-01T01", "h").astype(np.int64))
+
+
+def indicateurs_reference(index : IndexTemporel, calendrier : CalendrierCodes, i : int, j : int, codes : list[int]) -> tuple :
+    # Total, nombre d'heures, positions du premier pic et du premier creux, en parcourant toutes les lignes sélectionnées
+    charge = np.asarray(index.charge, dtype=np.float64)[i:j]
+    garder = np.isin(calendrier.saison[i:j], codes) & ~np.isnan(charge)
+    if not garder.any() :
+        return 0.0, 0, None, None
+    positions = i + np.flatnonzero(garder)
+    return float(charge[garder].sum()), int(garder.sum()), int(positions[np.argmax(charge[garder])]), int(positions[np.argmin(charge[garder])])
+
+
+@pytest.fixture(scope="module")
+def serie() -> tuple[IndexTemporel, CalendrierCodes, AgregatsCharge] :
+    # Six ans de charge arrondie à 100 MW (beaucoup d'égalités), avec des heures isolées et un mois entier sans valeur
+    generateur = np.random.default_rng(0)
+    nb = 6 * 8766
+    charge = np.round((30000 + 6000 * np.cos(2 * np.pi * np.arange(nb) / 8766) + generateur.normal(0, 1500, nb)) / 100) * 100
+    charge[generateur.choice(nb, 500, replace=False)] = np.nan
+    charge[20000:20720] = np.nan
+    index = IndexTemporel.depuis_colonnes(HEURE_DEPART + np.arange(nb, dtype=np.int64), charge)
+    calendrier = CalendrierCodes.depuis_heures(index.heures)
+    return index, calendrier, AgregatsCharge(index, calendrier)
+
+
+def test_indicateurs_identiques_au_parcours_complet(serie) -> None :
+    index, calendrier, agregats = serie
+    generateur = np.random.default_rng(1)
+    for _ in range(500) :
+        i, j = sorted(int(x) for x in generateur.integers(0, len(index) + 1, 2))
+        codes = sorted({int(x) for x in generateur.integers(0, 4, generateur.integers(1, 5))})
+        resultat = agregats.indicateurs(i, j, codes)
+        total, nb, position_max, position_min = indicateurs_reference(index, calendrier, i, j, codes)
+
+        assert resultat.nb_heures == nb
+        assert resultat.total == pytest.approx(total)
+        if nb == 0 :
+            assert resultat.heure_maximum is None and np.isnan(resultat.moyenne)
+            continue
+        assert resultat.moyenne == pytest.approx(total / nb)
+        assert resultat.maximum == index.charge[position_max]
+        assert resultat.heure_maximum == agregats._heure(position_max)
+        assert resultat.minimum == index.charge[position_min]
+        assert resultat.heure_minimum == agregats._heure(position_min)
+
+
+def test_toutes_les_saisons_et_plage_vide(serie) -> None :
+    index, calendrier, agregats = serie
+    assert agregats.indicateurs(0, len(index)) == agregats.indicateurs(0, len(index), [0, 1, 2, 3])
+    assert agregats.indicateurs(10, 10, [0]).nb_heures == 0
+    assert agregats.indicateurs(0, len(index), []).nb_heures == 0
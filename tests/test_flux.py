@@ -0,0 +1,152 @@
+import numpy as np
+import pytest
+
+from pjm_charge import LecteurIncremental
+from pjm_charge.ingestion import analyser_csv
+
+ENTETE = "Datetime,PJM_Load_MW\n"
+HEURE_DEPART = int(np.datetime64("2001-01-01T00", "h").astype(np.int64))
+
+
+def ligne(heure : int, charge : float) -> str :
+    return f"{np.datetime64(heure, 'h').astype('datetime64[s]').item():%Y-%m-%d %H:%M:%S},{charge}\n"
+
+
+def lignes(debut : int, nb : int) -> list[str] :
+    generateur = np.random.default_rng(debut)
+    return [ligne(HEURE_DEPART + debut + k, float(np.round(generateur.normal(30000, 4000)))) for k in range(nb)]
+
+
+def ajouter(chemin, texte : str) -> None :
+    with open(chemin, "a", encoding="utf-8") as fichier :
+        fichier.write(texte)
+
+
+@pytest.fixture(params=[True, False], ids=["depuis_cache", "texte"])
+def lecteur(request, tmp_path) -> LecteurIncremental :
+    # Le premier chargement passe soit par le cache binaire, soit par la lecture du texte : les deux doivent donner la même chose
+    chemin = tmp_path / "charge.csv"
+    chemin.write_text(ENTETE + "".join(lignes(0, 1000)), encoding="utf-8")
+    return LecteurIncremental(chemin, capacite=16, dossier_cache=tmp_path / "cache", depuis_cache=request.param)
+
+
+def verifier_comme_rechargement(lecteur : LecteurIncremental) -> None :
+    # Les tableaux et les agrégats courants doivent être ceux d'un chargement complet du fichier (trié, sans doublon)
+    heures, charge = analyser_csv(lecteur.chemin)
+    heures, premieres = np.unique(heures, return_index=True)
+    charge = charge[premieres]
+    np.testing.assert_array_equal(lecteur.heures, heures)
+    np.testing.assert_array_equal(lecteur.charge, charge)
+    assert lecteur.agregats.nb_heures == heures.size
+    assert lecteur.agregats.total == pytest.approx(charge.sum())
+    assert lecteur.agregats.maximum == charge.max()
+    assert lecteur.agregats.heure_maximum == heures[np.argmax(charge)]
+    assert lecteur.agregats.minimum == charge.min()
+
+
+def test_ajouts_par_morceaux(lecteur) :
+    premier = lecteur.lire_nouveautes()
+    assert premier.nb_ajoutees == 1000
+    version = lecteur.version
+    debut = 1000
+    for nb in (1, 7, 300, 2000) :
+        ajouter(lecteur.chemin, "".join(lignes(debut, nb)))
+        rapport = lecteur.lire_nouveautes()
+        assert (rapport.nb_lues, rapport.nb_ajoutees, rapport.nb_heures_manquantes) == (nb, nb, 0)
+        assert lecteur.version > version
+        version = lecteur.version
+        debut += nb
+        verifier_comme_rechargement(lecteur)
+
+    # Rien de nouveau : ni ligne, ni changement de version
+    rapport = lecteur.lire_nouveautes()
+    assert rapport.nb_lues == 0 and lecteur.version == version
+
+
+def test_instantane_inchange_apres_ajout(lecteur) :
+    lecteur.lire_nouveautes()
+    _, index = lecteur.instantane()
+    heures = index.heures.copy()
+    ajouter(lecteur.chemin, "".join(lignes(1000, 5000)))
+    lecteur.lire_nouveautes()
+    np.testing.assert_array_equal(index.heures, heures)
+
+
+def test_instantane_reutilise_par_version(lecteur) :
+    lecteur.lire_nouveautes()
+    version, index = lecteur.instantane()
+    dataframe = index.dataframe
+    lecteur.lire_nouveautes()
+    # Sans nouvelle ligne, même version et même index : son dataframe n'est pas reconstruit
+    assert lecteur.instantane() == (version, index)
+    assert lecteur.instantane()[1].dataframe is dataframe
+    ajouter(lecteur.chemin, "".join(lignes(1000, 2)))
+    lecteur.lire_nouveautes()
+    nouvelle_version, nouvel_index = lecteur.instantane()
+    assert nouvelle_version > version and nouvel_index is not index and len(nouvel_index) == 1002
+
+
+def test_ligne_coupee_en_cours_d_ecriture(lecteur) :
+    lecteur.lire_nouveautes()
+    texte = "".join(lignes(1000, 3))
+    coupure = len(lignes(1000, 1)[0]) + 8
+    ajouter(lecteur.chemin, texte[:coupure])
+    rapport = lecteur.lire_nouveautes()
+    assert rapport.nb_ajoutees == 1
+    ajouter(lecteur.chemin, texte[coupure:])
+    rapport = lecteur.lire_nouveautes()
+    assert rapport.nb_ajoutees == 2
+    verifier_comme_rechargement(lecteur)
+
+
+def test_doublons_et_trous(lecteur) :
+    lecteur.lire_nouveautes()
+    derniere = lignes(999, 1)[0]
+    ajouter(lecteur.chemin, derniere + "".join(lignes(1000, 2)) + lignes(1001, 1)[0] + "".join(lignes(1005, 2)))
+    rapport = lecteur.lire_nouveautes()
+    np.testing.assert_array_equal(rapport.doublons, [HEURE_DEPART + 999, HEURE_DEPART + 1001])
+    assert (rapport.nb_lues, rapport.nb_ajoutees) == (6, 4)
+    assert rapport.trous == [(HEURE_DEPART + 1002, HEURE_DEPART + 1005)]
+    assert rapport.nb_heures_manquantes == 3
+    verifier_comme_rechargement(lecteur)
+
+
+def test_ajout_hors_ordre(lecteur) :
+    lecteur.lire_nouveautes()
+    # La ligne de 1998 est écartée mais lue : les lignes suivantes sont intégrées, au même appel comme aux suivants
+    ajouter(lecteur.chemin, lignes(1000, 1)[0] + "1998-01-01 00:00:00,12345.0\n" + lignes(1001, 1)[0])
+    rapport = lecteur.lire_nouveautes()
+    np.testing.assert_array_equal(rapport.hors_ordre, [int(np.datetime64("1998-01-01T00", "h").astype(np.int64))])
+    assert (rapport.nb_lues, rapport.nb_ajoutees) == (3, 2)
+    assert lecteur.agregats.minimum != 12345.0
+    ajouter(lecteur.chemin, "".join(lignes(1002, 3)))
+    rapport = lecteur.lire_nouveautes()
+    assert rapport.nb_ajoutees == 3 and rapport.hors_ordre.size == 0
+    assert lecteur.nb_lignes == 1005
+
+
+def test_fichier_retreci(lecteur) :
+    lecteur.lire_nouveautes()
+    _, ancien_index = lecteur.instantane()
+    version = lecteur.version
+    # Le fichier est remplacé par une version plus courte : le lecteur repart de l'en-tête
+    lecteur.chemin.write_text(ENTETE + "".join(lignes(0, 500)), encoding="utf-8")
+    rapport = lecteur.lire_nouveautes()
+    assert rapport.nb_ajoutees == 500
+    assert lecteur.version > version
+    assert len(ancien_index) == 1000
+    verifier_comme_rechargement(lecteur)
+
+
+def test_ligne_illisible_puis_reinitialisation(lecteur) :
+    lecteur.lire_nouveautes()
+    ajouter(lecteur.chemin, "pas une date,1.0\n")
+    with pytest.raises(ValueError) :
+        lecteur.lire_nouveautes()
+    assert lecteur.nb_lignes == 1000
+
+    # Le fichier est corrigé puis relu depuis le début
+    lecteur.chemin.write_text(ENTETE + "".join(lignes(0, 1200)), encoding="utf-8")
+    lecteur.reinitialiser()
+    assert lecteur.lire_nouveautes().nb_ajoutees == 1200
+    verifier_comme_rechargement(lecteur)
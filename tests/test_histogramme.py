@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from pjm_charge import CalendrierCodes, CubeHistogramme, IndexTemporel
+
+HEURE_DEPART = int(np.datetime64("1998-04-01T05", "h").astype(np.int64))
+
+
+@pytest.fixture(scope="module")
+def serie() -> tuple[IndexTemporel, CalendrierCodes, CubeHistogramme] :
+    # Cinq ans de charge qui commencent en cours de journée, avec des heures manquantes (jours incomplets) et des heures sans valeur
+    generateur = np.random.default_rng(3)
+    nb = 5 * 8766
+    heures = HEURE_DEPART + np.arange(nb, dtype=np.int64)
+    heures = np.delete(heures, generateur.choice(nb, 2000, replace=False))
+    charge = np.round(30000 + 6000 * np.cos(2 * np.pi * heures / 8766) + generateur.normal(0, 2000, heures.size))
+    charge[generateur.choice(heures.size, 400, replace=False)] = np.nan
+    index = IndexTemporel.depuis_colonnes(heures, charge)
+    return index, CalendrierCodes.depuis_heures(index.heures), CubeHistogramme(index)
+
+
+def selection(plages : list[tuple[int, int]]) -> np.ndarray :
+    return np.concatenate([np.arange(a, b) for a, b in plages]) if plages else np.zeros(0, dtype=np.int64)
+
+
+def test_comptes_comme_np_histogram(serie) :
+    index, calendrier, cube = serie
+    generateur = np.random.default_rng(4)
+    charge = np.asarray(index.charge)
+    for _ in range(300) :
+        # Fenêtres de lignes quelconques : elles commencent et finissent le plus souvent en cours de journée
+        i, j = np.sort(generateur.integers(0, len(index) + 1, 2))
+        codes = sorted(generateur.choice(4, generateur.integers(1, 5), replace=False).tolist())
+        plages = calendrier.plages(int(i), int(j), codes)
+        valeurs = charge[selection(plages)]
+        attendu = np.histogram(valeurs[~np.isnan(valeurs)], bins=cube.bords)[0]
+        np.testing.assert_array_equal(cube.comptes(plages), attendu)
+
+
+def test_comptes_plages_de_jours(serie) :
+    index, calendrier, cube = serie
+    debut = index.heures[0].astype("datetime64[h]").astype("datetime64[D]").item()
+    plages = calendrier.plages(*index.bornes(debut, debut.replace(year=debut.year + 2)), [0, 2])
+    valeurs = np.asarray(index.charge)[selection(plages)]
+    np.testing.assert_array_equal(cube.comptes(plages), np.histogram(valeurs[~np.isnan(valeurs)], bins=cube.bords)[0])
+    assert cube.comptes([]).sum() == 0
+    assert cube.comptes([(10, 10)]).sum() == 0
+
+
+def test_quantiles_a_une_classe_pres(serie) :
+    index, calendrier, cube = serie
+    generateur = np.random.default_rng(5)
+    charge = np.asarray(index.charge)
+    largeur = cube.bords[1] - cube.bords[0]
+    probabilites = [0.01, 0.25, 0.5, 0.95, 0.99]
+    for _ in range(100) :
+        i, j = np.sort(generateur.integers(0, len(index) + 1, 2))
+        plages = calendrier.plages(int(i), int(j), [0, 1, 2, 3] if generateur.random() < 0.5 else [2])
+        valeurs = charge[selection(plages)]
+        valeurs = valeurs[~np.isnan(valeurs)]
+        estimes = cube.quantiles(cube.comptes(plages), probabilites)
+        if valeurs.size == 0 :
+            assert np.isnan(estimes).all()
+            continue
+        # Le cube lit la classe qui contient la valeur de rang ceil(p * n) : c'est la définition inverted_cdf de np.quantile (l'interpolation
+        # linéaire par défaut peut s'en éloigner de plus d'une classe sur une petite sélection, entre deux valeurs extrêmes éloignées)
+        assert np.all(np.abs(estimes - np.quantile(valeurs, probabilites, method="inverted_cdf")) <= largeur * (1 + 1e-9))
+
+
+def test_quantiles_grande_selection(serie) :
+    # Sur une sélection bien remplie, l'estimation reste aussi à une classe près de np.quantile avec son interpolation par défaut
+    index, calendrier, cube = serie
+    for codes in ([0, 1, 2, 3], [0], [1, 3]) :
+        plages = calendrier.plages(0, len(index), codes)
+        valeurs = np.asarray(index.charge)[selection(plages)]
+        valeurs = valeurs[~np.isnan(valeurs)]
+        probabilites = [0.01, 0.5, 0.95, 0.99]
+        ecarts = np.abs(cube.quantiles(cube.comptes(plages), probabilites) - np.quantile(valeurs, probabilites))
+        assert np.all(ecarts <= cube.bords[1] - cube.bords[0])
@@ -0,0 +1,99 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pjm_charge import (
+    StatistiquesCharge,
+    afficher_low_10,
+    afficher_top_10,
+    charge_maximale,
+    charge_minimale,
+    charge_moyenne,
+    charge_totale,
+    conversion_en_date,
+    statistiques_fichier,
+    statistiques_fichiers,
+)
+
+CHEMIN_CSV = Path(__file__).resolve().parent.parent / "PJM_Load_hourly.csv"
+
+
+@pytest.fixture(scope="module")
+def reference() -> pd.DataFrame :
+    # Le jeu de données en mémoire, trié par date : à égalité de charge, nlargest / nsmallest gardent alors l'heure la plus ancienne
+    return conversion_en_date(pd.read_csv(CHEMIN_CSV)).sort_values("Datetime", kind="stable").reset_index(drop=True)
+
+
+def verifier_comme_en_memoire(statistiques : StatistiquesCharge, dataframe : pd.DataFrame) -> None :
+    assert statistiques.nb_heures == dataframe["PJM_Load_MW"].count()
+    assert statistiques.total == pytest.approx(charge_totale(dataframe), rel=1e-12)
+    assert statistiques.moyenne == pytest.approx(charge_moyenne(dataframe), rel=1e-12)
+    assert statistiques.maximum == charge_maximale(dataframe)
+    assert statistiques.minimum == charge_minimale(dataframe)
+    assert statistiques.heure_maximum == dataframe.loc[dataframe["PJM_Load_MW"].idxmax(), "Datetime"].to_datetime64().astype("datetime64[h]").astype(np.int64)
+    assert statistiques.heure_minimum == dataframe.loc[dataframe["PJM_Load_MW"].idxmin(), "Datetime"].to_datetime64().astype("datetime64[h]").astype(np.int64)
+
+    for plus_grandes, attendu in ((True, afficher_top_10(dataframe)), (False, afficher_low_10(dataframe))) :
+        obtenu = statistiques.tableau_top(plus_grandes)
+        np.testing.assert_array_equal(obtenu["PJM_Load_MW"].to_numpy(), attendu["PJM_Load_MW"].to_numpy())
+        np.testing.assert_array_equal(obtenu["Datetime"].to_numpy(), attendu["Datetime"].to_numpy())
+
+    comptes, bords = statistiques.histogramme()
+    np.testing.assert_array_equal(comptes, np.histogram(dataframe["PJM_Load_MW"].dropna(), bins=bords)[0])
+
+
+@pytest.mark.parametrize("taille_morceau", [977, 10_000, 1_000_000])
+def test_fichier_par_morceaux(reference, taille_morceau) :
+    verifier_comme_en_memoire(statistiques_fichier(CHEMIN_CSV, taille_morceau=taille_morceau), reference)
+
+
+def test_petits_morceaux(tmp_path) :
+    # Une ligne par morceau serait trop lent sur tout le fichier : on se limite à son début
+    extrait = tmp_path / "extrait.csv"
+    pd.read_csv(CHEMIN_CSV, nrows=500).to_csv(extrait, index=False)
+    dataframe = conversion_en_date(pd.read_csv(extrait)).sort_values("Datetime", kind="stable").reset_index(drop=True)
+    for taille_morceau in (1, 3, 64) :
+        verifier_comme_en_memoire(statistiques_fichier(extrait, taille_morceau=taille_morceau), dataframe)
+
+
+def test_bords_fixes(reference) :
+    bords = np.linspace(reference["PJM_Load_MW"].min(), reference["PJM_Load_MW"].max(), 81)
+    statistiques = statistiques_fichier(CHEMIN_CSV, bords=bords, taille_morceau=5000)
+    assert statistiques.hors_classes == 0
+    verifier_comme_en_memoire(statistiques, reference)
+
+
+@pytest.mark.parametrize("nb_processus", [1, 2])
+def test_plusieurs_fichiers(reference, tmp_path, nb_processus) :
+    # Le fichier est coupé en trois zones fictives : la fusion (dans un pool de processus ou non) doit redonner le fichier entier
+    brut = pd.read_csv(CHEMIN_CSV)
+    chemins = []
+    for numero, morceau in enumerate(np.array_split(np.arange(len(brut)), 3)) :
+        chemin = tmp_path / f"zone_{numero}.csv"
+        brut.iloc[morceau].to_csv(chemin, index=False)
+        chemins.append(chemin)
+
+    fusion, par_fichier = statistiques_fichiers(chemins, nb_processus=nb_processus, taille_morceau=4096)
+    verifier_comme_en_memoire(fusion, reference)
+    assert sorted(par_fichier) == sorted(str(chemin) for chemin in chemins)
+    assert sum(statistiques.nb_heures for statistiques in par_fichier.values()) == fusion.nb_heures
+
+
+@pytest.mark.parametrize("nb_processus", [1, 2])
+def test_fichier_large(reference, tmp_path, nb_processus) :
+    # Archive large : une colonne de charge par zone. Chaque colonne est une zone, comme si elle était dans son propre fichier
+    brut = pd.read_csv(CHEMIN_CSV)
+    chemin = tmp_path / "zones.csv"
+    pd.DataFrame({"Datetime": brut["Datetime"], "AEP_MW": brut["PJM_Load_MW"], "COMED_MW": brut["PJM_Load_MW"] / 2}).to_csv(chemin, index=False)
+
+    with pytest.raises(ValueError, match="plusieurs colonnes") :
+        statistiques_fichier(chemin)
+    verifier_comme_en_memoire(statistiques_fichier(chemin, colonne="AEP_MW"), reference)
+
+    fusion, par_zone = statistiques_fichiers([chemin], nb_processus=nb_processus, taille_morceau=4096)
+    moitie = reference.assign(PJM_Load_MW=reference["PJM_Load_MW"] / 2)
+    verifier_comme_en_memoire(fusion, pd.concat([reference, moitie]).sort_values("Datetime", kind="stable").reset_index(drop=True))
+    assert sorted(par_zone) == [f"{chemin}:AEP_MW", f"{chemin}:COMED_MW"]
+    verifier_comme_en_memoire(par_zone[f"{chemin}:COMED_MW"], moitie)
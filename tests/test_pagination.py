@@ -0,0 +1,98 @@
+import datetime
+import io
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pjm_charge import (
+    CalendrierCodes,
+    IndexTemporel,
+    IndexValeurs,
+    PaginationSelection,
+    ajouter_libelles,
+    extraire_plages,
+    jour_vers_heure,
+    morceaux_csv,
+    morceaux_parquet,
+)
+from pjm_charge.ingestion import analyser_csv
+
+CHEMIN_CSV = Path(__file__).resolve().parent.parent / "PJM_Load_hourly.csv"
+HEURE_DEPART = int(np.datetime64("1998-04-01T01", "h").astype(np.int64))
+
+
+@pytest.fixture(scope="module", params=["csv", "synthetique"])
+def serie(request) -> tuple[IndexTemporel, CalendrierCodes, IndexValeurs] :
+    if request.param == "csv" :
+        index = IndexTemporel.depuis_colonnes(*analyser_csv(CHEMIN_CSV))
+    else :
+        # Trois ans de charge arrondie à 500 MW (beaucoup d'égalités) avec des heures sans valeur
+        generateur = np.random.default_rng(1)
+        nb = 3 * 8766
+        charge = np.round(generateur.normal(30000, 5000, nb) / 500) * 500
+        charge[generateur.choice(nb, 300, replace=False)] = np.nan
+        index = IndexTemporel.depuis_colonnes(HEURE_DEPART + np.arange(nb, dtype=np.int64), charge)
+    return index, CalendrierCodes.depuis_heures(index.heures), IndexValeurs(index)
+
+
+def selections(index : IndexTemporel, calendrier : CalendrierCodes) -> list[list[tuple[int, int]]] :
+    premier = index.heures[0].astype("datetime64[h]").astype(datetime.datetime).date()
+    return [
+        [(0, len(index))],
+        calendrier.plages(*index.bornes(premier + datetime.timedelta(days=100), premier + datetime.timedelta(days=700)), [0, 2]),
+        calendrier.plages(0, len(index), [1]),
+        [],
+    ]
+
+
+@pytest.mark.parametrize("tri, croissant", [("charge_decroissante", False), ("charge_croissante", True)])
+def test_tri_par_charge_comme_sort_values(serie, tri, croissant) :
+    index, calendrier, index_valeurs = serie
+    for plages in selections(index, calendrier) :
+        pagination = PaginationSelection(index, plages, taille_page=997)
+        attendu = extraire_plages(index.dataframe, plages).sort_values("PJM_Load_MW", ascending=croissant, kind="stable").index.to_numpy()
+        obtenu = np.concatenate([np.asarray(pagination.positions(page, tri, index_valeurs), dtype=np.int64) for page in range(pagination.nb_pages)])
+        np.testing.assert_array_equal(obtenu, attendu)
+
+
+def test_pages_chronologiques(serie) :
+    index, calendrier, _ = serie
+    for plages in selections(index, calendrier) :
+        pagination = PaginationSelection(index, plages, taille_page=1000)
+        attendu = extraire_plages(index.dataframe, plages).index.to_numpy()
+        obtenu = np.concatenate([np.arange(len(index))[pagination.positions(page)] for page in range(pagination.nb_pages)])
+        np.testing.assert_array_equal(obtenu, attendu)
+
+
+def test_page_de_date(serie) :
+    index, calendrier, _ = serie
+    generateur = np.random.default_rng(2)
+    premier = index.heures[0].astype("datetime64[h]").astype(datetime.datetime).date()
+    for plages in selections(index, calendrier)[:3] :
+        pagination = PaginationSelection(index, plages, taille_page=100)
+        selection = extraire_plages(index.dataframe, plages).index.to_numpy()
+        for decalage in generateur.integers(-10, len(index) // 24 + 10, 50) :
+            jour = premier + datetime.timedelta(days=int(decalage))
+            rang = int(np.count_nonzero(index.heures[selection] < jour_vers_heure(jour)))
+            page = pagination.page_de_date(jour)
+            assert page == min(rang // 100, pagination.nb_pages - 1)
+            if rang < selection.size :
+                # La page contient la première heure sélectionnée à partir de ce jour
+                assert selection[rang] in np.arange(len(index))[pagination.positions(page)]
+
+
+def test_exports_csv_et_parquet(serie) :
+    index, calendrier, _ = serie
+    for plages in selections(index, calendrier)[:3] :
+        attendu = ajouter_libelles(extraire_plages(index.dataframe, plages), calendrier).sort_values("Datetime", kind="stable").reset_index(drop=True)
+
+        csv = pd.read_csv(io.BytesIO(b"".join(morceaux_csv(index, calendrier, plages, taille_morceau=4000))), parse_dates=["Datetime"])
+        parquet = pd.read_parquet(io.BytesIO(b"".join(morceaux_parquet(index, calendrier, plages, taille_morceau=4000))))
+        for exporte in (csv, parquet) :
+            assert list(exporte.columns) == list(attendu.columns)
+            np.testing.assert_array_equal(exporte["Datetime"].to_numpy().astype("datetime64[s]"), attendu["Datetime"].to_numpy().astype("datetime64[s]"))
+            np.testing.assert_array_equal(exporte["PJM_Load_MW"].to_numpy(), attendu["PJM_Load_MW"].to_numpy())
+            for colonne in ("jour_semaine", "saison") :
+                np.testing.assert_array_equal(exporte[colonne].astype(str).to_numpy(), attendu[colonne].astype(str).to_numpy())
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from pjm_charge import PyramideMinMax
+
+
+@pytest.fixture(scope="module")
+def charge() -> np.ndarray :
+    # Longueur impaire (dernier bloc incomplet à chaque niveau), valeurs arrondies (égalités), heures isolées et longue plage sans valeur
+    generateur = np.random.default_rng(0)
+    nb = 100_003
+    valeurs = np.round(30000 + 5000 * np.sin(2 * np.pi * np.arange(nb) / 24) + generateur.normal(0, 1500, nb), -2)
+    valeurs[generateur.choice(nb, 2000, replace=False)] = np.nan
+    valeurs[40_000:45_000] = np.nan
+    return valeurs
+
+
+def verifier_extremes(charge : np.ndarray, positions : np.ndarray, selection : np.ndarray) -> None :
+    assert np.all(np.diff(positions) > 0)
+    assert np.isin(positions, selection).all()
+    assert positions[0] == selection[0] and positions[-1] == selection[-1]
+    if np.isnan(charge[selection]).all() :
+        return
+    assert np.nanmax(charge[positions]) == np.nanmax(charge[selection])
+    assert np.nanmin(charge[positions]) == np.nanmin(charge[selection])
+
+
+def test_fenetres_gardent_le_max_et_le_min_exacts(charge) -> None :
+    pyramide = PyramideMinMax(charge)
+    generateur = np.random.default_rng(1)
+    fenetres = [(0, charge.size), (1, charge.size - 1), (40_100, 44_900), (39_990, 45_010)]
+    fenetres += [tuple(sorted(int(x) for x in generateur.integers(0, charge.size + 1, 2))) for _ in range(300)]
+    for i, j in fenetres :
+        if j <= i :
+            continue
+        nb_points = int(generateur.integers(2, 3000))
+        positions = pyramide.positions(i, j, nb_points)
+        verifier_extremes(charge, positions, np.arange(i, j))
+        if j - i > nb_points :
+            assert positions.size <= 2 * nb_points + 2
+
+
+def test_plages_multiples_budget_commun(charge) -> None :
+    pyramide = PyramideMinMax(charge)
+    generateur = np.random.default_rng(2)
+    for _ in range(100) :
+        # Beaucoup de plages courtes, comme une sélection de saisons sur une longue période
+        bornes = np.unique(generateur.integers(0, charge.size + 1, int(generateur.integers(2, 2000))))
+        plages = [(int(a), int(b)) for a, b in zip(bornes[0::2], bornes[1::2]) if b > a]
+        if not plages :
+            continue
+        selection = np.concatenate([np.arange(a, b) for a, b in plages])
+        nb_points = int(generateur.integers(2, 2000))
+        positions = pyramide.positions_plages(plages, nb_points)
+        verifier_extremes(charge, positions, selection)
+        if selection.size > nb_points :
+            assert positions.size <= 2 * nb_points + 2
+
+
+def test_petites_selections_gardees_entierement(charge) -> None :
+    pyramide = PyramideMinMax(charge)
+    assert np.array_equal(pyramide.positions(10, 20, 100), np.arange(10, 20))
+    assert np.array_equal(pyramide.positions_plages([(0, 3), (50, 55)], 100), np.r_[0:3, 50:55])
+    assert pyramide.positions_plages([], 100).size == 0
+    assert pyramide.positions(5, 5, 100).size == 0